@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'TaskManagerSystem.settings')
+# sync views run in a thread pool: persistent connections would pile up
+# in its threads (use DB_POOL to reuse connections)
+os.environ['DB_CONN_MAX_AGE'] = '0'
 
 application = get_asgi_application()
+
+# cache invalidation listener of the process (starts on the first lookup)
+from api import invalidation  # noqa: E402
+
+invalidation.enable()
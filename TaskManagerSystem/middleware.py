@@ -1,5 +1,20 @@
+import logging
+import random
+import time
+
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
 from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.module_loading import import_string
+
+from api import db_routing, metrics, profiling
+from api.instrumentation import (
+    get_query_budget, get_view_name, instrument_queries,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class RejectLargeRequestsMiddleware:
@@ -16,3 +31,231 @@ class RejectLargeRequestsMiddleware:
             except (ValueError, TypeError):
                 pass
         return self.get_response(request)
+
+
+class PathDispatchMiddleware:
+    """
+    Runs SESSION_MIDDLEWARE (sessions, CSRF, auth, messages) only for
+    requests outside STATELESS_PATH_PREFIXES: the admin and the docs need
+    them, the API authenticates with JWT only and would just pay for them.
+
+    The wrapped middleware are loaded the way Django loads MIDDLEWARE, and
+    their process_view/process_exception/process_template_response hooks
+    run at this position of the stack
+    """
+
+    HOOKS = ("process_view", "process_exception", "process_template_response")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.STATELESS_PATH_PREFIXES)
+        self.hooks = {name: [] for name in self.HOOKS}
+
+        handler = convert_exception_to_response(get_response)
+        for path in reversed(settings.SESSION_MIDDLEWARE):
+            try:
+                middleware = import_string(path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            self.hooks["process_view"][:0] = self._hook(middleware, "process_view")
+            self.hooks["process_exception"] += self._hook(middleware, "process_exception")
+            self.hooks["process_template_response"] += self._hook(
+                middleware, "process_template_response"
+            )
+            handler = convert_exception_to_response(middleware)
+        self.session_chain = handler
+
+    @staticmethod
+    def _hook(middleware, name):
+        hook = getattr(middleware, name, None)
+        return [hook] if hook is not None else []
+
+    def is_stateless(self, request):
+        return request.path_info.startswith(self.prefixes)
+
+    def __call__(self, request):
+        if self.is_stateless(request):
+            return self.get_response(request)
+        return self.session_chain(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_stateless(request):
+            return None
+        for hook in self.hooks["process_view"]:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_exception(self, request, exception):
+        if self.is_stateless(request):
+            return None
+        for hook in self.hooks["process_exception"]:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_stateless(request):
+            return response
+        for hook in self.hooks["process_template_response"]:
+            response = hook(request, response)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe requests to a read replica and pins clients
+    to the primary for a short window after they write (see
+    api.db_routing). Not loaded without READ_REPLICAS
+    """
+
+    def __init__(self, get_response):
+        if not settings.READ_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        alias = db_routing.choose_read_alias(request)
+        with db_routing.use_database(alias):
+            response = self.get_response(request)
+        if request.method not in db_routing.SAFE_METHODS:
+            db_routing.pin_to_primary(request, response)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Records per-view latency, request/response sizes, SQL query counts
+    and throttle rejections into api.metrics (exposed at /api/v1/metrics/).
+    Placed before QueryInstrumentationMiddleware to read `response.sql_stats`
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view = get_view_name(request)
+        method = request.method
+        status = response.status_code
+        metrics.REQUEST_LATENCY.observe(elapsed, view, method, status)
+        try:
+            request_size = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            request_size = 0
+        metrics.REQUEST_SIZE.observe(request_size, view, method)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), view, method)
+
+        stats = getattr(response, "sql_stats", None)
+        if stats is not None:
+            metrics.DB_QUERIES.observe(stats.count, view, method)
+            metrics.DB_DURATION.inc(view, method, amount=stats.duration)
+        if status == 429:
+            metrics.THROTTLE_REJECTIONS.inc(view)
+        return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Counts SQL queries and database time per request:
+    - adds a `Server-Timing: db;dur=..;desc="N queries", app;dur=..` header
+    - logs requests that exceed the query budget declared on the view
+      (see api.instrumentation.get_query_budget)
+    - exposes the stats as `response.sql_stats` for the tests
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with instrument_queries() as stats:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        response["Server-Timing"] = (
+            f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries", '
+            f"app;dur={total_ms:.2f}"
+        )
+        response.sql_stats = stats
+        self.check_budget(request, stats)
+        return response
+
+    def check_budget(self, request, stats):
+        budget, view_name = get_query_budget(request)
+        if budget is None or stats.count <= budget:
+            return
+        logger.warning(
+            "Query budget exceeded: %s %s (%s) ran %d queries, budget %d; "
+            "most repeated: %s",
+            request.method, request.path, view_name, stats.count, budget,
+            stats.most_repeated(1),
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profiles selected live requests (see api.profiling):
+    - every request to a view listed in PROFILING_VIEWS ("TaskViewSet.list")
+    - a random PROFILING_SAMPLE_RATE share of the other requests
+    - requests with a valid `X-Profile` token (manage.py profiles token)
+
+    The profile name is returned in the `X-Profile-Id` header. Not loaded
+    at all unless PROFILING_ENABLED is set
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.views = frozenset(settings.PROFILING_VIEWS)
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        view_name = self.get_profiled_view(request)
+        if view_name is None:
+            return self.get_response(request)
+
+        response, profiler, duration = profiling.profile_call(
+            self.get_response, request
+        )
+        if profiler is None:  # another request is being profiled
+            return response
+        try:
+            name = profiling.save_profile(
+                profiler, view_name, request.method, duration
+            )
+        except OSError as exc:
+            logger.error("Could not save the profile of %s: %s", request.path, exc)
+        else:
+            response["X-Profile-Id"] = name
+        return response
+
+    def get_profiled_view(self, request):
+        """View name of a request to profile, None otherwise"""
+        token = request.META.get("HTTP_X_PROFILE")
+        forced = token is not None and profiling.is_valid_profile_token(token)
+        sampled = forced or (
+            self.sample_rate and random.random() < self.sample_rate
+        )
+        if not (sampled or self.views):
+            return None
+
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            match = None
+        view_name = get_view_name(request, match)
+        if sampled or view_name in self.views:
+            return view_name
+        return None
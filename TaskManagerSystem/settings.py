@@ -8,6 +8,7 @@ import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -55,9 +56,107 @@ ROLE_PERMISSIONS = {
 }
 ROLE_ORDER = tuple(reversed(ROLE_PERMISSIONS.keys()))
 
+# Per-request SQL counters (Server-Timing header, query budget warnings)
+QUERY_INSTRUMENTATION = config("QUERY_INSTRUMENTATION", default=True, cast=bool)
+
+# Prometheus metrics (/api/v1/metrics/)
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+# Per-worker metric files for multi-process servers (gunicorn); empty it
+# on deploy. Unset: in-memory metrics of the current process
+METRICS_MULTIPROCESS_DIR = config("METRICS_MULTIPROCESS_DIR", default=None)
+# Bearer token required by the scrape endpoint; unset: open in DEBUG only
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Prebuilt OpenAPI schema (manage.py build_openapi_schema)
+OPENAPI_SCHEMA_DIR = BASE_DIR / "schema"
+# /swagger/ and /redoc/; the schema views (drf_yasg generators, renderers)
+# are only imported on their first request
+DOCS_ENABLED = config("DOCS_ENABLED", default=True, cast=bool)
+
 DATA_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024 * 25  # 25 Mb restriction
 API_VERSION = '1.0.0'
 
+# Slow query log (api.querylog, manage.py query_report): per-fingerprint
+# SQL timings and EXPLAIN plans of statements slower than QUERY_LOG_SLOW_MS
+QUERY_LOG_ENABLED = config("QUERY_LOG_ENABLED", default=False, cast=bool)
+QUERY_LOG_SLOW_MS = config("QUERY_LOG_SLOW_MS", default=100, cast=float)
+QUERY_LOG_DIR = config("QUERY_LOG_DIR", default=None)  # LOG_DIR/queries
+QUERY_LOG_FLUSH_SECONDS = 30  # how often each worker writes its aggregate
+QUERY_LOG_MAX_FINGERPRINTS = 2000
+
+# On-demand request profiling (api.profiling); off: no overhead at all
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=False, cast=bool)
+PROFILING_MODE = config("PROFILING_MODE", default="sample")  # sample | cprofile
+PROFILING_VIEWS = config(
+    "PROFILING_VIEWS", default="", cast=lambda v: [s.strip() for s in v.split(",") if s.strip()]
+)  # e.g. "TaskViewSet.list,TaskViewSet.stats": profiled on every request
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", default=0.0, cast=float)
+PROFILING_INTERVAL_MS = config("PROFILING_INTERVAL_MS", default=1, cast=float)
+PROFILING_DIR = config("PROFILING_DIR", default=None)  # LOG_DIR/profiles
+PROFILING_MAX_FILES = config("PROFILING_MAX_FILES", default=50, cast=int)
+PROFILING_TOKEN_MAX_AGE = 60 * 60  # X-Profile tokens expire after an hour
+
+# Delta sync (/tasks/sync/)
+SYNC_PAGE_SIZE = 500  # default number of changed tasks per page
+SYNC_MAX_PAGE_SIZE = 1000
+SYNC_CURSOR_LAG_SECONDS = 5  # re-send this window to cover late commits
+SYNC_TOMBSTONE_RETENTION_DAYS = config(
+    "SYNC_TOMBSTONE_RETENTION_DAYS", default=30, cast=int
+)
+
+# Shared cache; the default LocMemCache is per process, use Redis or
+# Memcached (CACHE_BACKEND, CACHE_LOCATION) with several workers
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Two-tier caches (api.cache): per-process LRU in front of CACHES['default']
+# for roles, membership roles, project metadata and authenticated users.
+# LocMemCache is per process: it is skipped, and with several workers the
+# bus is required for membership roles and users to be cached at all
+TWO_TIER_CACHE_TIMEOUT = config("TWO_TIER_CACHE_TIMEOUT", default=300, cast=int)
+# Evict invalidated entries from the LRU of every worker on commit
+# (api.invalidation: PostgreSQL LISTEN/NOTIFY, one connection per worker)
+CACHE_INVALIDATION_BUS = config("CACHE_INVALIDATION_BUS", default=True, cast=bool)
+# seconds a worker may serve an invalidated entry without the bus; 0
+# disables the LRU
+TWO_TIER_CACHE_LOCAL_TIMEOUT = config(
+    "TWO_TIER_CACHE_LOCAL_TIMEOUT",
+    default=300 if CACHE_INVALIDATION_BUS else 5, cast=int,
+)
+TWO_TIER_CACHE_LOCAL_SIZE = 4096  # entries per cache and process
+
+# Identical concurrent list requests share one computation (api.singleflight)
+SINGLE_FLIGHT_ENABLED = config("SINGLE_FLIGHT_ENABLED", default=True, cast=bool)
+# also across workers, through a short lock in CACHES['default']
+SINGLE_FLIGHT_SHARED = config("SINGLE_FLIGHT_SHARED", default=False, cast=bool)
+SINGLE_FLIGHT_TIMEOUT = 10  # seconds a request waits for the page of another
+
+# Task statistics cache (/tasks/stats/); 0 disables caching
+TASK_STATS_CACHE_TIMEOUT = config("TASK_STATS_CACHE_TIMEOUT", default=30, cast=int)
+
+# Real-time task events (/tasks/events/, ASGI only); with several workers
+# or nodes use api.events.PostgresEventBackend (NOTIFY on the database)
+EVENTS_BACKEND = config(
+    "EVENTS_BACKEND", default="api.events.LocalEventBackend"
+)
+EVENTS_SUBSCRIBER_QUEUE_SIZE = 256  # frames buffered per slow client
+EVENTS_HEARTBEAT_SECONDS = 15
+
+# Due-date reminders (manage.py send_task_reminders)
+REMINDERS_BACKEND = config(
+    "REMINDERS_BACKEND", default="tasks.reminders.ConsoleReminderBackend"
+)
+REMINDERS_FILE_PATH = config("REMINDERS_FILE_PATH", default=None)  # LOG_DIR/reminders.log
+REMINDER_LEAD_MINUTES = config("REMINDER_LEAD_MINUTES", default=60, cast=int)
+REMINDER_BATCH_SIZE = 1000  # tasks read per index range scan step
+
 DJANGO_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -76,7 +175,7 @@ THIRD_PARTY_APPS = [
     "corsheaders",
 ]
 
-LOCAL_APPS = ["users", "tasks", "projects"]
+LOCAL_APPS = ["api", "users", "tasks", "projects"]
 
 # Application definition
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -84,15 +183,28 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 # List of middleware classes to use
 MIDDLEWARE = [
     'TaskManagerSystem.middleware.RejectLargeRequestsMiddleware',
+    'TaskManagerSystem.middleware.ReplicaRoutingMiddleware',        # replica reads, primary after writes
+    'TaskManagerSystem.middleware.MetricsMiddleware',               # Prometheus metrics
+    'TaskManagerSystem.middleware.QueryInstrumentationMiddleware',  # SQL count/time, query budgets
+    'TaskManagerSystem.middleware.ProfilingMiddleware',             # opt-in request profiles
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',            # security-related middleware
-    'django.contrib.sessions.middleware.SessionMiddleware',     # session management middleware
+    'TaskManagerSystem.middleware.PathDispatchMiddleware',      # SESSION_MIDDLEWARE outside the API
     'django.middleware.common.CommonMiddleware',                # common middleware
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',   # clickjacking protection middleware
+]
+
+# Run only for requests outside STATELESS_PATH_PREFIXES (admin, docs); the
+# API authenticates with JWT only
+SESSION_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',     # session management middleware
     'django.middleware.csrf.CsrfViewMiddleware',                # CSRF protection middleware
     'django.contrib.auth.middleware.AuthenticationMiddleware',  # authentication middleware
     'django.contrib.messages.middleware.MessageMiddleware',     # messaging middleware
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',   # clickjacking protection middleware
 ]
+STATELESS_PATH_PREFIXES = ['/api/']
+# the admin checks look for the session middleware in MIDDLEWARE only
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 # Root URL configuration
 WSGI_APPLICATION = 'TaskManagerSystem.wsgi.application'
@@ -138,7 +250,7 @@ CORS_ALLOW_HEADERS = ["content-type", "authorization", "x-csrftoken"]
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'users.authentication.CachedJWTAuthentication'
     ],
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated',],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -150,12 +262,20 @@ REST_FRAMEWORK = {
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
     'UNAUTHENTICATED_USER': None,    
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',  # not auth request
-        'rest_framework.throttling.UserRateThrottle'
+        'api.throttling.AnonSlidingWindowThrottle',  # not auth request
+        'api.throttling.UserSlidingWindowThrottle'
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "10000/minute", "user": "10000/minute"},
 }
 
+# Throttling counters (api.throttling): SharedMemoryStore shares them
+# between the workers of a node, CacheStore between nodes (shared cache)
+THROTTLE_STORE = config(
+    "THROTTLE_STORE", default="api.throttling.SharedMemoryStore"
+)
+THROTTLE_SHM_PATH = config("THROTTLE_SHM_PATH", default=None)  # /dev/shm/tms-throttle-*.bin
+THROTTLE_SHM_SLOTS = 65536  # clients counted at once (32 bytes each)
+
 # Simple JWT settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(
@@ -175,6 +295,26 @@ SIMPLE_JWT = {
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Database settings
+# Connection reuse: persistent connections (one per worker thread, checked
+# before reuse) by default. DB_POOL=True switches to the psycopg 3 pool
+# built into Django 5.1 (pip install "psycopg[binary,pool]"), which also
+# suits ASGI, where persistent connections must stay disabled (asgi.py
+# forces DB_CONN_MAX_AGE=0)
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+if DB_POOL:
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured(
+            'DB_POOL=True needs psycopg 3 and its pool (requirements.txt '
+            'installs psycopg2): pip install "psycopg[binary,pool]"'
+        )
+DB_POOL_OPTIONS = {
+    "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+    "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+    "timeout": config("DB_POOL_TIMEOUT", default=10, cast=int),  # wait for a free connection
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -183,16 +323,48 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='admin'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # seconds a connection is reused; must be 0 with the pool
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,  # drop dead persistent connections
+        'OPTIONS': {'pool': DB_POOL_OPTIONS} if DB_POOL else {},
     }
 }
 
+# Read replica (api.db_routing): reads of GET requests go to the replica,
+# writes and transactions to the primary. In tests the replica mirrors the
+# default database
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.db_routing.PrimaryReplicaRouter']
+READ_YOUR_WRITES_SECONDS = 5  # reads pinned to the primary after a write
+
 # Logging
-LOG_DIR = BASE_DIR / 'logs'
-LOG_DIR.mkdir(exist_ok=True)
+LOG_DIR = BASE_DIR / 'logs'  # created by configure_logging
+# Handlers run on a background thread (api.log_handlers); request threads
+# only enqueue records
+LOGGING_CONFIG = 'api.log_handlers.configure_logging'
+LOG_QUEUE_ENABLED = config("LOG_QUEUE_ENABLED", default=True, cast=bool)
+LOG_QUEUE_SIZE = 10000  # records; further records are dropped, not waited for
 LOGGING = {
     'version': 1,  # version of the logging configuration
     'disable_existing_loggers': False,  # dont disable existing loggers
 
+    # at most 10 identical warnings/errors per minute (same message template)
+    'filters': {
+        'rate_limit': {
+            '()': 'api.log_handlers.RateLimitFilter',
+            'rate': 10,
+            'per': 60,
+        },
+    },
+
     # define different formats for logs
     'formatters': {
         'verbose': {
@@ -210,6 +382,7 @@ LOGGING = {
         'console': {
             'class': 'logging.StreamHandler',  # log to the console
             'formatter': 'simple',  # use the simple formatter
+            'filters': ['rate_limit'],
         },
         'file': {
             'class': 'logging.handlers.RotatingFileHandler',  # log to a file
@@ -217,12 +390,14 @@ LOGGING = {
             'maxBytes': 5 * 1024 * 1024,  # rotate logs every 5MB
             'backupCount': 3,
             'formatter': 'verbose',
+            'filters': ['rate_limit'],
         },
         'error_file': {
             'class': 'logging.FileHandler',
             'filename': LOG_DIR / 'errors.log', 
             'formatter': 'verbose',
             'level': 'ERROR',  # only log ERROR and above level messages
+            'filters': ['rate_limit'],
         },
     },
 
@@ -21,30 +21,38 @@ from django.conf.urls.static import static
 from django.urls import path, include
 from decouple import config
 
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
 version = settings.API_VERSION[0]
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="TaskManagerSystem API",
-        default_version=f"v{version}",
-        description="Documentation for the TaskManagerSystem API",
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+
+def schema_view(factory, *args):
+    """
+    api.schema.SchemaView.<factory>(*args), imported on the first docs
+    request: API workers never load the drf_yasg generators and renderers
+    """
+    view = None
+
+    def schema_view(request, *view_args, **view_kwargs):
+        nonlocal view
+        if view is None:
+            from api.schema import SchemaView
+
+            view = getattr(SchemaView, factory)(*args)
+        return view(request, *view_args, **view_kwargs)
+
+    return schema_view
+
 
 urlpatterns = [
     path(config("ADMIN_URL", default="admin/"), admin.site.urls),
     path(f'api/v{version}/', include('api.urls')),
-    
-    # Swagger & ReDoc
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]
 
+if settings.DOCS_ENABLED:
+    # Swagger & ReDoc (prebuilt schema: manage.py build_openapi_schema)
+    urlpatterns += [
+        path('swagger.<str:format>', schema_view('without_ui'), name='schema-file'),
+        path('swagger/', schema_view('with_ui', 'swagger'), name='schema-swagger-ui'),
+        path('redoc/', schema_view('with_ui', 'redoc'), name='schema-redoc'),
+    ]
+
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
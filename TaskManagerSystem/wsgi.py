@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'TaskManagerSystem.settings')
 
 application = get_wsgi_application()
+
+# cache invalidation listener of the process (starts on the first lookup)
+from api import invalidation  # noqa: E402
+
+invalidation.enable()
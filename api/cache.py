@@ -0,0 +1,315 @@
+"""
+Two-tier cache for hot lookups (roles, membership roles, project metadata,
+authenticated users).
+
+- local tier: a bounded LRU per process; entries are served for
+  `local_timeout` seconds (None: until invalidated in this process)
+- shared tier: the Django cache (CACHES["default"], Redis or Memcached
+  across nodes), entries tagged with the version of their key and the
+  generation of the cache, read with one get_many; skipped when the
+  backend lives inside the process (LocMemCache), where no other worker
+  would see a new version
+
+invalidate() gives the key a new version in the shared tier, so entries
+stored before are ignored by every process, and drops the local entry of
+the current process; clear() does the same for every key. Inside a
+transaction both do it again on commit: a miss in between still reads the
+old row and stores it under the new version. Both publish the keys on the
+invalidation bus (api.invalidation), which evicts them from the local
+tiers of the other processes on commit; local_timeout only bounds how
+stale a lookup can be in processes without a listener.
+
+Strict caches (lookups granting access: users, membership roles) are only
+used while invalidations reach every worker (api.invalidation); otherwise
+each lookup reads the database.
+
+Misses are computed once per process (the other threads wait for the
+result) and, through a short lock in the shared tier, mostly once per
+cluster (the other processes poll the shared tier for a few tens of
+milliseconds, then compute it themselves). Misses read the primary
+database: a replica lagging behind a write would store the old row under
+the new version.
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+
+from api import invalidation
+from api.db_routing import use_primary
+from api.metrics import record_cache
+
+MISSING = object()
+DEFAULT = object()
+
+# shared tiers read by every worker of every node; the entries of any other
+# backend (FileBasedCache: one per node) are dropped by each receiver of an
+# invalidation
+CLUSTER_BACKENDS = (RedisCache, BaseMemcachedCache, DatabaseCache)
+
+_instances = []
+
+
+class TwoTierCache:
+    """
+    get_or_set(key, compute) returns the cached value of key (a string)
+    or stores compute(); None is a value. Values are pickled in the shared
+    tier and copied (copy.copy) on local hits, so callers may modify the
+    model instances they get. `strict`: bypassed unless invalidations
+    reach every worker
+    """
+
+    LOCK_TIMEOUT = 5  # seconds a miss holds the lock at most
+    # seconds other processes wait for the lock holder before computing too:
+    # a slow query must not stall every lookup of the key
+    LOCK_WAIT = 0.05
+    POLL_INTERVAL = 0.01
+
+    def __init__(
+        self, name, timeout=DEFAULT, local_timeout=DEFAULT, local_size=None,
+        cache_alias="default", strict=False,
+    ):
+        self.name = name
+        self.strict = strict
+        self.timeout = (
+            settings.TWO_TIER_CACHE_TIMEOUT if timeout is DEFAULT else timeout
+        )
+        self.local_timeout = (
+            settings.TWO_TIER_CACHE_LOCAL_TIMEOUT
+            if local_timeout is DEFAULT else local_timeout
+        )
+        self.local_size = local_size or settings.TWO_TIER_CACHE_LOCAL_SIZE
+        self.cache_alias = cache_alias
+        self.prefix = f"two-tier:{name}"
+        self._local = OrderedDict()  # key -> (expires at or None, value)
+        self._invalidations = 0  # computed values older than this are not kept
+        self._flights = {}  # key -> [lock, waiting threads]
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+        _instances.append(self)
+        invalidation.register(self)
+
+    def _after_fork(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def shared(self):
+        """Whether the shared tier is seen by the other workers"""
+        return not isinstance(self.cache, LocMemCache)
+
+    def get_or_set(self, key, compute):
+        invalidation.ensure_listening()
+        if self.strict and not invalidation.reaches_every_worker():
+            # other workers would keep serving an invalidated entry
+            with use_primary():
+                return compute()
+        value = self._get_local(key)
+        record_cache(f"{self.name}.local", value is not MISSING)
+        if value is not MISSING:
+            return value
+
+        with self._flight(key):
+            value = self._get_local(key)  # computed by the thread we waited for
+            if value is not MISSING:
+                return value
+
+            invalidations = self._invalidations
+            value, tag = self._get_shared(key)
+            if self.shared:
+                record_cache(f"{self.name}.shared", value is not MISSING)
+            if value is MISSING:
+                value = self._compute(key, tag, compute)
+            if invalidations == self._invalidations:
+                self._set_local(key, value)
+            return copy.copy(value)
+
+    def set(self, key, value):
+        """Stores a value computed by the caller (warming)"""
+        if self.shared:
+            _, tag = self._get_shared(key)
+            self.cache.set(self._value_key(key), (tag, value), self.timeout)
+        self._set_local(key, value)
+
+    def invalidate(self, *keys):
+        """Drops the keys from the shared tier and the local tier"""
+        if not keys:
+            return
+        self._bump_versions(keys)
+        invalidation.publish(self.name, keys)
+        self._on_commit(partial(self._bump_versions, keys))
+
+    def clear(self):
+        """Drops every key from the shared tier and the local tiers"""
+        self._bump_generation()
+        invalidation.publish(self.name)
+        self._on_commit(self._bump_generation)
+
+    def _bump_versions(self, keys):
+        if self.shared:
+            version = time.time_ns()
+            self.cache.set_many(
+                {self._version_key(key): version for key in keys},
+                self._tag_timeout(),
+            )
+        self.evict_local(keys)
+
+    def _bump_generation(self):
+        if self.shared:
+            self.cache.set(
+                self._generation_key(), time.time_ns(), self._tag_timeout()
+            )
+        self.clear_local()
+
+    @staticmethod
+    def _on_commit(bump):
+        # until the commit, misses of other connections read the old rows
+        # and store them under the new version: bump it again once the
+        # write is visible
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(bump)
+
+    def apply_invalidation(self, keys=None):
+        """
+        Applies an invalidation received from the bus (None: every key):
+        the writer already gave the keys a new version in a shared tier
+        every worker reads, any other shared tier is updated here
+        """
+        if isinstance(self.cache, CLUSTER_BACKENDS):
+            if keys is None:
+                self.clear_local()
+            else:
+                self.evict_local(keys)
+        elif keys is None:
+            self._bump_generation()
+        else:
+            self._bump_versions(keys)
+
+    def evict_local(self, keys):
+        with self._lock:
+            self._invalidations += 1
+            for key in keys:
+                self._local.pop(key, None)
+
+    def clear_local(self):
+        with self._lock:
+            self._invalidations += 1
+            self._local.clear()
+
+    def _tag_timeout(self):
+        # a new version must outlive the entries stored with the old one
+        return None if self.timeout is None else 2 * self.timeout
+
+    def _value_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def _version_key(self, key):
+        return f"{self.prefix}:{key}:version"
+
+    def _generation_key(self):
+        return f"{self.prefix}:generation"
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return MISSING
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._local[key]
+                return MISSING
+            self._local.move_to_end(key)
+        return copy.copy(value)
+
+    def _set_local(self, key, value):
+        if self.local_timeout == 0:
+            return
+        expires = (
+            None if self.local_timeout is None
+            else time.monotonic() + self.local_timeout
+        )
+        with self._lock:
+            self._local[key] = (expires, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def _get_shared(self, key):
+        """Returns (value or MISSING, current tag of the key)"""
+        if not self.shared:
+            return MISSING, None
+        value_key = self._value_key(key)
+        version_key, generation_key = (
+            self._version_key(key), self._generation_key()
+        )
+        found = self.cache.get_many([value_key, version_key, generation_key])
+        tag = (found.get(generation_key), found.get(version_key))
+        entry = found.get(value_key)
+        if entry is not None and entry[0] == tag:
+            return entry[1], tag
+        return MISSING, tag
+
+    def _compute(self, key, tag, compute):
+        if not self.shared:
+            with use_primary():
+                return compute()
+        value_key = self._value_key(key)
+        lock_key = f"{value_key}:lock"
+        locked = self.cache.add(lock_key, 1, self.LOCK_TIMEOUT)
+        if not locked:
+            # another process computes it: wait for its result
+            deadline = time.monotonic() + self.LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(self.POLL_INTERVAL)
+                value, tag = self._get_shared(key)
+                if value is not MISSING:
+                    return value
+        try:
+            with use_primary():
+                value = compute()
+            # stored with the tag read before computing: an invalidation
+            # in the meantime makes it a miss
+            self.cache.set(value_key, (tag, value), self.timeout)
+            return value
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
+
+    @contextmanager
+    def _flight(self, key):
+        """Lets one thread of the process compute the key at a time"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = [threading.Lock(), 0]
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[key]
+
+
+def clear_local_caches():
+    """Empties the local tier of every two-tier cache of the process"""
+    for two_tier_cache in _instances:
+        two_tier_cache.clear_local()
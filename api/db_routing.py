@@ -0,0 +1,105 @@
+"""
+Read-replica routing with read-your-writes.
+
+ReplicaRoutingMiddleware picks the database alias of each request:
+- safe methods (GET, HEAD, OPTIONS) read from a replica of READ_REPLICAS
+- unsafe methods use the primary only, and pin the client to the primary
+  for READ_YOUR_WRITES_SECONDS so that its next reads see its own writes
+
+A pin is remembered two ways: a cookie (browsers) and a cache entry keyed
+by the Authorization header (API clients; needs a cache shared by all
+workers to hold across processes).
+
+PrimaryReplicaRouter sends writes to the primary, and reads to the
+request's alias, except inside transaction.atomic blocks on the primary
+(join_project, assign_role, ...), which always read from the primary.
+Code outside requests (commands, shell) always uses the primary.
+"""
+
+import hashlib
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = "primary_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_read_alias = ContextVar("read_alias", default=None)
+
+
+@contextmanager
+def use_database(alias):
+    """Routes the reads of the block to the given alias"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_primary():
+    return use_database(DEFAULT_DB_ALIAS)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or alias == DEFAULT_DB_ALIAS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replicas hold the same data
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.READ_REPLICAS
+
+
+#
+# === READ-YOUR-WRITES PINS ===
+#
+
+def _pin_cache_key(request):
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if not authorization:
+        return None
+    digest = hashlib.sha256(authorization.encode()).hexdigest()[:32]
+    return f"db:primary-pin:{digest}"
+
+
+def is_pinned(request):
+    try:
+        if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = _pin_cache_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+def pin_to_primary(request, response):
+    window = settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        PIN_COOKIE, f"{time.time() + window:.3f}", max_age=window,
+        httponly=True, samesite="Lax",
+    )
+    key = _pin_cache_key(request)
+    if key is not None:
+        cache.set(key, 1, window)
+
+
+def choose_read_alias(request):
+    """Database alias for the reads of a request"""
+    if request.method not in SAFE_METHODS or is_pinned(request):
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.READ_REPLICAS)
@@ -0,0 +1,262 @@
+"""
+In-process publish/subscribe broker for server-sent events.
+
+Events are serialized once per publish into a ready-to-send SSE frame;
+every subscriber of the channel receives the very same bytes object, so
+fan-out costs one queue append per subscriber.
+
+The broker delivers through a pluggable backend (settings.EVENTS_BACKEND):
+- LocalEventBackend delivers inside the current process (single worker,
+  tests)
+- PostgresEventBackend forwards frames with NOTIFY to every worker and
+  node, whose invalidation listener (api.invalidation) calls
+  broker.dispatch() for them
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from api import invalidation
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data) -> bytes:
+    """Encodes a single Server-Sent Events frame"""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode()
+
+
+class BaseEventBackend:
+    """
+    Transport between publishers and the broker of every node
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, channel: str, frame: bytes):
+        raise NotImplementedError
+
+    def has_listeners(self, channel: str) -> bool:
+        """
+        Lets publishers skip serialization when nobody listens;
+        cross-node backends cannot know that and always answer True
+        """
+        return True
+
+
+class LocalEventBackend(BaseEventBackend):
+    """Delivers frames to the subscribers of this process only"""
+
+    def publish(self, channel, frame):
+        self.broker.dispatch(channel, frame)
+
+    def has_listeners(self, channel):
+        return self.broker.subscriber_count(channel) > 0
+
+
+class PostgresEventBackend(BaseEventBackend):
+    """
+    Delivers frames to the subscribers of every process through NOTIFY on
+    the database (received by the listener of api.invalidation); frames
+    over the NOTIFY payload limit are replaced by a `resync` event
+    """
+
+    def __init__(self, broker):
+        super().__init__(broker)
+        invalidation.ensure_listening(force=True)
+
+    def publish(self, channel, frame):
+        payload = self.encode(channel, frame)
+        if len(payload) > invalidation.MAX_PAYLOAD:
+            logger.warning("Event frame too large for %s, sending resync", channel)
+            payload = self.encode(
+                channel, format_sse("resync", {"reason": "event too large"})
+            )
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)", [invalidation.EVENTS_CHANNEL, payload]
+            )
+
+    @staticmethod
+    def encode(channel, frame):
+        return json.dumps(
+            {"ch": channel, "f": frame.decode()}, separators=(",", ":")
+        )
+
+
+class Subscription:
+    """
+    A single client stream: a bounded queue fed from any thread
+    and consumed inside the event loop that created it
+    """
+
+    def __init__(self, broker, channels, loop, maxsize):
+        self.broker = broker
+        self.channels = set(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _put(self, frame):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # a slow client must not grow memory without bound
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    def deliver(self, frame):
+        self.loop.call_soon_threadsafe(self._put, frame)
+
+    async def get(self):
+        """Returns the next frame, or None if the client fell behind"""
+        return await self.queue.get()
+
+    def remove_channel(self, channel):
+        self.broker.unsubscribe(self, [channel])
+        self.channels.discard(channel)
+
+    def close(self):
+        self.broker.unsubscribe(self, list(self.channels))
+
+
+class EventBroker:
+    """
+    Channel registry with one serialization per published event
+    """
+
+    def __init__(self, backend_path=None, queue_size=None):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self.queue_size = queue_size or settings.EVENTS_SUBSCRIBER_QUEUE_SIZE
+        backend_class = import_string(backend_path or settings.EVENTS_BACKEND)
+        self.backend = backend_class(self)
+
+    def subscribe(self, channels, loop=None):
+        subscription = Subscription(
+            self, channels, loop or asyncio.get_running_loop(), self.queue_size
+        )
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription, channels):
+        with self._lock:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def has_listeners(self, channel):
+        return self.backend.has_listeners(channel)
+
+    def publish(self, channel, event, data):
+        """
+        Serializes the event once and hands it to the backend.
+        `data` may be a callable, evaluated only if somebody listens
+        """
+        if not self.has_listeners(channel):
+            return
+        frame = format_sse(event, data() if callable(data) else data)
+        try:
+            self.backend.publish(channel, frame)
+        except Exception:
+            logger.exception("Failed to publish event %s to %s", event, channel)
+
+    def dispatch(self, channel, frame):
+        """Fans a ready frame out to the local subscribers of the channel"""
+        with self._lock:
+            subscribers = tuple(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(frame)
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+REVOKED_EVENT = "channel.revoked"
+_REVOKED_PREFIX = f"event: {REVOKED_EVENT}\n".encode()
+
+
+async def event_stream(subscription, heartbeat=None):
+    """
+    Async generator of SSE frames for a subscription:
+    - sends a comment heartbeat when idle, so proxies keep the connection
+    - honours `channel.revoked` events by leaving the revoked channel
+    - ends with a `resync` event if the client fell behind
+    """
+    heartbeat = heartbeat or settings.EVENTS_HEARTBEAT_SECONDS
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+
+            if frame is None:
+                yield format_sse("resync", {"reason": "client too slow"})
+                return
+            if frame.startswith(_REVOKED_PREFIX):
+                data = frame.split(b"data: ", 1)[1]
+                subscription.remove_channel(json.loads(data)["channel"])
+            yield frame
+    finally:
+        subscription.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> EventBroker:
+    """Returns the process-wide broker, creating it on first use"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = EventBroker()
+    return _broker
+
+
+def _dispatch_notification(payload):
+    """Hands a frame received from PostgresEventBackend to the broker"""
+    if _broker is None:
+        return  # nobody subscribed in this process yet
+    try:
+        message = json.loads(payload)
+        channel, frame = message["ch"], message["f"].encode()
+    except (ValueError, KeyError, TypeError, AttributeError):
+        logger.warning("Invalid event notification: %r", payload)
+        return
+    _broker.dispatch(channel, frame)
+
+
+invalidation.add_handler(invalidation.EVENTS_CHANNEL, _dispatch_notification)
+
+
+def project_channel(project_id):
+    return f"project:{project_id}"
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
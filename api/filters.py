@@ -0,0 +1,24 @@
+from rest_framework.filters import OrderingFilter
+
+
+class AliasOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter with terms standing for other orderings:
+    `view.ordering_aliases` maps a term of `ordering_fields` to the
+    fields the queryset is ordered by ("-term" reverses each of them)
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        aliases = getattr(view, "ordering_aliases", {})
+        if not ordering or not aliases:
+            return ordering
+
+        resolved = []
+        for term in ordering:
+            descending = term.startswith("-")
+            for field in aliases.get(term.lstrip("-"), [term.lstrip("-")]):
+                if descending:
+                    field = field[1:] if field.startswith("-") else f"-{field}"
+                resolved.append(field)
+        return resolved
@@ -0,0 +1,111 @@
+"""
+SQL instrumentation: counts queries and database time of a block of code
+on every database connection through execute wrappers (works with
+DEBUG=False, unlike connection.queries).
+
+Used by QueryInstrumentationMiddleware for Server-Timing headers and
+query budgets, and by the tests to lock in query counts.
+"""
+
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+class QueryStats:
+    """Queries, database time and repeated statements of one block"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.statements = Counter()
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    @property
+    def duplicates(self):
+        """Executions of already seen statements (N+1 suspects)"""
+        return self.count - len(self.statements)
+
+    def most_repeated(self, limit=3):
+        return [
+            (sql, times) for sql, times in self.statements.most_common(limit)
+            if times > 1
+        ]
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+
+@contextmanager
+def instrument_queries(using=None):
+    """
+    Collects QueryStats of the queries run inside the block on the given
+    database aliases (all configured databases by default)
+    """
+    stats = QueryStats()
+    aliases = using or list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+
+def resolve_view(request, match=None):
+    """
+    Returns (view, view class, action) of the view that handled the request
+    (or of the given ResolverMatch); the class is None for plain Django
+    views, the action None outside viewsets
+    """
+    match = match or getattr(request, "resolver_match", None)
+    if match is None:
+        return None, None, None
+
+    view = match.func
+    view_class = getattr(view, "cls", None)
+    actions = getattr(view, "actions", None) or {}
+    return view, view_class, actions.get(request.method.lower())
+
+
+def get_view_name(request, match=None):
+    """
+    Low-cardinality name of the view that handled the request
+    ("TaskViewSet.list", "api_status"), "unmatched" for 404s of the resolver
+    """
+    match = match or getattr(request, "resolver_match", None)
+    view, view_class, action = resolve_view(request, match)
+    if view is None:
+        return "unmatched"
+    if view_class is None:
+        return getattr(view, "__name__", match.view_name)
+    if action is None:
+        return view_class.__name__
+    return f"{view_class.__name__}.{action}"
+
+
+def get_query_budget(request):
+    """
+    Returns the query budget of the view that handled the request:
+    viewsets declare `query_budgets = {"list": 5, "*": 10}` keyed by
+    action ("*" is the default), function views a `query_budget` attribute
+    """
+    view, view_class, action = resolve_view(request)
+    if view is None:
+        return None, None
+
+    budgets = getattr(view_class, "query_budgets", None)
+    if budgets is not None:
+        budget = budgets.get(action, budgets.get("*"))
+    else:
+        budget = getattr(view, "query_budget", None)
+    return budget, get_view_name(request)
@@ -0,0 +1,239 @@
+"""
+Invalidation bus for the local tiers of the two-tier caches (api.cache).
+
+TwoTierCache.invalidate() and clear() publish a compact message,
+{"c": cache name, "k": [keys]} (no "k": every key), with NOTIFY on the
+connection of the write: inside a transaction PostgreSQL delivers it on
+commit and drops it on rollback. Every process runs a listener thread on
+its own connection (LISTEN) that evicts the keys from its local tiers (and
+from its shared tier when the other nodes do not read it, see
+api.cache.CLUSTER_BACKENDS), so the other workers and nodes drop an entry
+milliseconds after the commit and local tiers can keep entries for long.
+
+The listener starts with the first cache lookup of a process that enabled
+it (wsgi.py, asgi.py), i.e. in each worker after the gunicorn fork. On
+every (re)connection it empties the local tiers, as messages may have been
+missed while it was not listening.
+
+With another database (SQLite) messages are delivered to the current
+process only, after commit.
+
+The listener connection also carries the server-sent events of
+api.events.PostgresEventBackend (EVENTS_CHANNEL): other modules register
+the handler of their channel with add_handler().
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+EVENTS_CHANNEL = "task_events"  # api.events.PostgresEventBackend
+MAX_PAYLOAD = 7900  # NOTIFY payloads are limited to 8000 bytes
+
+_caches = {}  # cache name -> local tiers to evict (TwoTierCache instances)
+
+
+def register(cache):
+    _caches.setdefault(cache.name, []).append(cache)
+
+
+def encode(cache_name, keys=None):
+    """Messages for the keys (None: every key), each under MAX_PAYLOAD"""
+    if keys is None:
+        return [_dumps({"c": cache_name})]
+    messages, chunk, size = [], [], len(cache_name) + 16
+    for key in keys:
+        key_size = len(json.dumps(key)) + 1
+        if chunk and size + key_size > MAX_PAYLOAD:
+            messages.append(_dumps({"c": cache_name, "k": chunk}))
+            chunk, size = [], len(cache_name) + 16
+        chunk.append(key)
+        size += key_size
+    if chunk:
+        messages.append(_dumps({"c": cache_name, "k": chunk}))
+    return messages
+
+
+def _dumps(message):
+    return json.dumps(message, separators=(",", ":"))
+
+
+def publish(cache_name, keys=None, using="default"):
+    """Evicts the keys (None: every key) from the local tiers everywhere"""
+    if not settings.CACHE_INVALIDATION_BUS:
+        return
+    connection = connections[using]
+    for payload in encode(cache_name, keys):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+        else:
+            transaction.on_commit(partial(dispatch, payload), using=using)
+
+
+def dispatch(payload):
+    """Applies a message to the caches of the process"""
+    try:
+        message = json.loads(payload)
+        name, keys = message["c"], message.get("k")
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Invalid cache invalidation message: %r", payload)
+        return
+    for cache in _caches.get(name, ()):
+        cache.apply_invalidation(keys)
+
+
+def clear_local():
+    for caches in _caches.values():
+        for cache in caches:
+            cache.clear_local()
+
+
+# channel -> handler of its payloads; every channel is listened to from
+# the start, messages of a channel without a handler are dropped
+_handlers = {CHANNEL: dispatch}
+
+
+def add_handler(channel, handler):
+    if channel not in (CHANNEL, EVENTS_CHANNEL):
+        raise ValueError(f"Unknown notification channel: {channel}")
+    _handlers[channel] = handler
+
+
+class Listener:
+    """
+    LISTEN loop on a dedicated connection (not Django's: it lives as long
+    as the process), reconnecting after failures
+    """
+
+    IDLE_SECONDS = 10  # a quiet connection is checked this often
+    RETRY_SECONDS = 1
+
+    def __init__(self, using="default"):
+        self.using = using
+        self.connected = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self.run, name="cache-invalidation", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+
+    def run(self):
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = self.connect()
+                clear_local()  # messages may have been missed until now
+                self.connected.set()
+                while not self._stopping.is_set():
+                    for channel, payload in self.wait(connection):
+                        handler = _handlers.get(channel)
+                        if handler is not None:
+                            handler(payload)
+            except Exception:
+                logger.warning(
+                    "Cache invalidation listener disconnected", exc_info=True
+                )
+            finally:
+                self.connected.clear()
+                if connection is not None:
+                    connection.close()
+            self._stopping.wait(self.RETRY_SECONDS)
+
+    def connect(self):
+        wrapper = connections[self.using]  # only for its connection settings
+        connection = wrapper.Database.connect(**wrapper.get_connection_params())
+        connection.autocommit = True
+        cursor = connection.cursor()
+        for channel in (CHANNEL, EVENTS_CHANNEL):
+            cursor.execute(f"LISTEN {channel}")
+        return connection
+
+    def wait(self, connection):
+        """(channel, payload) pairs received within IDLE_SECONDS"""
+        if callable(connection.notifies):  # psycopg 3
+            payloads = [
+                (notify.channel, notify.payload)
+                for notify in connection.notifies(timeout=self.IDLE_SECONDS)
+            ]
+        else:
+            # any query (the idle check too) also receives notifications
+            if not connection.notifies and select.select(
+                [connection], [], [], self.IDLE_SECONDS
+            )[0]:
+                connection.poll()  # raises if the connection was lost
+            payloads = [
+                (notify.channel, notify.payload) for notify in connection.notifies
+            ]
+            connection.notifies.clear()
+        if not payloads:
+            connection.cursor().execute("SELECT 1")
+        return payloads
+
+
+_enabled = False
+_workers = False  # the process is a server worker (wsgi.py, asgi.py)
+_listener = None
+_listener_lock = threading.Lock()
+_inherited = []
+
+
+def enable():
+    """Lets ensure_listening() start the listener of the process"""
+    global _enabled, _workers
+    _workers = True
+    _enabled = settings.CACHE_INVALIDATION_BUS
+
+
+def reaches_every_worker():
+    """
+    Whether invalidations evict the local tiers of every worker on commit:
+    the listener runs, or the process is not one of several workers
+    (commands, runserver, tests)
+    """
+    ensure_listening()
+    return not _workers or bool(_enabled and _listener)
+
+
+def ensure_listening(force=False):
+    """
+    Starts the listener of the process once (first cache lookup of an
+    enabled process; `force`: an event backend needs it regardless)
+    """
+    global _listener
+    if _listener is not None or not (_enabled or force):
+        return
+    with _listener_lock:
+        if _listener is None:
+            if connections["default"].vendor != "postgresql":
+                _listener = False  # in-process delivery only
+                return
+            _listener = Listener()
+            _listener.start()
+
+
+def _after_fork():
+    global _listener, _listener_lock
+    if _listener:
+        # its connection belongs to the parent: keep it open, and unused
+        _inherited.append(_listener)
+    _listener = None
+    _listener_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,178 @@
+"""
+Non-blocking logging: request threads only put records on a queue, a
+background thread runs the real handlers (file writes, rotation, tracebacks
+formatting).
+
+configure_logging (settings.LOGGING_CONFIG) creates the log directories,
+applies settings.LOGGING as usual, then wraps every configured handler in
+an AsyncHandler sharing one LogDispatcher thread, so logger routing and
+handler levels stay exactly as configured. When the queue is full,
+records are dropped (and counted) rather than blocking the request.
+
+RateLimitFilter caps repeated warnings and errors: records with the same
+logger, level and message template (hence %-style arguments, not f-strings)
+pass `rate` times per `per` seconds; the next one passing reports how many
+were suppressed.
+"""
+
+import atexit
+import logging
+import logging.config
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+
+class LogDispatcher:
+    """Background thread handing queued records to their target handlers"""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._start()
+
+    def _start(self):
+        self.queue = queue.Queue(self.maxsize)
+        self._thread = threading.Thread(
+            target=self._run, name="log-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, handler, record):
+        try:
+            self.queue.put_nowait((handler, record))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            handler, record = item
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                handler.handle(logging.makeLogRecord({
+                    "name": __name__, "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Log queue full: {dropped} record(s) dropped",
+                }))
+            try:
+                handler.handle(record)
+            except Exception:
+                handler.handleError(record)
+
+    def stop(self):
+        """Flushes the queued records and stops the thread"""
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join()
+
+    def restart_after_fork(self):
+        # only the forking thread survives in the child
+        self.dropped = 0
+        self._start()
+
+
+class AsyncHandler(logging.Handler):
+    """
+    Queues records for `target`, taking over its level and filters so
+    that filtering happens before queueing
+    """
+
+    def __init__(self, target, dispatcher):
+        super().__init__(target.level)
+        self.target = target
+        self.dispatcher = dispatcher
+        self.filters, target.filters = target.filters, []
+
+    def emit(self, record):
+        # arguments may be mutated once the call returns: render the message
+        # now (cheap); tracebacks are formatted by the dispatcher thread
+        record.msg = record.getMessage()
+        record.args = None
+        self.dispatcher.put(self.target, record)
+
+    def flush(self):
+        self.target.flush()
+
+    def close(self):
+        self.target.close()
+        super().close()
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets `rate` similar WARNING+ records through per `per` seconds"""
+
+    def __init__(self, rate=10, per=60.0, level=logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self.level = level
+        self._windows = {}  # key -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.per:
+                suppressed = window[2] if window else 0
+                if len(self._windows) > 10000:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.rate:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+
+        if suppressed:
+            record.msg = (
+                f"{record.getMessage()} "
+                f"({suppressed} similar message(s) suppressed)"
+            )
+            record.args = None
+        return True
+
+
+DISPATCHER = None
+
+
+def configure_logging(config):
+    """settings.LOGGING_CONFIG: dictConfig, then queue all handlers"""
+    for handler in config.get("handlers", {}).values():
+        if "filename" in handler:
+            os.makedirs(os.path.dirname(handler["filename"]), exist_ok=True)
+    logging.config.dictConfig(config)
+    if settings.LOG_QUEUE_ENABLED:
+        install_queue(settings.LOG_QUEUE_SIZE)
+
+
+def install_queue(maxsize=10000):
+    global DISPATCHER
+    if DISPATCHER is None:
+        DISPATCHER = LogDispatcher(maxsize)
+        atexit.register(DISPATCHER.stop)
+        os.register_at_fork(after_in_child=DISPATCHER.restart_after_fork)
+
+    wrapped = {}
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)
+    ]
+    for logger in loggers:
+        for index, handler in enumerate(logger.handlers):
+            if isinstance(handler, AsyncHandler):
+                continue
+            if handler not in wrapped:
+                wrapped[handler] = AsyncHandler(handler, DISPATCHER)
+            logger.handlers[index] = wrapped[handler]
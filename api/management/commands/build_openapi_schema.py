@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the OpenAPI schema of API_VERSION to OPENAPI_SCHEMA_DIR "
+        "(JSON and YAML), served by /swagger/ and /redoc/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Fail if the artifacts are missing or out of date "
+                 "(the API changed without a rebuild)",
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+        stale = []
+        for fmt in schema.CODECS:
+            content = schema.generate_schema(fmt)
+            path = schema.artifact_path(fmt)
+            if options["check"]:
+                try:
+                    with open(path, "rb") as fp:
+                        if fp.read() != content:
+                            stale.append(path)
+                except FileNotFoundError:
+                    stale.append(path)
+                continue
+
+            with open(f"{path}.tmp", "wb") as fp:
+                fp.write(content)
+            os.replace(f"{path}.tmp", path)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
+
+        if stale:
+            raise CommandError(f"Out of date: {', '.join(stale)}")
@@ -0,0 +1,62 @@
+import pstats
+import shutil
+from io import StringIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Lists and exports request profiles recorded by ProfilingMiddleware, "
+        "or prints an X-Profile header token that forces profiling"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["list", "show", "export", "token"])
+        parser.add_argument("name", nargs="?", help="Profile file name")
+        parser.add_argument(
+            "--output", help="export: destination file (default: the name)"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=30,
+            help="show: number of functions of cProfile profiles",
+        )
+
+    def handle(self, *args, **options):
+        action = options["action"]
+        if action == "token":
+            self.stdout.write(profiling.make_profile_token())
+        elif action == "list":
+            self.list_profiles()
+        else:
+            path = profiling.get_profile_path(options["name"] or "")
+            if path is None:
+                raise CommandError(f"Profile not found: {options['name']}")
+            if action == "export":
+                output = options["output"] or options["name"]
+                shutil.copyfile(path, output)
+                self.stdout.write(self.style.SUCCESS(f"Exported to {output}"))
+            else:
+                self.show(path, options["limit"])
+
+    def list_profiles(self):
+        profiles = profiling.list_profiles()
+        if not profiles:
+            self.stdout.write("No profiles recorded")
+        for info in profiles:
+            self.stdout.write(
+                f"{info['name']}  {info['created_at']:%Y-%m-%d %H:%M:%S}  "
+                f"{info['method']} {info['view']}  {info['duration_ms']} ms"
+            )
+
+    def show(self, path, limit):
+        if path.endswith(".prof"):
+            out = StringIO()
+            stats = pstats.Stats(path, stream=out)
+            stats.sort_stats("cumulative").print_stats(limit)
+            self.stdout.write(out.getvalue())
+        else:  # collapsed stacks are already flamegraph input
+            with open(path) as fp:
+                self.stdout.write(fp.read(), ending="")
@@ -0,0 +1,51 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from api import querylog
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the SQL fingerprints that dominate database time, merged "
+        "from the slow query log of all workers (QUERY_LOG_ENABLED)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sort", choices=list(querylog.SORT_KEYS), default="total",
+        )
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--plans", action="store_true",
+            help="Print the EXPLAIN plans of slow fingerprints",
+        )
+        parser.add_argument(
+            "--reset", action="store_true",
+            help="Delete the collected aggregates after reporting",
+        )
+
+    def handle(self, *args, **options):
+        queries = querylog.top_queries(options["sort"], options["limit"])
+        if not queries:
+            self.stdout.write("No queries recorded")
+
+        for rank, query in enumerate(queries, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"#{rank} [{query['id']}] {query['count']} calls, "
+                f"total {query['total_ms']:.1f} ms, mean {query['mean_ms']:.2f} ms, "
+                f"max {query['max_ms']:.1f} ms, {query['slow']} slow"
+            ))
+            self.stdout.write(f"  {query['fingerprint'][:500]}")
+            for source, count in query["sources"]:
+                self.stdout.write(f"  {count:>8}  {source}")
+            if options["plans"] and query["plan"]:
+                for line in query["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if options["reset"]:
+            directory = querylog.get_query_log_dir()
+            if querylog.QUERY_LOG is not None:
+                querylog.QUERY_LOG.reset()
+            for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                os.remove(os.path.join(directory, name))
@@ -0,0 +1,422 @@
+import base64
+import json
+import multiprocessing
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from projects.models import (
+    Project, ProjectMembership, ProjectShareLink, Role,
+)
+from projects.services import ProjectRollupService
+from tasks.models import Category, Task
+
+User = get_user_model()
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Lets bulk_create keep the generated created_at/updated_at values
+    instead of auto_now/auto_now_add overwriting them with now()
+    """
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) or getattr(
+                field, "auto_now_add", False
+            ):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def skewed_weights(count, alpha=1.1):
+    """Cumulative Zipf-like weights: a few heavy users/projects, a long tail"""
+    return list(accumulate(1 / (rank ** alpha) for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a deterministic synthetic dataset for benchmarking: "
+        "users, projects with skewed membership sizes, categories, tasks, "
+        "share links and outstanding tokens. Rows are inserted with "
+        "bulk_create in chunks (no per-row signals, one password hash)"
+    )
+
+    HISTORY_DAYS = 180
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--projects", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--chunk-size", type=int, default=10_000,
+            help="Rows per bulk_create statement/transaction",
+        )
+        parser.add_argument(
+            "--password", default="benchmark-pass",
+            help="Password of every generated user (hashed once)",
+        )
+        parser.add_argument(
+            "--project-task-ratio", type=float, default=0.4,
+            help="Share of tasks that belong to a project",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Processes inserting task chunks in parallel "
+                 "(same data for any value)",
+        )
+        parser.add_argument(
+            "--skip-rollups", action="store_true",
+            help="Do not build burndown/velocity rollups for the projects",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1")
+        self.seed = options["seed"]
+        self.rng = random.Random(self.seed)
+        self.chunk_size = options["chunk_size"]
+        self.now = timezone.now()
+        self.prefix = f"bench{options['seed']}"
+        if User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+            raise CommandError(
+                f"Data for seed {options['seed']} already exists; "
+                "use another --seed or a fresh database"
+            )
+
+        started = time.perf_counter()
+        user_ids = self.create_users(options["users"], options["password"])
+        categories = self.create_categories(user_ids)
+        projects = self.create_projects(user_ids, options["projects"])
+        self.create_share_links(projects)
+        self.create_tokens(user_ids)
+        self.create_tasks(
+            options["tasks"], user_ids, categories, projects,
+            options["project_task_ratio"], options["workers"],
+        )
+        if projects and not options["skip_rollups"]:
+            ProjectRollupService.backfill([pk for pk, _, _ in projects])
+            self.log("rollups built")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(user_ids)} users, {len(projects)} projects and "
+            f"{options['tasks']} tasks in {time.perf_counter() - started:.1f}s"
+        ))
+
+    #
+    # === HELPERS ===
+    #
+
+    def log(self, message):
+        self.stdout.write(f"  {message}")
+
+    def bulk_insert(self, model, rows, label, keep=False):
+        """
+        Inserts an iterable of unsaved instances chunk by chunk; returns
+        the saved instances when keep=True, otherwise only their count
+        """
+        created, chunk, total = [], [], 0
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                total += self._flush(model, chunk, created if keep else None)
+                chunk = []
+                self.log(f"{label}: {total}")
+        if chunk:
+            total += self._flush(model, chunk, created if keep else None)
+        self.log(f"{label}: {total} done")
+        return created if keep else total
+
+    def _flush(self, model, chunk, created):
+        saved = self._insert_chunk(model, chunk)
+        if created is not None:
+            created += saved
+        return len(saved)
+
+    def _insert_chunk(self, model, chunk):
+        with transaction.atomic(), explicit_timestamps(model):
+            return model.objects.bulk_create(chunk, batch_size=self.chunk_size)
+
+    def past_moment(self, max_days):
+        return self.now - timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    #
+    # === GENERATORS ===
+    #
+
+    def create_users(self, count, password):
+        password_hash = make_password(password)
+        users = (
+            User(
+                username=f"{self.prefix}_{i}",
+                email=f"{self.prefix}_{i}@example.com",
+                password=password_hash,
+                date_joined=self.past_moment(self.HISTORY_DAYS * 2),
+            )
+            for i in range(count)
+        )
+        created = self.bulk_insert(User, users, "users", keep=True)
+        return [user.id for user in created]
+
+    def create_categories(self, user_ids):
+        """Returns {user_id: [category ids]} (0-5 categories per user)"""
+        names = ["Work", "Home", "Study", "Health", "Errands", "Ideas"]
+        pairs = [
+            (user_id, name)
+            for user_id in user_ids
+            for name in self.rng.sample(names, self.rng.randint(0, 5))
+        ]
+        created = self.bulk_insert(
+            Category,
+            (Category(user_id=user_id, name=name) for user_id, name in pairs),
+            "categories",
+            keep=True,
+        )
+        categories = {}
+        for category in created:
+            categories.setdefault(category.user_id, []).append(category.id)
+        return categories
+
+    def create_projects(self, user_ids, count):
+        """
+        Returns [(project_id, owner_id, member_ids)]; membership sizes
+        follow a Pareto distribution (most projects small, a few huge)
+        """
+        if not count:
+            return []
+        roles = {role.name: role.id for role in Role.objects.all()}
+        missing = set(settings.ROLE_ORDER) - set(roles)
+        if missing:
+            raise CommandError(f"Roles are missing, run migrate: {missing}")
+
+        user_weights = skewed_weights(len(user_ids))
+        owners = self.rng.choices(user_ids, cum_weights=user_weights, k=count)
+        created = [self.past_moment(self.HISTORY_DAYS) for _ in owners]
+        projects = self.bulk_insert(
+            Project,
+            (
+                Project(
+                    name=f"Project {i}", owner_id=owner_id,
+                    created_at=created[i], updated_at=created[i],
+                )
+                for i, owner_id in enumerate(owners)
+            ),
+            "projects",
+            keep=True,
+        )
+
+        result, memberships = [], []
+        member_roles = ["Viewer", "Member", "Member", "Member", "Moderator"]
+        for project in projects:
+            size = min(len(user_ids) - 1, int(self.rng.paretovariate(1.2)) - 1)
+            candidates = self.rng.sample(user_ids, min(len(user_ids), size + 1))
+            members = [pk for pk in candidates if pk != project.owner_id][:size]
+            memberships.append(ProjectMembership(
+                project_id=project.id, user_id=project.owner_id,
+                role_id=roles["Admin"],
+            ))
+            memberships += [
+                ProjectMembership(
+                    project_id=project.id, user_id=user_id,
+                    role_id=roles[self.rng.choice(member_roles)],
+                )
+                for user_id in members
+            ]
+            result.append((project.id, project.owner_id, members))
+
+        self.bulk_insert(ProjectMembership, memberships, "memberships")
+        return result
+
+    def create_share_links(self, projects):
+        roles = list(
+            Role.objects.filter(name__in=["Viewer", "Member"])
+            .values_list("id", flat=True)
+        )
+        links = (
+            ProjectShareLink(
+                token=self.uuid(),
+                project_id=project_id,
+                role_id=self.rng.choice(roles),
+                max_uses=self.rng.choice([None, 5, 10, 50]),
+                expires_at=self.now + timedelta(hours=self.rng.randint(1, 72)),
+                created_by_id=owner_id,
+                created_at=self.past_moment(7),
+            )
+            for project_id, owner_id, _ in projects
+            if self.rng.random() < 0.3
+        )
+        self.bulk_insert(ProjectShareLink, links, "share links")
+
+    def create_tokens(self, user_ids):
+        """One to three refresh tokens per user, some already expired"""
+        lifetime = settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"]
+
+        def tokens():
+            for user_id in user_ids:
+                for _ in range(self.rng.randint(1, 3)):
+                    jti = self.uuid().hex
+                    created = self.past_moment(3)
+                    payload = base64.urlsafe_b64encode(json.dumps({
+                        "token_type": "refresh", "jti": jti,
+                        "user_id": user_id,
+                        "exp": int((created + lifetime).timestamp()),
+                    }).encode()).decode().rstrip("=")
+                    yield OutstandingToken(
+                        user_id=user_id, jti=jti,
+                        token=f"eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.{payload}.{jti}",
+                        created_at=created, expires_at=created + lifetime,
+                    )
+
+        self.bulk_insert(OutstandingToken, tokens(), "outstanding tokens")
+
+    def create_tasks(self, count, user_ids, categories, projects, project_ratio,
+                     workers):
+        factory = TaskChunkFactory(
+            seed=self.seed, now=self.now, count=count,
+            chunk_size=self.chunk_size, user_ids=user_ids,
+            categories=categories, projects=projects,
+            project_ratio=project_ratio,
+        )
+        chunks = range(factory.chunk_count)
+        total = 0
+        if workers > 1 and factory.chunk_count > 1:
+            # children open their own connections; the parent one must
+            # not be shared across fork()
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            with context.Pool(
+                workers, initializer=_init_task_worker, initargs=(factory,)
+            ) as pool:
+                for inserted in pool.imap_unordered(_insert_task_chunk, chunks):
+                    total += inserted
+                    self.log(f"tasks: {total}")
+        else:
+            for index in chunks:
+                total += factory.insert(index)
+                self.log(f"tasks: {total}")
+        self.log(f"tasks: {total} done")
+
+
+class TaskChunkFactory:
+    """
+    Builds the tasks of one chunk from (seed, chunk index) alone, so the
+    dataset is the same whatever the chunk order or number of workers
+    """
+
+    PRIORITY_WEIGHTS = {"L": 30, "M": 50, "H": 20}
+
+    def __init__(self, seed, now, count, chunk_size, user_ids, categories,
+                 projects, project_ratio):
+        self.seed = seed
+        self.now = now
+        self.count = count
+        self.chunk_size = chunk_size
+        self.user_ids = user_ids
+        self.categories = categories
+        self.projects = projects
+        self.project_ratio = project_ratio
+        self.user_weights = skewed_weights(len(user_ids))
+        self.project_weights = list(accumulate(
+            len(members) + 1 for _, _, members in projects
+        ))
+        self.priorities = list(self.PRIORITY_WEIGHTS)
+        self.priority_weights = list(accumulate(self.PRIORITY_WEIGHTS.values()))
+
+    @property
+    def chunk_count(self):
+        return -(-self.count // self.chunk_size)
+
+    def build(self, index):
+        rng = random.Random(f"{self.seed}:tasks:{index}")
+        first = index * self.chunk_size
+        last = min(first + self.chunk_size, self.count)
+        return [self.build_task(rng, number) for number in range(first, last)]
+
+    def build_task(self, rng, number):
+        project_id = None
+        if self.projects and rng.random() < self.project_ratio:
+            project_id, owner_id, members = rng.choices(
+                self.projects, cum_weights=self.project_weights
+            )[0]
+            user_id = owner_id
+            if members and rng.random() < 0.7:
+                user_id = rng.choice(members)
+        else:
+            user_id = rng.choices(
+                self.user_ids, cum_weights=self.user_weights
+            )[0]
+
+        created = self.now - timedelta(
+            seconds=rng.randrange(Command.HISTORY_DAYS * 86400)
+        )
+        due = created + timedelta(
+            hours=max(1, int(rng.lognormvariate(4.5, 1.0)))
+        )
+        completed = rng.random() < (0.7 if due < self.now else 0.2)
+        completed_at = None
+        if completed:
+            latest = min(due, self.now)
+            completed_at = created + (latest - created) * rng.random()
+        user_categories = self.categories.get(user_id)
+
+        return Task(
+            title=f"Task {number}",
+            description=(
+                "" if rng.random() < 0.6 else f"Details of task {number}"
+            ),
+            due_date=due,
+            user_id=user_id,
+            project_id=project_id,
+            category_id=(
+                rng.choice(user_categories)
+                if user_categories and rng.random() < 0.5 else None
+            ),
+            priority=rng.choices(
+                self.priorities, cum_weights=self.priority_weights
+            )[0],
+            is_favorite=rng.random() < 0.05,
+            created_at=created,
+            updated_at=completed_at or created,
+            completed=completed,
+            completed_at=completed_at,
+            completed_by_id=user_id if completed else None,
+        )
+
+    def insert(self, index):
+        tasks = self.build(index)
+        with transaction.atomic(), explicit_timestamps(Task):
+            Task.objects.bulk_create(tasks, batch_size=self.chunk_size)
+        return len(tasks)
+
+
+_task_factory = None
+
+
+def _init_task_worker(factory):
+    global _task_factory
+    _task_factory = factory
+
+
+def _insert_task_chunk(index):
+    return _task_factory.insert(index)
@@ -0,0 +1,315 @@
+"""
+In-process metrics registry exposed in the Prometheus text format.
+
+Every observation is a handful of float additions into a store:
+- MemoryStore: a dict, for a single process (runserver, tests)
+- MmapStore: a per-process memory-mapped file in
+  settings.METRICS_MULTIPROCESS_DIR; the scrape sums the files of all
+  workers, so any gunicorn worker serves the totals of the whole server
+
+Empty METRICS_MULTIPROCESS_DIR on deploy (before workers start): counters
+of dead workers are kept, as they are cumulative.
+
+Histograms store non-cumulative bucket counts (one addition per
+observation) and are made cumulative at scrape time.
+"""
+
+import glob
+import math
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+HEADER = struct.Struct("<i4x")  # used bytes + padding to 8
+VALUE = struct.Struct("<d")
+KEY_LENGTH = struct.Struct("<i")
+
+
+class MemoryStore:
+    """Single-process storage"""
+
+    def __init__(self):
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, key, amount):
+        with self._lock:
+            self._values[key] += amount
+
+    def collect(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class MmapStore:
+    """
+    Per-process storage in a memory-mapped file. Layout:
+    header (used bytes), then entries of
+    [int32 key length][key, padded to 8 bytes][float64 value]
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.INITIAL_SIZE:
+            self._file.truncate(self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self._capacity = size
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+        self._used = HEADER.unpack_from(self._map, 0)[0] or HEADER.size
+        self._positions = {
+            key: position
+            for key, _, position in read_entries(self._map, self._used)
+        }
+
+    def inc(self, key, amount):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._add_key(key)
+            value = VALUE.unpack_from(self._map, position)[0]
+            VALUE.pack_into(self._map, position, value + amount)
+
+    def _add_key(self, key):
+        encoded = key.encode()
+        padding = (8 - (KEY_LENGTH.size + len(encoded)) % 8) % 8
+        entry = (
+            KEY_LENGTH.pack(len(encoded)) + encoded + b" " * padding
+            + VALUE.pack(0.0)
+        )
+        while self._used + len(entry) > self._capacity:
+            self._grow()
+
+        start = self._used
+        self._map[start:start + len(entry)] = entry
+        self._used += len(entry)
+        # publish the entry only once it is complete
+        HEADER.pack_into(self._map, 0, self._used)
+        position = self._used - VALUE.size
+        self._positions[key] = position
+        return position
+
+    def _grow(self):
+        self._capacity *= 2
+        self._map.close()
+        self._file.truncate(self._capacity)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def collect(self):
+        """Totals of every worker file in the directory"""
+        totals = defaultdict(float)
+        for path in glob.glob(os.path.join(os.path.dirname(self.path), "*.db")):
+            with open(path, "rb") as fp:
+                data = fp.read()
+            if len(data) < HEADER.size:
+                continue
+            used = HEADER.unpack_from(data, 0)[0]
+            for key, value, _ in read_entries(data, used):
+                totals[key] += value
+        return dict(totals)
+
+
+def read_entries(buffer, used):
+    """Yields (key, value, value position) of a store buffer"""
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(buffer, position)[0]
+        position += KEY_LENGTH.size
+        key = bytes(buffer[position:position + length]).decode()
+        position += length + (8 - (KEY_LENGTH.size + length) % 8) % 8
+        value = VALUE.unpack_from(buffer, position)[0]
+        yield key, value, position
+        position += VALUE.size
+
+
+#
+# === METRICS ===
+#
+
+def escape(value):
+    return (
+        str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+    )
+
+
+def format_labels(names, values):
+    return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys = {}
+        registry.register(self)
+
+    def samples(self, values):
+        """Exposition lines of this metric from the collected values"""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1.0):
+        key = self._keys.get(labelvalues)
+        if key is None:
+            labels = format_labels(self.labelnames, labelvalues)
+            key = self._keys[labelvalues] = f"{self.name}_total{{{labels}}}"
+        self.registry.store.inc(key, amount)
+
+    def samples(self, values):
+        prefix = f"{self.name}_total{{"
+        return [
+            f"{key} {value!r}" for key, value in sorted(values.items())
+            if key.startswith(prefix)
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(),
+                 buckets=()):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _keys_for(self, labelvalues):
+        keys = self._keys.get(labelvalues)
+        if keys is None:
+            labels = format_labels(self.labelnames, labelvalues)
+            separator = "," if labels else ""
+            keys = self._keys[labelvalues] = (
+                [
+                    f'{self.name}_bucket{{{labels}{separator}le="{bound_label(b)}"}}'
+                    for b in self.buckets
+                ],
+                f"{self.name}_sum{{{labels}}}",
+                f"{self.name}_count{{{labels}}}",
+            )
+        return keys
+
+    def observe(self, value, *labelvalues):
+        buckets, sum_key, count_key = self._keys_for(labelvalues)
+        store = self.registry.store
+        store.inc(buckets[bisect_left(self.buckets, value)], 1.0)
+        store.inc(sum_key, value)
+        store.inc(count_key, 1.0)
+
+    def samples(self, values):
+        bucket_prefix = f"{self.name}_bucket{{"
+        series = defaultdict(list)
+        lines = []
+        for key, value in values.items():
+            if key.startswith(bucket_prefix):
+                labels, bound = key[len(bucket_prefix):].rsplit('le="', 1)
+                series[labels].append((float(bound.rstrip('"}')), value))
+
+        for labels, buckets in sorted(series.items()):
+            total = 0.0
+            for bound, count in sorted(buckets):
+                total += count
+                lines.append(
+                    f'{bucket_prefix}{labels}le="{bound_label(bound)}"}} {total!r}'
+                )
+            plain = labels.rstrip(",")
+            for suffix in ("sum", "count"):
+                key = f"{self.name}_{suffix}{{{plain}}}"
+                lines.append(f"{key} {values.get(key, 0.0)!r}")
+        return lines
+
+
+def bound_label(bound):
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+class Registry:
+    def __init__(self, store=None):
+        self.metrics = []
+        self._store = store
+        # a forked worker must not write into the file of its parent
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = create_store()
+        return self._store
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def exposition(self):
+        """Prometheus text format (version 0.0.4) of all metrics"""
+        values = self.store.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines += metric.samples(values)
+        return "\n".join(lines) + "\n"
+
+
+def create_store():
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if not directory:
+        return MemoryStore()
+    os.makedirs(directory, exist_ok=True)
+    return MmapStore(os.path.join(directory, f"worker-{os.getpid()}.db"))
+
+
+REGISTRY = Registry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    REGISTRY, "http_request_duration_seconds", "Request latency per view",
+    ("view", "method", "status"), LATENCY_BUCKETS,
+)
+REQUEST_SIZE = Histogram(
+    REGISTRY, "http_request_size_bytes", "Request body size per view",
+    ("view", "method"), SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    REGISTRY, "http_response_size_bytes", "Response body size per view",
+    ("view", "method"), SIZE_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    REGISTRY, "http_request_db_queries", "SQL queries per request",
+    ("view", "method"), QUERY_BUCKETS,
+)
+DB_DURATION = Counter(
+    REGISTRY, "http_request_db_duration_seconds",
+    "Time spent in SQL queries per view", ("view", "method"),
+)
+CACHE_REQUESTS = Counter(
+    REGISTRY, "cache_requests", "Cache lookups by cache and result",
+    ("cache", "result"),
+)
+THROTTLE_REJECTIONS = Counter(
+    REGISTRY, "throttle_rejections", "Requests rejected by throttling",
+    ("view",),
+)
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.inc(cache_name, "hit" if hit else "miss")
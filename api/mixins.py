@@ -1,5 +1,17 @@
 import logging
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Count, Max
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from api.singleflight import SingleFlight
+from api.utils import (
+    error_response, etag_matches, make_etag, not_modified_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +27,9 @@ class UserQuerysetMixin:
         model = getattr(base_queryset, "model", None)
         if not model:
             raise ImproperlyConfigured("Queryset has a model for filtering")
+        # Used for schema generation (no request user)
+        if getattr(self, "swagger_fake_view", False):
+            return base_queryset.none()
         if hasattr(model, "owner"):
             return base_queryset.filter(owner=self.request.user)
         if hasattr(model, "user"):
@@ -25,7 +40,8 @@ class UserQuerysetMixin:
 
     def perform_create(self, serializer):
         logger.debug(
-            f"Creating object {serializer.Meta.model.__name__} by user_id={self.request.user.pk}"
+            "Creating object %s by user_id=%s",
+            serializer.Meta.model.__name__, self.request.user.pk,
         )
         save_kwargs = {}
         if hasattr(serializer.Meta.model, "owner"):
@@ -37,3 +53,252 @@ class UserQuerysetMixin:
                 "The model does not support user-based creation"
             )
         serializer.save(**save_kwargs)
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin for `?fields=` / `?exclude=` sparse fieldsets on read requests.
+
+    Narrows the serializer output and pushes the selection down into the
+    queryset: only the needed columns are loaded (`.only()`) and only the
+    needed relations are joined (`select_related()`).
+
+    Serializers describe non-trivial fields in `Meta.field_requirements`,
+    a mapping of field name -> ORM paths it reads (empty for annotations).
+    Fields not listed there are assumed to be plain model fields
+    """
+
+    fields_param = "fields"
+    exclude_param = "exclude"
+    sparse_always_load: tuple[str, ...] = ()
+
+    def _parse_fields_param(self, name):
+        raw = self.request.query_params.get(name)
+        if not raw:
+            return []
+        return [field.strip() for field in raw.split(",") if field.strip()]
+
+    def get_sparse_fields(self):
+        """
+        Returns the list of requested serializer fields,
+        or None when the full representation should be used
+        """
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+
+        self._sparse_fields = None
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+
+        fields = self._parse_fields_param(self.fields_param)
+        exclude = self._parse_fields_param(self.exclude_param)
+        if not fields and not exclude:
+            return None
+
+        available = list(self.get_serializer_class().Meta.fields)
+        unknown = [f for f in fields + exclude if f not in available]
+        if unknown:
+            raise ValidationError(
+                {"fields": f"Unknown field(s): {', '.join(unknown)}"}
+            )
+
+        selected = [f for f in (fields or available) if f not in exclude]
+        self._sparse_fields = selected
+        return selected
+
+    def wants_field(self, name):
+        """Checks whether the field is part of the response"""
+        fields = self.get_sparse_fields()
+        return fields is None or name in fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["sparse_fields"] = self.get_sparse_fields()
+        return context
+
+    def prune_queryset(self, queryset):
+        """
+        Applies select_related()/only() for the fields being serialized
+        """
+        serializer_class = self.get_serializer_class()
+        meta = getattr(serializer_class, "Meta", None)
+        if meta is None or getattr(meta, "model", None) is not queryset.model:
+            return queryset
+
+        requirements = getattr(meta, "field_requirements", {})
+        sparse = self.get_sparse_fields()
+        names = sparse if sparse is not None else meta.fields
+
+        columns, relations = {"pk"}, set()
+        for name in list(names) + list(self.sparse_always_load):
+            for path in requirements.get(name, [name]):
+                columns.add(path)
+                if "__" in path:
+                    relations.add(path.rsplit("__", 1)[0])
+
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        if sparse is not None:
+            queryset = queryset.only(*sorted(columns))
+        return queryset
+
+    def get_queryset(self):
+        return self.prune_queryset(super().get_queryset())
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer counterpart of SparseFieldsetMixin: drops the fields
+    not listed in context["sparse_fields"]
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("sparse_fields")
+        if requested is None:
+            return fields
+        return {
+            name: field for name, field in fields.items() if name in requested
+        }
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for conditional requests (ETag / If-None-Match / If-Match).
+
+    Validators are computed before any row is fetched or serialized:
+    - collections: MAX(etag_timestamp_field) and COUNT(*) of the filtered
+      queryset, plus the user and the query string (page, filters, fields)
+    - objects: model, pk and etag_timestamp_field
+
+    Embedded names of related rows (user_name, category_name, owner_name)
+    are covered by signals bumping etag_timestamp_field on rename/delete
+    (tasks.signals).
+
+    A matching If-None-Match returns 304 without serializing.
+    A stale If-Match on PUT/PATCH returns 412
+    """
+
+    etag_timestamp_field = "updated_at"
+
+    def get_list_validator(self, queryset):
+        """Returns the cheap aggregates describing a collection state"""
+        aggregates = queryset.order_by().aggregate(
+            last=Max(self.etag_timestamp_field), count=Count("pk")
+        )
+        return aggregates["last"], aggregates["count"]
+
+    def get_list_etag(self, queryset):
+        # kept for SingleFlightMixin
+        self.list_validator = self.get_list_validator(queryset)
+        return make_etag(
+            settings.API_VERSION,
+            queryset.model._meta.label,
+            self.request.user.pk,
+            self.request.get_full_path(),
+            *self.list_validator,
+            weak=True,
+        )
+
+    def get_object_etag(self, obj, variant=""):
+        return make_etag(
+            settings.API_VERSION,
+            obj._meta.label,
+            obj.pk,
+            getattr(obj, self.etag_timestamp_field),
+            variant,
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.get_list_etag(queryset)
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified_response(etag)
+
+        response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        # sparse representations are different entities of the same object
+        etag = self.get_object_etag(instance, request.GET.urlencode())
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified_response(etag)
+
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={"ETag": etag})
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        if_match = request.headers.get("If-Match")
+
+        with transaction.atomic():
+            instance = self.get_object()
+            if if_match is not None:
+                # lock the row so the precondition holds until the write
+                model = type(instance)
+                current = (
+                    model.objects.select_for_update()
+                    .values_list(self.etag_timestamp_field, flat=True)
+                    .get(pk=instance.pk)
+                )
+                setattr(instance, self.etag_timestamp_field, current)
+                etag = self.get_object_etag(instance)
+                if not etag_matches(if_match, etag, weak=False):
+                    return error_response(
+                        "Resource has been modified by another request",
+                        status.HTTP_412_PRECONDITION_FAILED,
+                    )
+
+            serializer = self.get_serializer(
+                instance, data=request.data, partial=partial
+            )
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+
+        return Response(
+            serializer.data,
+            headers={"ETag": self.get_object_etag(serializer.instance)},
+        )
+
+
+class SingleFlightMixin:
+    """
+    Mixin coalescing identical concurrent list requests: one request per
+    worker runs the queries and the serialization, the others wait for
+    its page (api.singleflight).
+
+    Requests share a page when they have the same absolute URL (filters,
+    page, fields), the same get_visibility_key() (which rows they may see;
+    the user by default) and the same collection validator computed by
+    ConditionalGetMixin for the request. The validator is read after the
+    permission checks and after any write of the client, so a client never
+    gets a page older than its own writes. Place the mixin after
+    ConditionalGetMixin: ETags and 304s stay per request
+    """
+
+    single_flight = SingleFlight("list")
+
+    def get_visibility_key(self):
+        return f"user:{self.request.user.pk}"
+
+    def list(self, request, *args, **kwargs):
+        validator = getattr(self, "list_validator", None)
+        if validator is None:
+            return super().list(request, *args, **kwargs)
+
+        key = "|".join(map(str, (
+            type(self).__name__, self.get_visibility_key(),
+            request.build_absolute_uri(), *validator,
+        )))
+
+        def compute():
+            response = super(SingleFlightMixin, self).list(
+                request, *args, **kwargs
+            )
+            return response.data, response.status_code
+
+        data, status_code = self.single_flight.run(key, compute)
+        return Response(data, status=status_code)
@@ -0,0 +1,217 @@
+"""
+On-demand profiling of live requests (ProfilingMiddleware).
+
+Two profilers:
+- "sample": a background thread samples the stack of the request thread
+  every PROFILING_INTERVAL_MS and stores collapsed stacks
+  (`frame;frame;frame count` lines), ready for flamegraph.pl, speedscope
+  or inferno; low overhead, suited to production
+- "cprofile": deterministic cProfile, stored as a pstats file (snakeviz,
+  `python -m pstats`); exact call counts, noticeably slower requests
+
+Profiles are files in PROFILING_DIR (LOG_DIR/profiles by default), at most
+PROFILING_MAX_FILES of them; the oldest are removed first. File names
+carry the metadata: `<timestamp>-<ms>ms-<method>-<view>-<id>.<ext>`.
+"""
+
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = "api.profiling"
+NAME_RE = re.compile(
+    r"^(?P<timestamp>\d{8}T\d{12})-(?P<duration_ms>\d+)ms-(?P<method>[A-Z]+)-"
+    r"(?P<view>[\w.]+)-(?P<id>[0-9a-f]{8})\.(?P<extension>collapsed|prof)$"
+)
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread from a background thread"""
+
+    extension = "collapsed"
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._target = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, name="profiling-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def dump(self, path):
+        with open(path, "w") as fp:
+            for stack, count in self.stacks.most_common():
+                fp.write(f"{stack} {count}\n")
+
+
+class ProfilerBusy(Exception):
+    """The profiler cannot run now (another profile is in progress)"""
+
+
+class CProfiler:
+    extension = "prof"
+
+    # one cProfile per process: since Python 3.12 a second enable() raises
+    # ValueError while another profile (another request thread) is active
+    _active = threading.Lock()
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        if not self._active.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            self.profile.enable()
+        except ValueError as exc:  # another profiling tool is active
+            self._active.release()
+            raise ProfilerBusy() from exc
+
+    def stop(self):
+        self.profile.disable()
+        self._active.release()
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+def collapse(frame):
+    """`root;...;leaf` stack of a frame (flamegraph collapsed format)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        name = getattr(code, "co_qualname", code.co_name)  # Python 3.10
+        names.append(f"{module}.{name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(names)).replace(" ", "_")
+
+
+def create_profiler(mode=None):
+    mode = mode or settings.PROFILING_MODE
+    if mode == "cprofile":
+        return CProfiler()
+    if mode == "sample":
+        return SamplingProfiler(settings.PROFILING_INTERVAL_MS / 1000)
+    raise ValueError(f"Unknown profiling mode: {mode}")
+
+
+#
+# === STORAGE ===
+#
+
+def get_profile_dir():
+    return str(settings.PROFILING_DIR or settings.LOG_DIR / "profiles")
+
+
+def save_profile(profiler, view_name, method, duration):
+    """Writes the profile, prunes the oldest ones and returns its file name"""
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    view = re.sub(r"[^\w.]", "_", view_name)
+    name = (
+        f"{datetime.now():%Y%m%dT%H%M%S%f}-{int(duration * 1000)}ms-{method}-"
+        f"{view}-{uuid.uuid4().hex[:8]}.{profiler.extension}"
+    )
+    profiler.dump(os.path.join(directory, name))
+    prune_profiles(directory, settings.PROFILING_MAX_FILES)
+    return name
+
+
+def prune_profiles(directory, keep):
+    names = sorted(name for name in os.listdir(directory) if NAME_RE.match(name))
+    for name in names[:max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:  # pruned by another worker
+            pass
+
+
+def list_profiles():
+    """Stored profiles, newest first, with the metadata of their names"""
+    directory = get_profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        match = NAME_RE.match(name)
+        if match is None:
+            continue
+        info = match.groupdict()
+        info["name"] = name
+        info["duration_ms"] = int(info["duration_ms"])
+        info["created_at"] = datetime.strptime(
+            info.pop("timestamp"), "%Y%m%dT%H%M%S%f"
+        )
+        info["size"] = os.path.getsize(os.path.join(directory, name))
+        profiles.append(info)
+    return profiles
+
+
+def get_profile_path(name):
+    """Path of a stored profile, None for unknown or malformed names"""
+    if not NAME_RE.match(name):
+        return None
+    path = os.path.join(get_profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+#
+# === TRIGGER TOKENS ===
+#
+
+def make_profile_token():
+    """Signed value of the X-Profile header that forces profiling"""
+    return signing.dumps({"profile": True}, salt=TOKEN_SALT)
+
+
+def is_valid_profile_token(token, max_age=None):
+    max_age = max_age or settings.PROFILING_TOKEN_MAX_AGE
+    try:
+        signing.loads(token, salt=TOKEN_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def profile_call(func, *args, mode=None, **kwargs):
+    """
+    Runs func under a profiler; returns (result, profiler, duration).
+    When the profiler is busy, func runs unprofiled and profiler is None
+    """
+    profiler = create_profiler(mode)
+    started = time.perf_counter()
+    try:
+        profiler.start()
+    except ProfilerBusy:
+        return func(*args, **kwargs), None, time.perf_counter() - started
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.stop()
+    return result, profiler, time.perf_counter() - started
@@ -0,0 +1,284 @@
+"""
+Slow query log: aggregates every SQL statement by fingerprint and keeps
+the EXPLAIN plan of statements slower than QUERY_LOG_SLOW_MS.
+
+A fingerprint is the statement with literals, placeholders and IN/VALUES
+lists normalized, so `id IN (%s, %s)` and `id IN (%s)` are the same query.
+Per fingerprint and worker: count, total/max time, the project call sites
+(`tasks/views.py:120 in get_queryset`) and the plan of the slowest run.
+
+Installed on every database connection when QUERY_LOG_ENABLED is set
+(see ApiConfig.ready). Each worker periodically writes its aggregate to
+QUERY_LOG_DIR/worker-<pid>.json; `manage.py query_report` and the
+admin-only /api/v1/queries/ endpoint merge the files of all workers.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_SOURCES = 5  # call sites kept per fingerprint
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                       # string literals
+    (re.compile(r"%s|\$\d+"), "?"),                             # placeholders
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),                    # numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),       # IN lists, rows
+    (re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+"), "(...)"),  # VALUES rows
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint(sql):
+    """Normalized statement shared by all runs of the same query"""
+    for pattern, replacement in NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def find_source(frame):
+    """`path:line in function` of the innermost project frame"""
+    base_dir = str(settings.BASE_DIR) + os.sep
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and "site-packages" not in filename
+            and filename != __file__
+            and not filename.endswith("instrumentation.py")
+        ):
+            return (
+                f"{os.path.relpath(filename, base_dir)}:{frame.f_lineno} "
+                f"in {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return "<external>"
+
+
+class QueryLog:
+    """Per-worker aggregate; callable as a connection execute wrapper"""
+
+    def __init__(self, slow_ms=None, directory=None, flush_seconds=None,
+                 max_fingerprints=None):
+        self.slow = (slow_ms if slow_ms is not None else settings.QUERY_LOG_SLOW_MS) / 1000
+        self.directory = directory or get_query_log_dir()
+        self.flush_seconds = (
+            flush_seconds if flush_seconds is not None
+            else settings.QUERY_LOG_FLUSH_SECONDS
+        )
+        self.max_fingerprints = max_fingerprints or settings.QUERY_LOG_MAX_FINGERPRINTS
+        self.entries = {}
+        self._fingerprints = {}  # raw SQL -> (id, fingerprint)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_flush = time.monotonic()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self._local, "explaining", False):
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - started
+
+        plan = None
+        if duration >= self.slow and not many:
+            plan = self.explain(context["connection"], sql, params)
+        self.record(sql, duration, find_source(sys._getframe(1)), plan)
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+        return result
+
+    def record(self, sql, duration, source, plan=None):
+        key = self._fingerprints.get(sql)
+        if key is None:
+            normalized = fingerprint(sql)
+            key = (hashlib.md5(normalized.encode()).hexdigest()[:12], normalized)
+            if len(self._fingerprints) > 10 * self.max_fingerprints:
+                self._fingerprints.clear()
+            self._fingerprints[sql] = key
+
+        fingerprint_id, normalized = key
+        with self._lock:
+            entry = self.entries.get(fingerprint_id)
+            if entry is None:
+                if len(self.entries) >= self.max_fingerprints:
+                    return
+                entry = self.entries[fingerprint_id] = {
+                    "fingerprint": normalized, "count": 0, "total": 0.0,
+                    "max": 0.0, "slow": 0, "sources": {}, "plan": None,
+                    "plan_duration": 0.0,
+                }
+            entry["count"] += 1
+            entry["total"] += duration
+            entry["max"] = max(entry["max"], duration)
+            sources = entry["sources"]
+            if source in sources or len(sources) < MAX_SOURCES:
+                sources[source] = sources.get(source, 0) + 1
+            if duration >= self.slow:
+                entry["slow"] += 1
+            if plan is not None and duration >= entry["plan_duration"]:
+                entry["plan"] = plan
+                entry["plan_duration"] = duration
+
+    def explain(self, connection, sql, params):
+        """
+        EXPLAIN plan of a statement (PostgreSQL only). Runs on the raw
+        DB-API cursor, inside a savepoint when a transaction is open, so a
+        failing EXPLAIN never breaks the request
+        """
+        if connection.vendor != "postgresql":
+            return None
+        if not sql.lstrip().upper().startswith(EXPLAINABLE):
+            return None
+
+        self._local.explaining = True
+        in_transaction = connection.in_atomic_block
+        try:
+            with connection.connection.cursor() as cursor:
+                if in_transaction:
+                    cursor.execute("SAVEPOINT query_log_explain")
+                try:
+                    cursor.execute(f"EXPLAIN (ANALYZE off) {sql}", params)
+                    return "\n".join(row[0] for row in cursor.fetchall())
+                except Exception as exc:
+                    if in_transaction:
+                        cursor.execute("ROLLBACK TO SAVEPOINT query_log_explain")
+                    logger.warning("EXPLAIN failed: %s", exc)
+                    return None
+                finally:
+                    if in_transaction:
+                        cursor.execute("RELEASE SAVEPOINT query_log_explain")
+        finally:
+            self._local.explaining = False
+
+    def flush(self):
+        """Writes the aggregate of this worker to its file (atomically)"""
+        self._last_flush = time.monotonic()
+        with self._lock:
+            data = json.dumps(self.entries)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"worker-{os.getpid()}.json")
+            with open(f"{path}.tmp", "w") as fp:
+                fp.write(data)
+            os.replace(f"{path}.tmp", path)
+        except OSError as exc:
+            logger.error("Could not write the query log: %s", exc)
+
+    def reset(self):
+        with self._lock:
+            self.entries.clear()
+
+
+def get_query_log_dir():
+    return str(settings.QUERY_LOG_DIR or settings.LOG_DIR / "queries")
+
+
+QUERY_LOG = None
+
+
+def get_query_log():
+    global QUERY_LOG
+    if QUERY_LOG is None:
+        QUERY_LOG = QueryLog()
+        atexit.register(QUERY_LOG.flush)
+    return QUERY_LOG
+
+
+def _after_fork():
+    """A forked worker starts from an empty aggregate"""
+    if QUERY_LOG is not None:
+        QUERY_LOG._lock = threading.Lock()
+        QUERY_LOG.entries = {}
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created receiver: wraps every new connection"""
+    query_log = get_query_log()
+    if query_log not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_log)
+
+
+def merge(entries_list):
+    """Merges per-worker aggregates"""
+    merged = {}
+    for entries in entries_list:
+        for fingerprint_id, entry in entries.items():
+            target = merged.get(fingerprint_id)
+            if target is None:
+                merged[fingerprint_id] = dict(entry, sources=dict(entry["sources"]))
+                continue
+            target["count"] += entry["count"]
+            target["total"] += entry["total"]
+            target["slow"] += entry["slow"]
+            target["max"] = max(target["max"], entry["max"])
+            target["sources"] = dict(
+                Counter(target["sources"]) + Counter(entry["sources"])
+            )
+            if entry["plan"] and entry["plan_duration"] >= target["plan_duration"]:
+                target["plan"] = entry["plan"]
+                target["plan_duration"] = entry["plan_duration"]
+    return merged
+
+
+def collect(directory=None):
+    """Aggregates of all workers, this one included"""
+    directory = directory or get_query_log_dir()
+    if QUERY_LOG is not None:
+        QUERY_LOG.flush()
+    entries_list = []
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as fp:
+                    entries_list.append(json.load(fp))
+            except (OSError, ValueError):  # being replaced by its worker
+                continue
+    return merge(entries_list)
+
+
+SORT_KEYS = {
+    "total": lambda entry: entry["total"],
+    "count": lambda entry: entry["count"],
+    "max": lambda entry: entry["max"],
+    "mean": lambda entry: entry["total"] / entry["count"],
+}
+
+
+def top_queries(sort="total", limit=20, directory=None):
+    """Heaviest fingerprints as a list of dicts (times in milliseconds)"""
+    entries = collect(directory)
+    ranked = sorted(entries.items(), key=lambda item: SORT_KEYS[sort](item[1]),
+                    reverse=True)[:limit]
+    return [
+        {
+            "id": fingerprint_id,
+            "fingerprint": entry["fingerprint"],
+            "count": entry["count"],
+            "slow": entry["slow"],
+            "total_ms": round(entry["total"] * 1000, 3),
+            "mean_ms": round(entry["total"] * 1000 / entry["count"], 3),
+            "max_ms": round(entry["max"] * 1000, 3),
+            "sources": sorted(entry["sources"].items(), key=lambda s: -s[1]),
+            "plan": entry["plan"],
+        }
+        for fingerprint_id, entry in ranked
+    ]
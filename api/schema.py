@@ -0,0 +1,109 @@
+"""
+OpenAPI schema artifacts.
+
+Generating the schema walks the whole URLconf and every serializer, which
+takes seconds of CPU. `manage.py build_openapi_schema` writes it once per
+API_VERSION to OPENAPI_SCHEMA_DIR (openapi-<version>.json/.yaml), and
+SchemaView serves those bytes with an ETag. Live generation only happens
+in DEBUG when no artifact was built.
+"""
+
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from api.utils import etag_matches, make_etag
+
+API_INFO = openapi.Info(
+    title="TaskManagerSystem API",
+    default_version=f"v{settings.API_VERSION[0]}",
+    description="Documentation for the TaskManagerSystem API",
+    license=openapi.License(name="MIT License"),
+)
+
+CODECS = {
+    "json": (OpenAPICodecJson, "application/json"),
+    "yaml": (OpenAPICodecYaml, "application/yaml"),
+}
+ARTIFACT_MAX_AGE = 60 * 60  # seconds browsers may reuse it without revalidating
+
+_artifacts = {}  # path -> (mtime, body, etag)
+
+
+def artifact_path(fmt, version=None):
+    version = version or settings.API_VERSION
+    return os.path.join(
+        str(settings.OPENAPI_SCHEMA_DIR), f"openapi-{version}.{fmt}"
+    )
+
+
+def generate_schema(fmt="json"):
+    """Encoded public schema of the whole API"""
+    generator = OpenAPISchemaGenerator(API_INFO)
+    schema = generator.get_schema(request=None, public=True)
+    codec, _ = CODECS[fmt]
+    return codec(validators=[]).encode(schema)
+
+
+def load_artifact(fmt):
+    """(body, etag) of the built artifact, None when it is missing"""
+    path = artifact_path(fmt)
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+    cached = _artifacts.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as fp:
+            body = fp.read()
+        cached = _artifacts[path] = (mtime, body, make_etag(body))
+    return cached[1], cached[2]
+
+
+def artifact_response(request, fmt):
+    artifact = load_artifact(fmt)
+    if artifact is None:
+        return None
+    body, etag = artifact
+    if etag_matches(request.META.get("HTTP_IF_NONE_MATCH"), etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type=CODECS[fmt][1])
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={ARTIFACT_MAX_AGE}"
+    return response
+
+
+BaseSchemaView = get_schema_view(
+    API_INFO, public=True, permission_classes=[permissions.AllowAny],
+)
+
+
+class SchemaView(BaseSchemaView):
+    """
+    drf_yasg schema view serving the prebuilt artifact for spec requests
+    (`?format=openapi`, swagger.json/.yaml); the Swagger UI and ReDoc pages
+    themselves are cheap and rendered as usual
+    """
+
+    def get(self, request, version="", format=None):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        fmt = "yaml" if renderer.format == "yaml" else "json"
+        response = artifact_response(request, fmt)
+        if response is not None:
+            return response
+        if settings.DEBUG:
+            return super().get(request, version, format)
+        raise Http404(
+            "OpenAPI schema not built, run `manage.py build_openapi_schema`"
+        )
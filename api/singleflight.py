@@ -0,0 +1,103 @@
+"""
+Request coalescing (single flight) for identical concurrent reads.
+
+SingleFlight.run(key, compute) lets the first caller of a key compute it
+while later callers of the same key wait for its result instead of
+running the same queries and serialization again. Nothing is kept once
+the computation is over: callers arriving afterwards start a new flight.
+
+Within a process, callers wait on the flight of the leader thread. With
+SINGLE_FLIGHT_SHARED, leaders of different workers also coalesce through
+a short lock in CACHES["default"]: the lock holder stores its result
+under the lock token for a few seconds, the others poll for it. If the
+leader fails or takes longer than SINGLE_FLIGHT_TIMEOUT, waiting callers
+compute the result themselves.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api.metrics import record_cache
+
+MISSING = object()
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = MISSING
+
+
+class SingleFlight:
+    POLL_INTERVAL = 0.01
+
+    def __init__(self, name, cache_alias="default"):
+        self.name = name
+        self.cache_alias = cache_alias
+        self._flights = {}  # key -> Flight of the leader thread
+        self._lock = threading.Lock()
+
+    def run(self, key, compute):
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return compute()
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+
+        if not leader:
+            flight.done.wait(settings.SINGLE_FLIGHT_TIMEOUT)
+            result = flight.result
+            record_cache(f"single_flight.{self.name}", result is not MISSING)
+            return compute() if result is MISSING else result
+
+        try:
+            if settings.SINGLE_FLIGHT_SHARED:
+                flight.result, coalesced = self._run_shared(key, compute)
+            else:
+                flight.result, coalesced = compute(), False
+            record_cache(f"single_flight.{self.name}", coalesced)
+            return flight.result
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def lock_key(self, key):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return f"single-flight:{self.name}:{digest}"
+
+    def _run_shared(self, key, compute):
+        """Returns (result, whether another worker computed it)"""
+        cache = caches[self.cache_alias]
+        lock_key = self.lock_key(key)
+        timeout = settings.SINGLE_FLIGHT_TIMEOUT
+
+        token = uuid.uuid4().hex
+        if cache.add(lock_key, token, timeout):
+            try:
+                result = compute()
+                cache.set(f"{lock_key}:{token}", result, timeout)
+                return result, False
+            finally:
+                cache.delete(lock_key)
+
+        token = cache.get(lock_key)
+        deadline = time.monotonic() + timeout
+        while token is not None and time.monotonic() < deadline:
+            # the lock is read first: once released, the result is stored
+            released = cache.get(lock_key) != token
+            result = cache.get(f"{lock_key}:{token}", MISSING)
+            if result is not MISSING:
+                return result, True
+            if released:  # the leader failed
+                break
+            time.sleep(self.POLL_INTERVAL)
+        return compute(), False
@@ -0,0 +1,267 @@
+import pickle
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from api import invalidation
+from api.cache import TwoTierCache
+from projects.models import ProjectMembership, Role
+from projects.services import ProjectService
+from users.authentication import USER_CACHE
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+def shared_locmem(test):
+    """The test LocMemCache stands for a backend shared by the workers"""
+    patcher = mock.patch.object(
+        TwoTierCache, "shared", new_callable=mock.PropertyMock, return_value=True
+    )
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+class Counter:
+    """compute() returning how many times it ran"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+@override_settings(CACHE_INVALIDATION_BUS=False)  # see test_invalidation
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        shared_locmem(self)
+        self.cache = TwoTierCache("test", timeout=60, local_timeout=60)
+        self.compute = Counter()
+
+    def other_process(self):
+        """Same cache in another worker: a shared tier, its own local tier"""
+        return TwoTierCache(self.cache.name, timeout=60, local_timeout=60)
+
+    def test_tiers(self):
+        self.assertEqual(self.cache.get_or_set("a", self.compute), 1)
+        self.assertEqual(self.cache.get_or_set("a", self.compute), 1)  # local
+        self.assertEqual(self.other_process().get_or_set("a", self.compute), 1)
+        self.assertEqual(self.compute.calls, 1)
+
+    def test_none_is_cached(self):
+        compute = mock.Mock(return_value=None)
+        self.assertIsNone(self.cache.get_or_set("a", compute))
+        self.assertIsNone(self.other_process().get_or_set("a", compute))
+        compute.assert_called_once()
+
+    def test_invalidate(self):
+        other = self.other_process()
+        other.get_or_set("a", self.compute)
+        self.cache.get_or_set("b", self.compute)
+
+        self.cache.invalidate("a")
+        self.assertEqual(self.cache.get_or_set("a", self.compute), 3)
+        self.assertEqual(self.cache.get_or_set("b", self.compute), 2)
+        # other workers serve their local entry until it expires
+        self.assertEqual(other.get_or_set("a", self.compute), 1)
+        other.clear_local()
+        self.assertEqual(other.get_or_set("a", self.compute), 3)
+
+    def test_clear(self):
+        self.cache.get_or_set("a", self.compute)
+        self.cache.clear()
+        self.assertEqual(self.other_process().get_or_set("a", self.compute), 2)
+
+    def test_invalidation_during_compute_is_not_cached(self):
+        def compute():
+            value = self.compute()
+            self.cache.invalidate("a")  # the row changed meanwhile
+            return value
+
+        self.assertEqual(self.cache.get_or_set("a", compute), 1)
+        self.assertEqual(self.cache.get_or_set("a", self.compute), 2)
+
+    def test_local_tier_is_bounded(self):
+        small = TwoTierCache("small", timeout=60, local_timeout=60, local_size=2)
+        for key in "abc":
+            small.get_or_set(key, self.compute)
+        self.assertEqual(list(small._local), ["b", "c"])
+
+    def test_local_hits_are_copies(self):
+        self.cache.get_or_set("a", lambda: ["value"]).append("changed")
+        self.assertEqual(self.cache.get_or_set("a", self.compute), ["value"])
+
+    def test_concurrent_misses_compute_once(self):
+        started, release = threading.Event(), threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(5)
+            return self.compute()
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(self.cache.get_or_set("a", compute))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [1] * 8)
+        self.assertEqual(self.compute.calls, 1)
+
+    def test_waits_for_another_process_computing(self):
+        cache.add(f"{self.cache.prefix}:a:lock", 1)
+        other = self.other_process()  # the lock holder
+        timer = threading.Timer(0.01, lambda: other.set("a", 7))
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertEqual(self.cache.get_or_set("a", self.compute), 7)
+        self.assertEqual(self.compute.calls, 0)
+
+    def test_computes_when_the_lock_holder_is_gone(self):
+        cache.add(f"{self.cache.prefix}:a:lock", 1)  # held for LOCK_TIMEOUT
+        started = time.monotonic()
+        self.assertEqual(self.cache.get_or_set("a", self.compute), 1)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_filesystem_backend(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            CACHES={"default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": directory,
+            }},
+        ):
+            self.cache.get_or_set("a", self.compute)
+            self.assertEqual(self.other_process().get_or_set("a", self.compute), 1)
+            self.cache.invalidate("a")
+            self.assertEqual(self.other_process().get_or_set("a", self.compute), 2)
+
+
+@override_settings(CACHE_INVALIDATION_BUS=False)
+class ProcessLocalTests(SimpleTestCase):
+    """Caches of a worker that other workers cannot invalidate"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.compute = Counter()
+
+    def test_locmem_is_not_a_shared_tier(self):
+        two_tier_cache = TwoTierCache("locmem", timeout=60, local_timeout=0)
+        self.assertFalse(two_tier_cache.shared)
+        two_tier_cache.get_or_set("a", self.compute)
+        self.assertEqual(two_tier_cache.get_or_set("a", self.compute), 2)
+        self.assertFalse(any(key for key in cache._cache if "locmem" in key))
+
+    def test_strict_cache_without_the_bus(self):
+        strict = TwoTierCache("strict", timeout=60, local_timeout=60, strict=True)
+        with mock.patch.object(invalidation, "_workers", True):
+            strict.get_or_set("a", self.compute)
+            self.assertEqual(strict.get_or_set("a", self.compute), 2)
+        # a single process invalidates its own entries
+        strict.get_or_set("a", self.compute)
+        self.assertEqual(strict.get_or_set("a", self.compute), 3)
+
+
+@override_settings(CACHE_INVALIDATION_BUS=False)
+class InvalidationOnCommitTests(TestCase):
+    """Misses between an invalidation and its commit are not kept"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        shared_locmem(self)
+        self.cache = TwoTierCache("on-commit", timeout=60, local_timeout=60)
+        # another process: it does not see the write before the commit
+        self.other = TwoTierCache("on-commit", timeout=60, local_timeout=60)
+        self.cache.get_or_set("a", lambda: "old")
+
+    def assertFresh(self):
+        self.other.clear_local()
+        self.assertEqual(self.other.get_or_set("a", lambda: "new"), "new")
+        self.assertEqual(self.cache.get_or_set("a", lambda: "new"), "new")
+
+    def test_invalidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cache.invalidate("a")
+            self.assertEqual(self.other.get_or_set("a", lambda: "old"), "old")
+        self.assertFresh()
+
+    def test_clear(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cache.clear()
+            self.assertEqual(self.other.get_or_set("a", lambda: "old"), "old")
+        self.assertFresh()
+
+
+class CachedLookupTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.member, cls.member_token, _ = TestHelper.create_test_user_via_orm(
+            email="cached@example.com"
+        )
+        cls.project = ProjectService.create_project(owner=cls.user, name="Cached")
+        cls.membership = ProjectMembership.objects.create(
+            user=cls.member, project=cls.project,
+            role=Role.objects.get(name="Viewer"),
+        )
+        cls.stats_ep = reverse(
+            "project-tasks-stats", kwargs={"project_pk": cls.project.id}
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.member_token}")
+
+    def test_user_and_permission_lookups_are_cached(self):
+        self.assertEqual(self.client.get(self.stats_ep).status_code, 200)
+        response = self.client.get(self.stats_ep)
+        self.assertEqual(response.status_code, 200)
+        # user, project and membership role come from the caches
+        self.assertQueryCount(response, 0)
+
+    def test_removed_member_loses_access_immediately(self):
+        self.client.get(self.stats_ep)
+        self.membership.delete()
+        self.assertEqual(self.client.get(self.stats_ep).status_code, 404)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.stats_ep)
+        self.member.is_active = False
+        self.member.save()
+        self.assertEqual(self.client.get(self.stats_ep).status_code, 401)
+
+    def test_unknown_project(self):
+        url = reverse("project-tasks-stats", kwargs={"project_pk": 0})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_password_hash_is_not_cached(self):
+        shared_locmem(self)
+        self.client.get(self.stats_ep)
+        entry = cache.get(USER_CACHE._value_key(str(self.member.pk)))
+        self.assertIsNotNone(entry)
+        self.assertNotIn(self.member.password.encode(), pickle.dumps(entry))
+
+    def test_saving_the_cached_user_keeps_the_password(self):
+        self.client.get(self.stats_ep)
+        response = self.client.patch(self.user_update_profile_ep, {"age": 30})
+        self.assertEqual(response.status_code, 200)
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.age, 30)
+        self.assertTrue(self.member.check_password("testpassword123"))
@@ -0,0 +1,177 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from projects.models import Project
+from tasks.models import Category, Task
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class ConditionalRequestTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task = Task.objects.create(
+            title="Cached Task",
+            due_date=TestHelper.get_valid_due_date(),
+            user=cls.user,
+        )
+        cls.project = Project.objects.create(name="Etag", owner=cls.user)
+        cls.task_detail_ep = reverse("task-detail", kwargs={"pk": cls.task.id})
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        return response["ETag"]
+
+    def test_task_list_not_modified(self):
+        etag = self.get_etag(self.task_list_ep)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                self.task_list_ep, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(
+            any('"tasks_task"."title"' in q["sql"] for q in ctx.captured_queries),
+            "Rows should not be fetched for a 304",
+        )
+
+    def test_task_list_etag_changes_on_write(self):
+        etag = self.get_etag(self.task_list_ep)
+        self.api_post(
+            reverse("task-toggle-completed", kwargs={"pk": self.task.id}), {}
+        )
+        response = self.client.get(self.task_list_ep, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_task_list_etag_changes_on_delete(self):
+        other = Task.objects.create(
+            title="Other", due_date=TestHelper.get_valid_due_date(),
+            user=self.user,
+        )
+        etag = self.get_etag(self.task_list_ep)
+        other.delete()
+        response = self.client.get(self.task_list_ep, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def assert_task_list_changed(self, etag):
+        response = self.client.get(self.task_list_ep, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_task_list_etag_changes_on_category_rename(self):
+        category = Category.objects.create(name="Old", user=self.user)
+        Task.objects.filter(pk=self.task.pk).update(category=category)
+        etag = self.get_etag(self.task_list_ep)
+
+        category.name = "New"
+        category.save()
+        response = self.assert_task_list_changed(etag)
+        self.assertEqual(response.data["results"][0]["category_name"], "New")
+
+    def test_task_list_etag_changes_on_category_delete(self):
+        category = Category.objects.create(name="Gone", user=self.user)
+        Task.objects.filter(pk=self.task.pk).update(category=category)
+        etag = self.get_etag(self.task_list_ep)
+
+        category.delete()
+        response = self.assert_task_list_changed(etag)
+        self.assertIsNone(response.data["results"][0].get("category_name"))
+
+    def test_task_list_etag_changes_on_user_rename(self):
+        etag = self.get_etag(self.task_list_ep)
+
+        self.user.username = "renamed"
+        self.user.save()
+        response = self.assert_task_list_changed(etag)
+        self.assertEqual(response.data["results"][0]["user_name"], "renamed")
+
+    def test_task_list_etag_kept_on_other_user_saves(self):
+        etag = self.get_etag(self.task_list_ep)
+
+        self.user.age = 30
+        self.user.save()
+        response = self.client.get(self.task_list_ep, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_project_list_etag_changes_on_owner_rename(self):
+        etag = self.get_etag(self.project_list_ep)
+
+        self.user.username = "renamed"
+        self.user.save()
+        response = self.client.get(
+            self.project_list_ep, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_task_list_etag_depends_on_query(self):
+        etag = self.get_etag(self.task_list_ep)
+        response = self.client.get(
+            self.task_list_ep, {"completed": "true"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_task_detail_not_modified(self):
+        etag = self.get_etag(self.task_detail_ep)
+        response = self.client.get(
+            self.task_detail_ep, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_task_update_if_match(self):
+        etag = self.get_etag(self.task_detail_ep)
+        response = self.client.patch(
+            self.task_detail_ep, {"title": "First"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        # a second writer holding the old ETag loses
+        response = self.client.patch(
+            self.task_detail_ep, {"title": "Second"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "First")
+
+    def test_task_update_without_if_match(self):
+        response = self.client.patch(self.task_detail_ep, {"title": "Free"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+
+    def test_project_list_etag_changes_on_new_task(self):
+        etag = self.get_etag(self.project_list_ep)
+        response = self.client.get(
+            self.project_list_ep, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Task.objects.create(
+            title="Counted", due_date=TestHelper.get_valid_due_date(),
+            user=self.user, project=self.project,
+        )
+        response = self.client.get(
+            self.project_list_ep, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_profile_not_modified(self):
+        etag = self.get_etag(self.user_profile_ep)
+        response = self.client.get(
+            self.user_profile_ep, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(self.user_update_profile_ep, {"age": 30})
+        response = self.client.get(
+            self.user_profile_ep, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.cache import clear_local_caches
+from api.db_routing import PIN_COOKIE, use_database
+from tasks.models import Task
+
+from .utils import TestHelper
+
+
+@override_settings(READ_REPLICAS=["replica"], READ_YOUR_WRITES_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Routes through a second connection ("replica") to the test database,
+    so queries can be attributed to an alias while seeing the same data.
+    Uses the configured replica alias (DB_REPLICA_HOST) when there is one
+    """
+
+    databases = {"default"} | ({"replica"} & set(settings.DATABASES))
+    serialized_rollback = True  # keep the roles created by migrations
+
+    def setUp(self):
+        if "replica" not in settings.DATABASES:
+            default = connections["default"]
+            connections["replica"] = default.__class__(
+                dict(default.settings_dict), alias="replica"
+            )
+            self.addCleanup(self.close_replica)
+
+        cache.clear()
+        clear_local_caches()
+        self.user, self.token, _ = TestHelper.create_test_user_via_orm()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def close_replica(self):
+        connections["replica"].close()
+        del connections["replica"]
+
+    def get(self, path="/api/v1/tasks/", client=None):
+        """Response and the number of queries run on each alias"""
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            response = (client or self.client).get(path)
+        return response, len(primary), len(replica)
+
+    def test_safe_requests_read_from_the_replica(self):
+        self.get()  # caches the user
+        response, primary, replica = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_cache_misses_read_the_primary(self):
+        # a lagging replica would cache the user as it was before a write
+        _, primary, replica = self.get()
+        self.assertEqual(primary, 1)
+        self.assertGreater(replica, 0)
+
+    def test_writes_pin_reads_to_the_primary(self):
+        response = self.client.post("/api/v1/tasks/", {
+            "title": "Fresh", "due_date": TestHelper.get_valid_due_date(),
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # pinned by the cookie and by the Authorization header
+        _, primary, replica = self.get()
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        _, primary, replica = self.get(client=other)
+        self.assertEqual(replica, 0)
+
+    def test_atomic_blocks_and_outside_requests_use_the_primary(self):
+        self.assertEqual(Task.objects.all().db, "default")
+        with use_database("replica"):
+            self.assertEqual(Task.objects.all().db, "replica")
+            with transaction.atomic():
+                self.assertEqual(Task.objects.all().db, "default")
+            self.assertEqual(Task.objects.all().db, "replica")
+            self.assertEqual(Task.objects.using("default").db, "default")
@@ -0,0 +1,227 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from api import events
+from api.events import EventBroker, event_stream, format_sse
+from api.invalidation import MAX_PAYLOAD, Listener
+from projects.models import Project, ProjectMembership, Role
+from tasks.models import Task
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class EventBrokerTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        self.broker = EventBroker("api.events.LocalEventBackend")
+
+    def tearDown(self):
+        self.loop.close()
+        super().tearDown()
+
+    def next_frame(self, subscription):
+        return self.loop.run_until_complete(
+            asyncio.wait_for(subscription.get(), 1)
+        )
+
+    def test_fan_out_shares_one_serialized_frame(self):
+        first = self.broker.subscribe(["project:1"], loop=self.loop)
+        second = self.broker.subscribe(["project:1"], loop=self.loop)
+        self.broker.publish("project:1", "task.updated", {"id": 7})
+
+        frame = self.next_frame(first)
+        self.assertIs(frame, self.next_frame(second))
+        self.assertEqual(frame, format_sse("task.updated", {"id": 7}))
+
+    def test_publish_skips_serialization_without_listeners(self):
+        calls = []
+        self.broker.publish("project:2", "task.updated", lambda: calls.append(1))
+        self.assertEqual(calls, [])
+
+    def test_unsubscribe_on_close(self):
+        subscription = self.broker.subscribe(["project:3"], loop=self.loop)
+        subscription.close()
+        self.assertEqual(self.broker.subscriber_count("project:3"), 0)
+
+    @override_settings(EVENTS_SUBSCRIBER_QUEUE_SIZE=2)
+    def test_slow_subscriber_gets_resync(self):
+        broker = EventBroker("api.events.LocalEventBackend")
+        subscription = broker.subscribe(["project:4"], loop=self.loop)
+        for i in range(5):
+            broker.publish("project:4", "task.updated", {"id": i})
+
+        async def collect():
+            frames = []
+            async for frame in event_stream(subscription, heartbeat=1):
+                frames.append(frame)
+            return frames
+
+        frames = self.loop.run_until_complete(asyncio.wait_for(collect(), 2))
+        self.assertTrue(frames[-1].startswith(b"event: resync"))
+        self.assertEqual(broker.subscriber_count("project:4"), 0)
+
+    def test_revoked_channel_is_left(self):
+        subscription = self.broker.subscribe(
+            ["user:1", "project:5"], loop=self.loop
+        )
+        self.broker.publish(
+            "user:1", "channel.revoked", {"channel": "project:5"}
+        )
+
+        async def read_one():
+            stream = event_stream(subscription, heartbeat=1)
+            await stream.__anext__()  # retry hint
+            frame = await stream.__anext__()
+            await stream.aclose()
+            return frame
+
+        frame = self.loop.run_until_complete(asyncio.wait_for(read_one(), 2))
+        self.assertIn(b"channel.revoked", frame)
+        self.assertEqual(self.broker.subscriber_count("project:5"), 0)
+
+
+class PostgresEventBackendTests(TransactionTestCase):
+    """Frames published with NOTIFY, received by a listener thread"""
+
+    serialized_rollback = True
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        with mock.patch("api.invalidation.ensure_listening"):
+            self.broker = EventBroker("api.events.PostgresEventBackend")
+        # the process-wide broker receives the notifications
+        patcher = mock.patch.object(events, "_broker", self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        listener = Listener()
+        listener.IDLE_SECONDS = 0.1  # stop() waits for the current wait
+        listener.start()
+        self.addCleanup(listener.stop)
+        self.assertTrue(listener.connected.wait(5))
+
+    def next_frame(self, subscription):
+        return self.loop.run_until_complete(
+            asyncio.wait_for(subscription.get(), 5)
+        )
+
+    def test_frames_reach_subscribers_through_the_database(self):
+        subscription = self.broker.subscribe(["project:1"], loop=self.loop)
+        self.addCleanup(subscription.close)
+        self.broker.publish("project:1", "task.updated", {"id": 7})
+        self.assertEqual(
+            self.next_frame(subscription),
+            format_sse("task.updated", {"id": 7}),
+        )
+
+    def test_oversized_frame_is_replaced_by_resync(self):
+        subscription = self.broker.subscribe(["project:2"], loop=self.loop)
+        self.addCleanup(subscription.close)
+        with self.assertLogs("api.events", "WARNING"):
+            self.broker.publish(
+                "project:2", "task.updated", {"title": "x" * MAX_PAYLOAD}
+            )
+        self.assertTrue(
+            self.next_frame(subscription).startswith(b"event: resync\n")
+        )
+
+
+class TaskEventPublishingTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.project = Project.objects.create(name="Live", owner=cls.user)
+        cls.task = Task.objects.create(
+            title="Live Task", due_date=TestHelper.get_valid_due_date(),
+            user=cls.user, project=cls.project,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.loop = asyncio.new_event_loop()
+        from api.events import get_broker
+
+        self.subscription = get_broker().subscribe(
+            [f"project:{self.project.id}", f"user:{self.user.id}"],
+            loop=self.loop,
+        )
+
+    def tearDown(self):
+        self.subscription.close()
+        self.loop.close()
+        super().tearDown()
+
+    def next_event(self):
+        frame = self.loop.run_until_complete(
+            asyncio.wait_for(self.subscription.get(), 1)
+        )
+        event, data = frame.decode().strip().split("\n")
+        return event.removeprefix("event: "), json.loads(
+            data.removeprefix("data: ")
+        )
+
+    def test_toggle_completed_publishes(self):
+        url = reverse("task-toggle-completed", kwargs={"pk": self.task.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_post(url, {})
+
+        event, data = self.next_event()
+        self.assertEqual(event, "task.toggled")
+        self.assertEqual(data["id"], self.task.id)
+        self.assertTrue(data["completed"])
+
+    def test_create_and_delete_publish(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_post(
+                self.task_list_ep,
+                {"title": "Personal", "due_date": TestHelper.get_valid_due_date()},
+            )
+        self.assertEqual(self.next_event()[0], "task.created")
+
+        url = reverse("task-detail", kwargs={"pk": response.data["id"]})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        event, data = self.next_event()
+        self.assertEqual(event, "task.deleted")
+        self.assertEqual(data["id"], response.data["id"])
+
+    def test_kick_publishes_revocation(self):
+        member, _, _ = TestHelper.create_test_user_via_orm(
+            email="kicked@example.com"
+        )
+        ProjectMembership.objects.create(
+            user=member, project=self.project,
+            role=Role.objects.get_or_create(name="Viewer")[0],
+        )
+        from api.events import get_broker
+
+        member_subscription = get_broker().subscribe(
+            [f"user:{member.id}"], loop=self.loop
+        )
+        url = reverse("project-kick", kwargs={"pk": self.project.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_post(url, {"user_id": member.id})
+
+        frame = self.loop.run_until_complete(
+            asyncio.wait_for(member_subscription.get(), 1)
+        )
+        member_subscription.close()
+        self.assertTrue(frame.startswith(b"event: channel.revoked"))
+
+    def test_stream_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.get(reverse("task-events"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stream_requires_asgi(self):
+        response = self.client.get(reverse("task-events"))
+        self.assertEqual(
+            response.status_code, status.HTTP_501_NOT_IMPLEMENTED
+        )
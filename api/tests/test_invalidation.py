@@ -0,0 +1,161 @@
+import json
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.conf import settings
+from django.test import (
+    SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+
+from api import invalidation
+from api.cache import TwoTierCache
+from api.invalidation import MAX_PAYLOAD, Listener, dispatch, encode
+
+
+def local_keys(two_tier_cache):
+    return set(two_tier_cache._local)
+
+
+class MessageTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TwoTierCache("bus-messages", timeout=60, local_timeout=60)
+        for key in "abc":
+            self.cache._set_local(key, key)
+
+    def test_large_invalidations_are_split(self):
+        keys = [f"{index}:{index * 7}" for index in range(5000)]
+        messages = encode("users", keys)
+        self.assertGreater(len(messages), 1)
+        self.assertTrue(all(len(message) <= MAX_PAYLOAD for message in messages))
+        decoded = [json.loads(message) for message in messages]
+        self.assertEqual([key for message in decoded for key in message["k"]], keys)
+
+    def test_dispatch(self):
+        dispatch(encode("bus-messages", ["a", "b"])[0])
+        self.assertEqual(local_keys(self.cache), {"c"})
+        dispatch(encode("bus-messages")[0])
+        self.assertEqual(local_keys(self.cache), set())
+
+    def test_invalid_message(self):
+        with self.assertLogs("api.invalidation", "WARNING"):
+            dispatch("users:1")
+        self.assertEqual(local_keys(self.cache), {"a", "b", "c"})
+
+
+class InProcessFallbackTests(TestCase):
+    def test_delivered_on_commit(self):
+        other = TwoTierCache("bus-fallback", timeout=60, local_timeout=60)
+        other._set_local("a", 1)
+        with mock.patch.object(connection, "vendor", "sqlite"):
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidation.publish("bus-fallback", ["a"])
+                self.assertEqual(local_keys(other), {"a"})
+        self.assertEqual(local_keys(other), set())
+
+
+class ListenerTests(TransactionTestCase):
+    """NOTIFY on the test database, received by a listener thread"""
+
+    serialized_rollback = True
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.writer = TwoTierCache("bus-listener", timeout=60, local_timeout=60)
+        # another process: same shared tier, its own local tier
+        self.worker = TwoTierCache("bus-listener", timeout=60, local_timeout=60)
+        listener = Listener()
+        listener.IDLE_SECONDS = 0.1  # stop() waits for the current wait
+        listener.start()
+        self.addCleanup(listener.stop)
+        self.assertTrue(listener.connected.wait(5))
+        self.worker.get_or_set("a", lambda: 1)
+        self.worker.get_or_set("b", lambda: 2)
+
+    def wait_for_eviction(self, key, timeout=5):
+        deadline = time.monotonic() + timeout
+        while key in local_keys(self.worker):
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def test_committed_invalidation_reaches_other_workers(self):
+        with transaction.atomic():
+            self.writer.invalidate("a")
+            time.sleep(0.1)
+            self.assertIn("a", local_keys(self.worker))  # not committed yet
+        self.assertTrue(self.wait_for_eviction("a"))
+        self.assertEqual(local_keys(self.worker), {"b"})
+
+    def test_rolled_back_invalidation_is_not_delivered(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.writer.invalidate("b")
+            raise RuntimeError
+        self.writer.invalidate("a")  # delivered after the dropped one
+        self.assertTrue(self.wait_for_eviction("a"))
+        self.assertEqual(local_keys(self.worker), {"b"})
+
+    def test_clear(self):
+        self.writer.clear()
+        self.assertTrue(self.wait_for_eviction("b"))
+        self.assertEqual(local_keys(self.worker), set())
+
+
+class SeparateSharedTierTests(TransactionTestCase):
+    """
+    Workers whose shared tiers are not shared with each other (file caches
+    of two nodes): the receiver drops the keys from its own shared tier
+    """
+
+    serialized_rollback = True
+
+    def setUp(self):
+        directories = [tempfile.TemporaryDirectory() for _ in range(2)]
+        for directory in directories:
+            self.addCleanup(directory.cleanup)
+        node_caches = {
+            f"node{index}": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": directory.name,
+            }
+            for index, directory in enumerate(directories)
+        }
+        overridden = override_settings(CACHES={**settings.CACHES, **node_caches})
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        self.writer = TwoTierCache(
+            "bus-nodes", timeout=60, local_timeout=60, cache_alias="node0"
+        )
+        self.worker = TwoTierCache(
+            "bus-nodes", timeout=60, local_timeout=60, cache_alias="node1"
+        )
+        listener = Listener()
+        listener.IDLE_SECONDS = 0.1
+        listener.start()
+        self.addCleanup(listener.stop)
+        self.assertTrue(listener.connected.wait(5))
+
+    def wait_for_value(self, two_tier_cache, key, value, timeout=5):
+        deadline = time.monotonic() + timeout
+        while two_tier_cache.get_or_set(key, lambda: value) != value:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def test_invalidation_reaches_the_other_shared_tier(self):
+        self.assertEqual(self.worker.get_or_set("a", lambda: 1), 1)
+        self.worker.clear_local()
+        self.assertEqual(self.worker.get_or_set("a", lambda: 2), 1)  # node1
+
+        self.writer.invalidate("a")
+        self.assertTrue(self.wait_for_value(self.worker, "a", 2))
+
+    def test_clear_reaches_the_other_shared_tier(self):
+        self.worker.get_or_set("a", lambda: 1)
+        self.writer.clear()
+        self.assertTrue(self.wait_for_value(self.worker, "a", 2))
@@ -0,0 +1,84 @@
+import logging
+import queue
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.log_handlers import AsyncHandler, LogDispatcher, RateLimitFilter
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.current_thread().name)
+
+
+def make_record(msg, *args, level=logging.WARNING):
+    return logging.LogRecord("tests", level, __file__, 1, msg, args, None)
+
+
+class AsyncHandlerTests(SimpleTestCase):
+    def test_configured_handlers_are_queued(self):
+        handlers = logging.getLogger().handlers
+        self.assertTrue(handlers)
+        self.assertTrue(all(isinstance(h, AsyncHandler) for h in handlers))
+
+    def test_records_are_handled_by_the_dispatcher_thread(self):
+        target = ListHandler(logging.WARNING)
+        dispatcher = LogDispatcher()
+        logger = logging.getLogger("api.tests.async")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(AsyncHandler(target, dispatcher))
+        self.addCleanup(logger.handlers.clear)
+        payload = {"state": "before"}
+
+        logger.info("Info %s", payload)
+        logger.warning("Task %s", payload)
+        payload["state"] = "after"
+        dispatcher.stop()
+
+        self.assertEqual(len(target.records), 1)  # handler level applies
+        self.assertEqual(target.records[0].getMessage(), "Task {'state': 'before'}")
+        self.assertEqual(target.threads, {"log-dispatcher"})
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        target = ListHandler()
+        dispatcher = LogDispatcher(maxsize=1)
+        dispatcher.queue.put((target, make_record("blocker")))  # while busy
+        with mock.patch.object(dispatcher.queue, "put_nowait", side_effect=queue.Full):
+            AsyncHandler(target, dispatcher).handle(make_record("dropped"))
+        self.assertEqual(dispatcher.dropped, 1)
+        dispatcher.stop()
+        messages = [r.getMessage() for r in target.records]
+        self.assertIn("Log queue full: 1 record(s) dropped", messages)
+        self.assertNotIn("dropped", messages)
+
+
+class RateLimitFilterTests(SimpleTestCase):
+    def test_repeated_warnings_are_suppressed_per_window(self):
+        rate_limit = RateLimitFilter(rate=2, per=60)
+        with mock.patch("api.log_handlers.time.monotonic", return_value=100.0):
+            passed = [
+                rate_limit.filter(make_record("Client error: %s", i))
+                for i in range(5)
+            ]
+            self.assertTrue(rate_limit.filter(make_record("Other %s", 1)))
+            self.assertTrue(rate_limit.filter(
+                make_record("Client error: %s", 9, level=logging.INFO)
+            ))
+        self.assertEqual(passed, [True, True, False, False, False])
+
+        record = make_record("Client error: %s", 6)
+        with mock.patch("api.log_handlers.time.monotonic", return_value=161.0):
+            self.assertTrue(rate_limit.filter(record))
+        self.assertEqual(
+            record.getMessage(),
+            "Client error: 6 (3 similar message(s) suppressed)",
+        )
@@ -0,0 +1,101 @@
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from api.metrics import (
+    REGISTRY, Counter, Histogram, MemoryStore, MmapStore, Registry,
+)
+
+from .test_setup import BaseAPITestCase
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_histogram_exposition_is_cumulative(self):
+        registry = Registry(MemoryStore())
+        latency = Histogram(
+            registry, "latency_seconds", "Latency", ("view",), (0.1, 1),
+        )
+        for value in (0.05, 0.5, 0.5, 3):
+            latency.observe(value, "TaskViewSet.list")
+
+        lines = registry.exposition().splitlines()
+        self.assertEqual(lines[:2], [
+            "# HELP latency_seconds Latency", "# TYPE latency_seconds histogram",
+        ])
+        self.assertEqual(lines[2:], [
+            'latency_seconds_bucket{view="TaskViewSet.list",le="0.1"} 1.0',
+            'latency_seconds_bucket{view="TaskViewSet.list",le="1.0"} 3.0',
+            'latency_seconds_bucket{view="TaskViewSet.list",le="+Inf"} 4.0',
+            'latency_seconds_sum{view="TaskViewSet.list"} 4.05',
+            'latency_seconds_count{view="TaskViewSet.list"} 4.0',
+        ])
+
+    def test_label_values_are_escaped(self):
+        registry = Registry(MemoryStore())
+        Counter(registry, "hits", "Hits", ("path",)).inc('a"b\\c')
+        self.assertIn('hits_total{path="a\\"b\\\\c"} 1.0', registry.exposition())
+
+    def test_mmap_stores_are_summed_across_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = Registry(MmapStore(f"{directory}/worker-1.db"))
+            second = Registry(MmapStore(f"{directory}/worker-2.db"))
+            for registry in (first, second):
+                Counter(registry, "jobs", "Jobs", ("kind",)).inc("sync", amount=2)
+
+            # enough keys to grow the file past its initial size
+            counter = first.metrics[0]
+            for i in range(3000):
+                counter.inc(f"kind-{i}")
+
+            self.assertIn('jobs_total{kind="sync"} 4.0', second.exposition())
+            reopened = MmapStore(f"{directory}/worker-1.db")
+            reopened.inc('jobs_total{kind="sync"}', 1)
+            self.assertEqual(reopened.collect()['jobs_total{kind="sync"}'], 5.0)
+            self.assertEqual(reopened.collect()['jobs_total{kind="kind-2999"}'], 1.0)
+
+
+class MetricsEndpointTests(BaseAPITestCase):
+    metrics_ep = reverse("metrics")
+
+    def setUp(self):
+        super().setUp()
+        REGISTRY.reset(MemoryStore())
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_records_request_metrics(self):
+        self.client.get(self.task_list_ep)
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer secret")
+        response = self.client.get(self.metrics_ep)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count'
+            '{view="TaskViewSet.list",method="GET",status="200"} 1.0', body
+        )
+        self.assertIn(
+            'http_request_db_queries_bucket'
+            '{view="TaskViewSet.list",method="GET",le="3.0"} 1.0', body
+        )
+        self.assertIn("# TYPE throttle_rejections counter", body)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required(self):
+        response = self.client.get(self.metrics_ep)
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_closed_without_token_outside_debug(self):
+        response = self.client.get(self.metrics_ep)
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_cache_hits_and_misses(self):
+        self.client.get(reverse("task-stats"))
+        self.client.get(reverse("task-stats"))
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer secret")
+        body = self.client.get(self.metrics_ep).content.decode()
+        self.assertIn('cache_requests_total{cache="task_stats",result="hit"} 1.0', body)
+        self.assertIn('cache_requests_total{cache="task_stats",result="miss"} 1.0', body)
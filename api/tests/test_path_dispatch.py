@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+
+
+class PathDispatchTests(TestCase):
+    def test_api_requests_skip_the_session_middleware(self):
+        response = self.client.get("/api/v1/status/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertFalse(hasattr(response.wsgi_request, "_messages"))
+
+    def test_admin_keeps_sessions_and_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.get("/admin/login/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("csrftoken", response.cookies)
+        self.assertTrue(hasattr(response.wsgi_request, "session"))
+
+        response = client.post("/admin/login/", {"username": "x", "password": "y"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_login(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="adminpass123"
+        )
+        self.client.force_login(admin)
+        response = self.client.get("/admin/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, admin)
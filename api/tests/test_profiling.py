@@ -0,0 +1,128 @@
+import os
+import tempfile
+import threading
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from api import profiling
+
+from .test_setup import BaseAPITestCase
+
+
+class ProfilingMiddlewareTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(
+            PROFILING_ENABLED=True, PROFILING_DIR=self.directory,
+            PROFILING_VIEWS=[], PROFILING_SAMPLE_RATE=0.0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_not_profiled_by_default(self):
+        response = self.client.get(self.task_list_ep)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_signed_header_forces_a_profile(self):
+        response = self.client.get(
+            self.task_list_ep, HTTP_X_PROFILE=profiling.make_profile_token()
+        )
+        name = response["X-Profile-Id"]
+        self.assertRegex(name, r"-GET-TaskViewSet\.list-[0-9a-f]{8}\.collapsed$")
+        self.assertEqual(os.listdir(self.directory), [name])
+
+        response = self.client.get(self.task_list_ep, HTTP_X_PROFILE="forged")
+        self.assertNotIn("X-Profile-Id", response)
+
+    @override_settings(PROFILING_VIEWS=["TaskViewSet.list"])
+    def test_configured_views_are_profiled(self):
+        self.assertIn("X-Profile-Id", self.client.get(self.task_list_ep))
+        self.assertNotIn("X-Profile-Id", self.client.get(self.category_list_ep))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_FILES=2)
+    def test_keeps_a_bounded_number_of_profiles(self):
+        names = [
+            self.client.get(self.category_list_ep)["X-Profile-Id"]
+            for _ in range(3)
+        ]
+        stored = sorted(os.listdir(self.directory))
+        self.assertEqual(len(stored), 2)
+        self.assertIn(names[-1], stored)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_MODE="cprofile")
+    def test_cprofile_mode_and_command(self):
+        name = self.client.get(self.task_list_ep)["X-Profile-Id"]
+        self.assertTrue(name.endswith(".prof"))
+
+        out = StringIO()
+        call_command("profiles", "list", stdout=out)
+        self.assertIn(f"{name}", out.getvalue())
+        out = StringIO()
+        call_command("profiles", "show", name, "--limit", "5", stdout=out)
+        self.assertIn("function calls", out.getvalue())
+
+    def test_admin_views(self):
+        name = self.client.get(
+            self.task_list_ep, HTTP_X_PROFILE=profiling.make_profile_token()
+        )["X-Profile-Id"]
+        download_ep = reverse("profile-download", kwargs={"name": name})
+        self.assertEqual(self.client.get(reverse("profile-list")).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+        response = self.client.get(reverse("profile-list"))
+        self.assertEqual(response.data[0]["name"], name)
+        self.assertEqual(response.data[0]["view"], "TaskViewSet.list")
+        response = self.client.get(download_ep)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get(reverse(
+                "profile-download", kwargs={"name": "settings.py"}
+            )).status_code, 404,
+        )
+
+
+class CProfilerTests(BaseAPITestCase):
+    def test_overlapping_calls(self):
+        inner = []
+
+        def outer():
+            # another request thread, profiled while this one is
+            thread = threading.Thread(target=lambda: inner.append(
+                profiling.profile_call(sum, range(10), mode="cprofile")
+            ))
+            thread.start()
+            thread.join()
+            return "outer"
+
+        result, profiler, _ = profiling.profile_call(outer, mode="cprofile")
+        self.assertEqual(result, "outer")
+        self.assertIsInstance(profiler, profiling.CProfiler)
+        (result, profiler, duration), = inner
+        self.assertEqual(result, 45)
+        self.assertIsNone(profiler)  # ran unprofiled
+        self.assertGreaterEqual(duration, 0)
+
+        _, profiler, _ = profiling.profile_call(sum, range(10), mode="cprofile")
+        self.assertIsNotNone(profiler)  # released by the first call
+
+
+class SamplingProfilerTests(BaseAPITestCase):
+    def test_collapsed_stacks(self):
+        def busy():
+            total = 0
+            for i in range(3_000_000):
+                total += i
+            return total
+
+        _, profiler, _ = profiling.profile_call(busy, mode="sample")
+        stack, count = profiler.stacks.most_common(1)[0]
+        self.assertIn("test_collapsed_stacks.<locals>.busy", stack.split(";")[-1])
+        self.assertGreater(count, 0)
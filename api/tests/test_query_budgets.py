@@ -0,0 +1,147 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from api.cache import clear_local_caches
+
+from projects.models import ProjectMembership, Role
+from projects.services import ProjectService
+from tasks.models import Category, Task
+from tasks.views import TaskViewSet
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class QueryBudgetTests(BaseAPITestCase):
+    """
+    Locks in the SQL query count of the main endpoints; counts must not
+    grow with the number of rows (N+1)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.member, _, _ = TestHelper.create_test_user_via_orm(
+            email="budget@example.com"
+        )
+        cls.category = Category.objects.create(name="Work", user=cls.user)
+        cls.project = ProjectService.create_project(owner=cls.user, name="Budget")
+        ProjectMembership.objects.create(
+            user=cls.member, project=cls.project,
+            role=Role.objects.get(name="Member"),
+        )
+        cls.project_tasks_ep = reverse(
+            "project-tasks-list", kwargs={"project_pk": cls.project.id}
+        )
+
+    def create_tasks(self, count):
+        tasks = [
+            Task.objects.create(
+                title=f"Task {i}", user=self.user, category=self.category,
+                due_date=TestHelper.get_valid_due_date(),
+                completed=True, completed_by=self.member,
+            )
+            for i in range(count)
+        ]
+        for i in range(count):
+            Task.objects.create(
+                title=f"Project task {i}", user=self.member,
+                project=self.project, due_date=TestHelper.get_valid_due_date(),
+            )
+        return tasks
+
+    def assertReadQueries(self, url, expected):
+        """
+        Same query count with one row and with a full page of rows,
+        starting from empty caches
+        """
+        self.create_tasks(1)
+        response = self.cold_get(url)
+        self.assertQueryCount(response, expected)
+        self.create_tasks(9)
+        response = self.cold_get(url)
+        self.assertQueryCount(response, expected)
+        self.assertWithinQueryBudget(response)
+
+    def cold_get(self, url):
+        cache.clear()
+        clear_local_caches()
+        return self.client.get(url)
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.task_list_ep)
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$',
+        )
+
+    def test_budget_overrun_is_logged(self):
+        with mock.patch.dict(TaskViewSet.query_budgets, {"list": 1}):
+            with self.assertLogs("TaskManagerSystem.middleware", "WARNING") as logs:
+                self.client.get(self.task_list_ep)
+        self.assertIn("(TaskViewSet.list) ran 3 queries, budget 1", logs.output[0])
+
+    def test_task_list(self):
+        self.assertReadQueries(self.task_list_ep, 4)
+
+    def test_project_task_list(self):
+        self.assertReadQueries(self.project_tasks_ep, 4)
+
+    def test_category_list(self):
+        self.assertReadQueries(self.category_list_ep, 3)
+
+    def test_project_list(self):
+        self.assertReadQueries(self.project_list_ep, 4)
+
+    def test_task_detail(self):
+        task = self.create_tasks(1)[0]
+        url = reverse("task-detail", kwargs={"pk": task.id})
+        response = self.client.get(url)
+        self.assertQueryCount(response, 2)
+        self.assertWithinQueryBudget(response)
+
+    def test_task_writes(self):
+        task = self.create_tasks(1)[0]
+        url = reverse("task-detail", kwargs={"pk": task.id})
+
+        response = self.client.patch(url, {"priority": "H"})
+        self.assertWithinQueryBudget(response)
+        response = self.client.post(
+            reverse("task-toggle-completed", kwargs={"pk": task.id})
+        )
+        self.assertWithinQueryBudget(response)
+        response = self.client.post(self.task_list_ep, {
+            "title": "New", "due_date": TestHelper.get_valid_due_date(),
+        })
+        self.assertWithinQueryBudget(response)
+        response = self.client.delete(url)
+        self.assertWithinQueryBudget(response)
+
+    def test_project_task_writes(self):
+        response = self.client.post(self.project_tasks_ep, {
+            "title": "Shared", "due_date": TestHelper.get_valid_due_date(),
+        })
+        self.assertWithinQueryBudget(response)
+        url = reverse(
+            "project-tasks-detail",
+            kwargs={"project_pk": self.project.id, "pk": response.data["id"]},
+        )
+        self.assertWithinQueryBudget(self.client.patch(url, {"priority": "L"}))
+        self.assertWithinQueryBudget(self.client.delete(url))
+
+    def test_dashboard_reads(self):
+        self.create_tasks(3)
+        for url in (
+            reverse("task-stats"),
+            reverse("task-sync"),
+            reverse("project-detail", kwargs={"pk": self.project.id}),
+            reverse("project-burndown", kwargs={"pk": self.project.id}),
+            reverse("project-velocity", kwargs={"pk": self.project.id}),
+            reverse("project-membership-list"),
+            self.role_list_ep,
+            self.user_profile_ep,
+        ):
+            with self.subTest(url=url):
+                self.assertWithinQueryBudget(self.client.get(url))
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+
+from api import querylog
+from tasks.models import Task
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class FingerprintTests(BaseAPITestCase):
+    def test_literals_and_lists_are_normalized(self):
+        self.assertEqual(
+            querylog.fingerprint(
+                "SELECT *  FROM t WHERE id IN (%s, %s, %s) AND name = 'x'' y'\n"
+                "LIMIT 21"
+            ),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+        self.assertEqual(
+            querylog.fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"),
+            querylog.fingerprint("INSERT INTO t (a, b) VALUES (%s, %s)"),
+        )
+
+
+class QueryLogTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def make_log(self, slow_ms=1000):
+        return querylog.QueryLog(
+            slow_ms=slow_ms, directory=self.directory, flush_seconds=3600,
+        )
+
+    def test_aggregates_by_fingerprint_with_call_sites(self):
+        log = self.make_log()
+        with connection.execute_wrapper(log):
+            list(Task.objects.filter(id__in=[1, 2, 3]))
+            list(Task.objects.filter(id__in=[4]))
+
+        entries = [e for e in log.entries.values() if "tasks_task" in e["fingerprint"]]
+        self.assertEqual(len(entries), 1)
+        entry = entries[0]
+        self.assertEqual(entry["count"], 2)
+        self.assertEqual(entry["slow"], 0)
+        self.assertIsNone(entry["plan"])
+        self.assertEqual(len(entry["sources"]), 2)  # two call sites
+        for source, count in entry["sources"].items():
+            self.assertRegex(source, r"^api/tests/test_querylog\.py:\d+ in test_")
+            self.assertEqual(count, 1)
+
+    def test_captures_plans_of_slow_statements(self):
+        log = self.make_log(slow_ms=0)
+        with connection.execute_wrapper(log):
+            Task.objects.filter(user=self.user).exists()
+            # the request transaction stays usable after the EXPLAIN
+            Task.objects.create(
+                title="After", user=self.user,
+                due_date=TestHelper.get_valid_due_date(),
+            )
+
+        plans = [e["plan"] for e in log.entries.values() if e["plan"]]
+        self.assertTrue(any("Scan" in plan for plan in plans))
+        self.assertTrue(Task.objects.filter(title="After").exists())
+
+    def test_merges_the_files_of_all_workers(self):
+        log = self.make_log()
+        with connection.execute_wrapper(log):
+            Task.objects.count()
+        log.flush()
+        (name,) = os.listdir(self.directory)
+        with open(os.path.join(self.directory, name)) as fp:
+            entries = json.load(fp)
+        with open(os.path.join(self.directory, "worker-0.json"), "w") as fp:
+            json.dump(entries, fp)
+
+        (query,) = querylog.top_queries(directory=self.directory)
+        self.assertEqual(query["count"], 2)
+        self.assertIn('SELECT COUNT(*) AS "__count" FROM "tasks_task"', query["fingerprint"])
+
+    def test_report_command_and_endpoint(self):
+        log = self.make_log(slow_ms=0)
+        with connection.execute_wrapper(log):
+            Task.objects.count()
+        log.flush()
+
+        with override_settings(QUERY_LOG_DIR=self.directory):
+            out = StringIO()
+            call_command("query_report", "--plans", stdout=out)
+            self.assertIn("1 calls", out.getvalue())
+            self.assertIn("Aggregate", out.getvalue())
+
+            url = reverse("query-report")
+            self.assertEqual(self.client.get(url).status_code, 403)
+            self.user.is_staff = True
+            self.user.save(update_fields=["is_staff"])
+            response = self.client.get(url, {"sort": "max"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data[0]["count"], 1)
+            self.assertEqual(self.client.get(url, {"sort": "x"}).status_code, 400)
+            for limit in ["0", "-5", "ten"]:
+                response = self.client.get(url, {"limit": limit})
+                self.assertEqual(response.status_code, 400, limit)
+            self.assertEqual(len(self.client.get(url, {"limit": 500}).data), 1)
@@ -0,0 +1,114 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from tasks.models import Task, TaskReminder
+from tasks.reminders import BaseReminderBackend, FileReminderBackend
+from tasks.services import TaskReminderService
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class RecordingBackend(BaseReminderBackend):
+    def __init__(self, fail_for=()):
+        self.sent = []
+        self.fail_for = set(fail_for)
+
+    def send(self, user, tasks):
+        if user.id in self.fail_for:
+            raise ConnectionError("delivery failed")
+        self.sent.append((user.id, [task.id for task in tasks]))
+
+
+class TaskReminderTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_user, _, _ = TestHelper.create_test_user_via_orm(
+            email="remind@example.com"
+        )
+
+    def create_task(self, title, minutes, user=None, **kwargs):
+        task = Task.objects.create(
+            title=title, user=user or self.user,
+            due_date=TestHelper.get_valid_due_date(), **kwargs
+        )
+        Task.objects.filter(pk=task.pk).update(
+            due_date=timezone.now() + timedelta(minutes=minutes)
+        )
+        return task
+
+    def send(self, backend, **kwargs):
+        kwargs.setdefault("lead", timedelta(hours=1))
+        return TaskReminderService.send_due_reminders(backend=backend, **kwargs)
+
+    def test_groups_per_user_and_skips_out_of_window(self):
+        first = self.create_task("First", 10)
+        second = self.create_task("Second", 20)
+        foreign = self.create_task("Foreign", 30, user=self.other_user)
+        self.create_task("Later", 180)
+        self.create_task("Done", 15, completed=True)
+
+        backend = RecordingBackend()
+        result = self.send(backend, batch_size=2)
+
+        self.assertEqual(result, {"tasks": 3, "users": 2, "failed": 0})
+        sent = {task_id for _, ids in backend.sent for task_id in ids}
+        self.assertEqual(sent, {first.id, second.id, foreign.id})
+        self.assertEqual(backend.sent[0], (self.user.id, [first.id, second.id]))
+
+    def test_markers_dedupe_and_rescheduling_rearms(self):
+        task = self.create_task("Once", 10)
+        self.send(RecordingBackend())
+
+        backend = RecordingBackend()
+        self.assertEqual(self.send(backend)["tasks"], 0)
+        self.assertEqual(backend.sent, [])
+
+        Task.objects.filter(pk=task.pk).update(
+            due_date=timezone.now() + timedelta(minutes=40)
+        )
+        self.assertEqual(self.send(backend)["tasks"], 1)
+        self.assertEqual(TaskReminder.objects.filter(task=task).count(), 2)
+
+    def test_failed_delivery_is_retried(self):
+        self.create_task("Mine", 10)
+        self.create_task("Theirs", 10, user=self.other_user)
+
+        result = self.send(RecordingBackend(fail_for={self.other_user.id}))
+        self.assertEqual(result, {"tasks": 1, "users": 1, "failed": 1})
+
+        backend = RecordingBackend()
+        self.send(backend)
+        self.assertEqual([user for user, _ in backend.sent], [self.other_user.id])
+
+    def test_command_with_file_backend(self):
+        self.create_task("Filed", 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "reminders.log"
+            out = StringIO()
+            with override_settings(REMINDERS_FILE_PATH=path):
+                call_command(
+                    "send_task_reminders",
+                    "--backend", "tasks.reminders.FileReminderBackend",
+                    stdout=out,
+                )
+            self.assertIn("Reminded 1 user(s) about 1 task(s)", out.getvalue())
+            payload = json.loads(path.read_text().splitlines()[0])
+        self.assertEqual(payload["email"], self.user.email)
+        self.assertEqual(payload["tasks"][0]["title"], "Filed")
+
+    def test_file_backend_appends_lines(self):
+        self.create_task("A", 10)
+        self.create_task("B", 10, user=self.other_user)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "reminders.log"
+            self.send(FileReminderBackend(path))
+            self.assertEqual(len(path.read_text().splitlines()), 2)
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from projects.models import Project, ProjectDailyRollup
+from projects.services import ProjectRollupService
+from tasks.models import Task
+from tasks.services import TaskService
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class ProjectRollupTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.project = Project.objects.create(name="Charts", owner=cls.user)
+        cls.other = Project.objects.create(name="Other", owner=cls.user)
+        cls.burndown_ep = reverse("project-burndown", kwargs={"pk": cls.project.id})
+        cls.velocity_ep = reverse("project-velocity", kwargs={"pk": cls.project.id})
+
+    def create_task(self, title, project=None, **kwargs):
+        return Task.objects.create(
+            title=title, user=self.user, project=project or self.project,
+            due_date=TestHelper.get_valid_due_date(), **kwargs
+        )
+
+    def today_rollup(self, project=None):
+        return ProjectDailyRollup.objects.get(
+            project=project or self.project, day=timezone.now().date()
+        )
+
+    def test_writes_update_counters(self):
+        first = self.create_task("First")
+        second = self.create_task("Second")
+        TaskService.toggle_completed(first, self.user)
+        TaskService.toggle_completed(first, self.user)
+        TaskService.toggle_completed(first, self.user)
+        TaskService.move_task_to_project(second, self.other.id, self.user)
+        first.delete()
+
+        rollup = self.today_rollup()
+        self.assertEqual(rollup.created, 2)
+        self.assertEqual(rollup.completed, 2)
+        self.assertEqual(rollup.reopened, 1)
+        self.assertEqual(rollup.moved_out, 1)
+        self.assertEqual(rollup.deleted, 1)
+        self.assertEqual(rollup.open_delta, 0)
+
+        other = self.today_rollup(self.other)
+        self.assertEqual((other.moved_in, other.open_delta), (1, 1))
+
+    def test_completion_via_patch_is_counted(self):
+        task = self.create_task("Patched")
+        url = reverse("task-detail", kwargs={"pk": task.id})
+        response = self.client.patch(url, {"completed": True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.today_rollup().completed, 1)
+
+    def test_project_delete_cascade_skips_rollups(self):
+        self.create_task("Doomed")
+        self.project.delete()
+        self.assertFalse(ProjectDailyRollup.objects.filter(
+            project_id=self.project.id
+        ).exists())
+
+    def test_burndown_reads_rollups(self):
+        today = timezone.now().date()
+        ProjectDailyRollup.objects.create(
+            project=self.project, day=today - timedelta(days=40),
+            created=5, open_delta=5,
+        )
+        ProjectDailyRollup.objects.create(
+            project=self.project, day=today - timedelta(days=2),
+            completed=2, open_delta=-2,
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            points = ProjectRollupService.burndown(self.project.id, 30)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(len(points), 30)
+        self.assertEqual(points[0]["remaining"], 5)
+        self.assertEqual(points[-1]["remaining"], 3)
+
+        response = self.client.get(self.burndown_ep, {"days": 7})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(response.data[-3]["completed"], 2)
+
+    def test_velocity_and_window_validation(self):
+        self.create_task("Done", completed=True)
+        response = self.client.get(self.velocity_ep, {"weeks": 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(response.data[-1]["completed"], 1)
+
+        response = self.client.get(self.velocity_ep, {"weeks": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_charts_hidden_from_non_members(self):
+        _, token, _ = TestHelper.create_test_user_via_orm(email="x@example.com")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = self.client.get(self.burndown_ep)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_backfill_rebuilds_from_history(self):
+        self.create_task("Open")
+        done = self.create_task("Done")
+        Task.objects.filter(pk=done.pk).update(
+            completed=True, completed_at=timezone.now()
+        )
+        ProjectDailyRollup.objects.all().delete()
+
+        out = StringIO()
+        call_command(
+            "backfill_project_rollups", "--batch-size", "1", stdout=out
+        )
+        self.assertIn("Wrote 1 rollup row(s)", out.getvalue())
+        rollup = self.today_rollup()
+        self.assertEqual(
+            (rollup.created, rollup.completed, rollup.open_delta), (2, 1, 1)
+        )
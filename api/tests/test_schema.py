@@ -0,0 +1,54 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+
+class SchemaArtifactTests(APITestCase):
+    spec_ep = "/swagger/?format=openapi"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(OPENAPI_SCHEMA_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def build(self, *args):
+        call_command("build_openapi_schema", *args, stdout=StringIO())
+
+    def test_missing_artifact_is_not_generated_live(self):
+        self.assertEqual(self.client.get(self.spec_ep).status_code, 404)
+        # the UI pages themselves do not need the schema
+        self.assertEqual(self.client.get("/swagger/").status_code, 200)
+        self.assertEqual(self.client.get("/redoc/").status_code, 200)
+
+    @override_settings(DEBUG=True)
+    def test_debug_falls_back_to_live_generation(self):
+        response = self.client.get(self.spec_ep)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/tasks/", response.json()["paths"])
+
+    def test_serves_the_artifact_with_etag(self):
+        with self.assertRaises(CommandError):
+            self.build("--check")
+        self.build()
+        self.build("--check")
+
+        response = self.client.get(self.spec_ep)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("/tasks/", response.json()["paths"])
+        self.assertIn("max-age", response["Cache-Control"])
+
+        response = self.client.get(
+            self.spec_ep, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get("/swagger.yaml")
+        self.assertEqual(response["Content-Type"], "application/yaml")
+        self.assertIn(b"/tasks/:", response.content)
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from projects.models import Project, ProjectDailyRollup, ProjectMembership
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def seed(self, *args):
+        out = StringIO()
+        call_command(
+            "seed_benchmark_data", "--users", "30", "--projects", "5",
+            "--tasks", "400", "--chunk-size", "64", *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_generates_requested_volumes(self):
+        output = self.seed()
+        self.assertIn("Seeded 30 users, 5 projects and 400 tasks", output)
+
+        users = User.objects.filter(username__startswith="bench42_")
+        self.assertEqual(users.count(), 30)
+        self.assertTrue(users.first().check_password("benchmark-pass"))
+        self.assertEqual(Task.objects.count(), 400)
+        self.assertEqual(Project.objects.count(), 5)
+        self.assertEqual(
+            ProjectMembership.objects.filter(role__name="Admin").count(), 5
+        )
+        self.assertTrue(OutstandingToken.objects.exists())
+        self.assertTrue(ProjectDailyRollup.objects.exists())
+
+    def test_keeps_generated_history(self):
+        self.seed("--skip-rollups")
+        self.assertFalse(ProjectDailyRollup.objects.exists())
+
+        oldest = Task.objects.order_by("created_at").first()
+        newest = Task.objects.latest("created_at")
+        self.assertLess(oldest.created_at, newest.created_at)
+        completed = Task.objects.filter(completed=True)
+        self.assertTrue(completed.exists())
+        self.assertFalse(completed.filter(completed_at__isnull=True).exists())
+
+    def test_same_seed_is_deterministic_and_not_reapplied(self):
+        self.seed()
+        signature = list(
+            Task.objects.order_by("id").values_list(
+                "title", "priority", "completed"
+            )
+        )
+        with self.assertRaises(CommandError):
+            self.seed()
+
+        Task.objects.all().delete()
+        Project.objects.all().delete()
+        User.objects.all().delete()
+        OutstandingToken.objects.all().delete()
+        self.seed()
+        self.assertEqual(
+            list(Task.objects.order_by("id").values_list(
+                "title", "priority", "completed"
+            )),
+            signature,
+        )
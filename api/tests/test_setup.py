@@ -1,6 +1,10 @@
 from typing import Optional
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APITestCase
+
+from api.cache import clear_local_caches
+from api.instrumentation import get_query_budget
 from .utils import TestHelper
 
 class BaseAPITestCase(APITestCase):
@@ -15,8 +19,10 @@ class BaseAPITestCase(APITestCase):
 
     Methods:
         setUpTestData(): Set up initial test data
-        setUp(): Configure test client
+        setUp(): Configure test client, empty the caches
         api_post(): Make authenticated POST request
+        assertQueryCount(): Lock in the SQL query count of a response
+        assertWithinQueryBudget(): Check a response against the view budget
     """
 
     @classmethod
@@ -36,6 +42,9 @@ class BaseAPITestCase(APITestCase):
         cls.role_list_ep = reverse("role-list")
 
     def setUp(self):
+        # cached rows would outlive the rollback of the previous test
+        cache.clear()
+        clear_local_caches()
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
 
     def api_post(self, endpoint: str, data: dict, token: Optional[str] = None):
@@ -43,3 +52,22 @@ class BaseAPITestCase(APITestCase):
             endpoint, data, format="json",
             HTTP_AUTHORIZATION=f"Bearer {token or getattr(self, 'token', '')}"
         )
+
+    def assertQueryCount(self, response, expected: int):
+        """Asserts the number of SQL queries run while serving response"""
+        stats = response.sql_stats
+        self.assertEqual(
+            stats.count, expected,
+            f"{response.wsgi_request.path} ran {stats.count} queries, "
+            f"expected {expected}; most repeated: {stats.most_repeated()}",
+        )
+
+    def assertWithinQueryBudget(self, response):
+        """Asserts the response stayed within the query budget of its view"""
+        budget, view_name = get_query_budget(response.wsgi_request)
+        self.assertIsNotNone(budget, f"{view_name} declares no query budget")
+        self.assertLessEqual(
+            response.sql_stats.count, budget,
+            f"{view_name} ran {response.sql_stats.count} queries, "
+            f"budget {budget}",
+        )
@@ -0,0 +1,160 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from api.mixins import SingleFlightMixin
+from api.singleflight import SingleFlight
+from projects.models import ProjectMembership, Role
+from projects.services import ProjectService
+from tasks.models import Task
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flights = SingleFlight("test")
+        self.started, self.release = threading.Event(), threading.Event()
+        self.calls = 0
+
+    def slow_compute(self, fail=False):
+        def compute():
+            self.calls += 1
+            self.started.set()
+            self.release.wait(5)
+            if fail:
+                raise RuntimeError("query failed")
+            return self.calls
+        return compute
+
+    def run_concurrently(self, count, compute):
+        results = []
+
+        def call():
+            try:
+                results.append(self.flights.run("key", compute))
+            except RuntimeError:
+                results.append("error")
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        threads[0].start()
+        self.started.wait(5)  # the leader computes
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.1)  # the followers wait for it
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_calls_share_one_computation(self):
+        self.assertEqual(self.run_concurrently(8, self.slow_compute()), [1] * 8)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flights._flights, {})
+
+    def test_nothing_is_kept_after_the_flight(self):
+        self.release.set()
+        self.flights.run("key", self.slow_compute())
+        self.assertEqual(self.flights.run("key", self.slow_compute()), 2)
+
+    def test_followers_compute_when_the_leader_fails(self):
+        results = self.run_concurrently(3, self.slow_compute(fail=True))
+        self.assertEqual(results.count("error"), 3)
+        self.assertEqual(self.calls, 3)
+
+    @override_settings(SINGLE_FLIGHT_ENABLED=False)
+    def test_disabled(self):
+        self.release.set()
+        self.flights.run("key", self.slow_compute())
+        self.assertEqual(self.flights._flights, {})
+        self.assertEqual(self.flights.run("key", self.slow_compute()), 2)
+
+
+@override_settings(SINGLE_FLIGHT_SHARED=True, SINGLE_FLIGHT_TIMEOUT=1)
+class SharedSingleFlightTests(SimpleTestCase):
+    """Leaders of other workers, simulated with the lock in the cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.flights = SingleFlight("test")
+        self.lock_key = self.flights.lock_key("key")
+
+    def test_waits_for_the_result_of_another_worker(self):
+        cache.add(self.lock_key, "theirs")
+        timer = threading.Timer(0.05, lambda: (
+            cache.set(f"{self.lock_key}:theirs", "their page"),
+            cache.delete(self.lock_key),
+        ))
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertEqual(self.flights.run("key", lambda: "my page"), "their page")
+
+    def test_computes_when_the_other_worker_fails(self):
+        cache.add(self.lock_key, "theirs")
+        timer = threading.Timer(0.05, cache.delete, [self.lock_key])
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertEqual(self.flights.run("key", lambda: "my page"), "my page")
+
+    def test_leader_releases_the_lock(self):
+        self.assertEqual(self.flights.run("key", lambda: "my page"), "my page")
+        self.assertIsNone(cache.get(self.lock_key))
+
+
+class SingleFlightMixinTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.member, cls.member_token, _ = TestHelper.create_test_user_via_orm(
+            email="flight@example.com"
+        )
+        cls.project = ProjectService.create_project(owner=cls.user, name="Flights")
+        ProjectMembership.objects.create(
+            user=cls.member, project=cls.project,
+            role=Role.objects.get(name="Viewer"),
+        )
+        cls.project_tasks_ep = reverse(
+            "project-tasks-list", kwargs={"project_pk": cls.project.id}
+        )
+
+    def flight_keys(self, *requests):
+        """Single flight keys of the requests, as (token, url) pairs"""
+        run = mock.patch.object(
+            SingleFlightMixin.single_flight, "run",
+            side_effect=lambda key, compute: compute(),
+        )
+        with run as spy:
+            for token, url in requests:
+                self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, response.data)
+        return [call.args[0] for call in spy.call_args_list]
+
+    def test_project_pages_are_per_user(self):
+        # members only list their own tasks of the project
+        owner, member = self.flight_keys(
+            (self.token, self.project_tasks_ep),
+            (self.member_token, self.project_tasks_ep),
+        )
+        self.assertNotEqual(owner, member)
+
+    def test_personal_pages_are_per_user(self):
+        owner, member = self.flight_keys(
+            (self.token, self.task_list_ep), (self.member_token, self.task_list_ep),
+        )
+        self.assertNotEqual(owner, member)
+
+    def test_writes_start_a_new_flight(self):
+        (before,) = self.flight_keys((self.token, self.project_tasks_ep))
+        Task.objects.create(
+            title="New", user=self.user, project=self.project,
+            due_date=TestHelper.get_valid_due_date(),
+        )
+        (after,) = self.flight_keys((self.token, self.project_tasks_ep))
+        self.assertNotEqual(before, after)
@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from projects.models import Project
+from tasks.models import Task, Category
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class SparseFieldsetTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = Category.objects.create(name="Work", user=cls.user)
+        cls.task = Task.objects.create(
+            title="Sparse Task",
+            description="Long description",
+            due_date=TestHelper.get_valid_due_date(),
+            user=cls.user,
+            category=cls.category,
+        )
+        cls.project = Project.objects.create(name="Sparse", owner=cls.user)
+
+    def get_first_result(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"][0]
+
+    def test_task_fields_param(self):
+        result = self.get_first_result(
+            self.task_list_ep, {"fields": "id,title,due_date,completed"}
+        )
+        self.assertEqual(
+            set(result), {"id", "title", "due_date", "completed"}
+        )
+
+    def test_task_exclude_param(self):
+        result = self.get_first_result(
+            self.task_list_ep, {"exclude": "description,category_name"}
+        )
+        self.assertNotIn("description", result)
+        self.assertNotIn("category_name", result)
+        self.assertIn("title", result)
+
+    def test_task_unknown_field_rejected(self):
+        response = self.client.get(self.task_list_ep, {"fields": "id,secret"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
+
+    def test_task_sparse_query_skips_joins_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.task_list_ep, {"fields": "id,title"})
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn("description", sql)
+        self.assertNotIn("tasks_category", sql)
+
+    def test_task_full_representation_joins_relations(self):
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.get_first_result(self.task_list_ep, {})
+        self.assertEqual(result["category_name"], "Work")
+        self.assertIn("tasks_category", ctx.captured_queries[-1]["sql"])
+
+    def test_fields_ignored_on_write(self):
+        response = self.client.post(
+            f"{self.task_list_ep}?fields=id",
+            {"title": "Write", "due_date": TestHelper.get_valid_due_date()},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn("title", response.data)
+
+    def test_project_fields_param(self):
+        result = self.get_first_result(
+            self.project_list_ep, {"fields": "id,name"}
+        )
+        self.assertEqual(set(result), {"id", "name"})
+
+    def test_project_tasks_count_still_annotated(self):
+        Task.objects.create(
+            title="In project", due_date=TestHelper.get_valid_due_date(),
+            user=self.user, project=self.project,
+        )
+        result = self.get_first_result(
+            self.project_list_ep, {"fields": "id,tasks_count"}
+        )
+        self.assertEqual(result["tasks_count"], 1)
+
+    def test_project_detail_with_fields(self):
+        url = reverse("project-detail", kwargs={"pk": self.project.id})
+        response = self.client.get(url, {"fields": "name"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"name": "Sparse"})
+
+    def test_category_fields_param(self):
+        result = self.get_first_result(
+            self.category_list_ep, {"fields": "name,tasks_count"}
+        )
+        self.assertEqual(result, {"name": "Work", "tasks_count": 1})
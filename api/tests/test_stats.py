@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from projects.models import Project, ProjectMembership, Role
+from tasks.models import Category, Task
+from tasks.services import TaskStatsService
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class TaskStatsTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.stats_ep = reverse("task-stats")
+        cls.other_user, cls.other_token, _ = (
+            TestHelper.create_test_user_via_orm(email="stats@example.com")
+        )
+        cls.project = Project.objects.create(name="Stats", owner=cls.other_user)
+        cls.project_stats_ep = reverse(
+            "project-tasks-stats", kwargs={"project_pk": cls.project.id}
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def create_task(self, title, **kwargs):
+        kwargs.setdefault("user", self.user)
+        kwargs.setdefault("due_date", TestHelper.get_valid_due_date())
+        return Task.objects.create(title=title, **kwargs)
+
+    def test_counters(self):
+        work = Category.objects.create(name="Work", user=self.user)
+        self.create_task("Open high", priority="H", category=work)
+        self.create_task("Done", priority="L", completed=True, category=work)
+        self.create_task("Favorite", is_favorite=True)
+        overdue = self.create_task("Overdue")
+        Task.objects.filter(pk=overdue.pk).update(
+            due_date=timezone.now() - timedelta(days=2)
+        )
+        self.create_task("Foreign", user=self.other_user)
+
+        response = self.client.get(self.stats_ep)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data["total"], 4)
+        self.assertEqual(data["completed"], 1)
+        self.assertEqual(data["open"], 3)
+        self.assertEqual(data["overdue"], 1)
+        self.assertEqual(data["favorites"], 1)
+        self.assertEqual(data["by_priority"], {"L": 1, "M": 2, "H": 1})
+        self.assertEqual(data["by_category"][0]["name"], "Work")
+        self.assertEqual(data["by_category"][0]["total"], 2)
+        self.assertIsNone(data["by_category"][-1]["id"])
+
+    def test_single_query(self):
+        self.create_task("One")
+        self.create_task("Two", completed=True)
+        queryset = Task.objects.filter(user=self.user, project__isnull=True)
+        with CaptureQueriesContext(connection) as ctx:
+            TaskStatsService.compute(queryset)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_cached_and_invalidated_on_write(self):
+        self.create_task("One")
+        self.assertEqual(self.client.get(self.stats_ep).data["total"], 1)
+
+        queryset = Task.objects.filter(user=self.user, project__isnull=True)
+        with CaptureQueriesContext(connection) as ctx:
+            TaskStatsService.get_stats(queryset, user_id=self.user.id)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        task = self.create_task("Two")
+        self.assertEqual(self.client.get(self.stats_ep).data["total"], 2)
+        task.delete()
+        self.assertEqual(self.client.get(self.stats_ep).data["total"], 1)
+
+    def test_project_scope_requires_membership(self):
+        self.create_task("Shared", user=self.other_user, project=self.project)
+        response = self.client.get(self.project_stats_ep)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        ProjectMembership.objects.create(
+            user=self.user, project=self.project,
+            role=Role.objects.get_or_create(name="Viewer")[0],
+        )
+        response = self.client.get(self.project_stats_ep)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total"], 1)
+
+    def test_project_scope_invalidated_on_category_changes(self):
+        ProjectMembership.objects.create(
+            user=self.user, project=self.project,
+            role=Role.objects.get_or_create(name="Viewer")[0],
+        )
+        category = Category.objects.create(name="Old", user=self.other_user)
+        self.create_task(
+            "Shared", user=self.other_user, project=self.project,
+            category=category,
+        )
+        response = self.client.get(self.project_stats_ep)
+        self.assertEqual(response.data["by_category"][0]["name"], "Old")
+
+        category.name = "New"
+        category.save()
+        response = self.client.get(self.project_stats_ep)
+        self.assertEqual(response.data["by_category"][0]["name"], "New")
+
+        category.delete()
+        response = self.client.get(self.project_stats_ep)
+        self.assertIsNone(response.data["by_category"][0]["id"])
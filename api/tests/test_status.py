@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.urls import reverse
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class ApiStatusTests(BaseAPITestCase):
+    status_ep = "/api/v1/status/"
+
+    def test_public_liveness(self):
+        self.client.credentials()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.status_ep)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "ok")
+        self.assertNotIn("database", response.data)
+
+    def test_unavailable_database_keeps_the_service_up(self):
+        self.client.credentials()
+        with mock.patch(
+            "api.views.connection.cursor", side_effect=DatabaseError("down")
+        ):
+            response = self.client.get(self.status_ep)
+        self.assertEqual(response.status_code, 200)
+
+
+class DatabaseStatusTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.database_status_ep = reverse("database-status")
+        cls.user.is_staff = True
+        cls.user.save(update_fields=["is_staff"])
+
+    def test_staff_only(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.database_status_ep).status_code, 401)
+        _, token, _ = TestHelper.create_test_user_via_orm(
+            email="nonstaff@example.com"
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(self.client.get(self.database_status_ep).status_code, 403)
+
+    def test_reports_database_readiness(self):
+        response = self.client.get(self.database_status_ep)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "ok")
+        self.assertIn("latency_ms", response.data)
+        self.assertNotIn("pool", response.data)
+
+    def test_unavailable_database(self):
+        self.client.get(self.database_status_ep)  # authenticates, caches the user
+        with mock.patch(
+            "api.views.connection.cursor", side_effect=DatabaseError("down")
+        ):
+            response = self.client.get(self.database_status_ep)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data["status"], "unavailable")
+
+    def test_pool_saturation(self):
+        pool = mock.Mock(max_size=10)
+        pool.get_stats.return_value = {
+            "pool_size": 6, "pool_available": 1, "requests_waiting": 2,
+        }
+        with mock.patch.object(
+            DatabaseWrapper, "pool", new_callable=mock.PropertyMock,
+            return_value=pool,
+        ):
+            response = self.client.get(self.database_status_ep)
+        self.assertEqual(response.data["pool"], {
+            "size": 6, "max_size": 10, "in_use": 5, "waiting": 2,
+            "saturation": 0.5,
+        })
@@ -0,0 +1,248 @@
+import base64
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from projects.models import Project, ProjectMembership, Role
+from tasks.models import Task, TaskTombstone
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+
+class TaskSyncTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.sync_ep = reverse("task-sync")
+        cls.other_user, cls.other_token, _ = (
+            TestHelper.create_test_user_via_orm(email="member@example.com")
+        )
+        cls.project = Project.objects.create(name="Shared", owner=cls.other_user)
+        ProjectMembership.objects.create(
+            user=cls.user, project=cls.project,
+            role=Role.objects.get_or_create(name="Member")[0],
+        )
+
+    def create_task(self, title, **kwargs):
+        kwargs.setdefault("user", self.user)
+        return Task.objects.create(
+            title=title, due_date=TestHelper.get_valid_due_date(), **kwargs
+        )
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params["cursor"] = cursor
+        response = self.client.get(self.sync_ep, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def age_everything(self):
+        """Moves existing rows behind the cursor lag window"""
+        past = timezone.now() - timedelta(minutes=1)
+        Task.objects.update(updated_at=past)
+        TaskTombstone.objects.update(deleted_at=past)
+
+    def test_full_sync_covers_personal_and_project_tasks(self):
+        personal = self.create_task("Personal")
+        shared = self.create_task("Shared", user=self.other_user, project=self.project)
+        self.create_task("Foreign", user=self.other_user)
+
+        data = self.sync()
+        ids = {task["id"] for task in data["tasks"]}
+        self.assertEqual(ids, {personal.id, shared.id})
+        self.assertFalse(data["has_more"])
+
+    def test_incremental_sync_returns_only_changes(self):
+        task = self.create_task("Before")
+        self.age_everything()
+        cursor = self.sync()["next_cursor"]
+
+        task.title = "After"
+        task.save()
+        data = self.sync(cursor)
+        self.assertEqual([t["title"] for t in data["tasks"]], ["After"])
+
+    def test_pagination(self):
+        for i in range(5):
+            self.create_task(f"Task {i}")
+
+        data = self.sync(limit=2)
+        seen = [t["id"] for t in data["tasks"]]
+        while data["has_more"]:
+            data = self.sync(data["next_cursor"], limit=2)
+            seen += [t["id"] for t in data["tasks"]]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_tombstones_count_against_the_limit(self):
+        tasks = [self.create_task(f"Task {i}") for i in range(3)]
+        self.age_everything()
+        cursor = self.sync()["next_cursor"]
+        deleted_ids = sorted(task.id for task in tasks)
+        for task in tasks:
+            task.delete()
+        survivor = self.create_task("Survivor")
+
+        data = self.sync(cursor, limit=2)
+        pages = [data]
+        while data["has_more"]:
+            data = self.sync(data["next_cursor"], limit=2)
+            pages.append(data)
+        for page in pages:
+            self.assertLessEqual(len(page["tasks"]) + len(page["tombstones"]), 2)
+        self.assertEqual(
+            sorted(t["task_id"] for page in pages for t in page["tombstones"]),
+            deleted_ids,
+        )
+        self.assertIn(
+            survivor.id, [t["id"] for page in pages for t in page["tasks"]]
+        )
+
+    def test_full_sync_skips_tombstones(self):
+        for i in range(3):
+            self.create_task(f"Doomed {i}").delete()
+        kept = [self.create_task(f"Task {i}") for i in range(3)]
+
+        data = self.sync(limit=2)
+        pages = [data]
+        while data["has_more"]:
+            data = self.sync(data["next_cursor"], limit=2)
+            pages.append(data)
+        self.assertEqual([t for page in pages for t in page["tombstones"]], [])
+        self.assertEqual(
+            sorted(t["id"] for page in pages for t in page["tasks"]),
+            [task.id for task in kept],
+        )
+
+        # removals after the full sync follow it
+        self.age_everything()  # the membership of the test data included
+        kept_id = kept[0].id
+        kept[0].delete()
+        data = self.sync(data["next_cursor"])
+        self.assertIn(kept_id, [t["task_id"] for t in data["tombstones"]])
+
+    def test_deleted_task_tombstone(self):
+        task = self.create_task("Doomed")
+        self.age_everything()
+        cursor = self.sync()["next_cursor"]
+
+        task_id = task.id
+        task.delete()
+        data = self.sync(cursor)
+        self.assertIn(
+            {"kind": "task", "task_id": task_id},
+            [{"kind": t["kind"], "task_id": t["task_id"]} for t in data["tombstones"]],
+        )
+
+    def test_moved_task_tombstone_for_old_project(self):
+        task = self.create_task("Mover", project=self.project)
+        target = Project.objects.create(name="Target", owner=self.user)
+        self.age_everything()
+        cursor = self.sync()["next_cursor"]
+
+        url = reverse("task-move-task", kwargs={"pk": task.id})
+        self.api_post(url, {"project_id": target.id})
+
+        tombstones = TaskTombstone.objects.filter(task_id=task.id)
+        self.assertEqual(tombstones.get().project_id, self.project.id)
+
+        # still accessible through the new project, so it is also upserted
+        data = self.sync(cursor)
+        self.assertIn(task.id, [t["id"] for t in data["tasks"]])
+
+    def test_membership_removal_tombstone(self):
+        self.create_task("Shared", user=self.other_user, project=self.project)
+        self.age_everything()
+        cursor = self.sync()["next_cursor"]
+
+        ProjectMembership.objects.filter(user=self.user).delete()
+        data = self.sync(cursor)
+        self.assertEqual(
+            [(t["kind"], t["project_id"]) for t in data["tombstones"]],
+            [("project", self.project.id)],
+        )
+        self.assertEqual(data["tasks"], [])
+
+    def test_joining_a_project_requires_a_full_sync(self):
+        project = Project.objects.create(name="Joined", owner=self.other_user)
+        existing = self.create_task("Existing", user=self.other_user, project=project)
+        self.age_everything()
+        cursor = self.sync()["next_cursor"]
+
+        for _ in range(2):  # join, and join again after leaving
+            ProjectMembership.objects.create(
+                user=self.user, project=project,
+                role=Role.objects.get_or_create(name="Member")[0],
+            )
+            response = self.client.get(self.sync_ep, {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+            data = self.sync()
+            self.assertIn(existing.id, [t["id"] for t in data["tasks"]])
+            self.assertNotIn(  # grants are not sent
+                "grant", [t["kind"] for t in data["tombstones"]]
+            )
+            self.age_everything()
+            cursor = self.sync()["next_cursor"]
+            ProjectMembership.objects.filter(user=self.user, project=project).delete()
+            self.age_everything()
+            cursor = self.sync(cursor)["next_cursor"]
+
+    def test_project_deletion_skips_per_task_tombstones(self):
+        project = Project.objects.create(name="Gone", owner=self.user)
+        self.create_task("A", project=project)
+        self.create_task("B", project=project)
+
+        project.delete()
+        self.assertFalse(
+            TaskTombstone.objects.filter(kind=TaskTombstone.KIND_TASK).exists()
+        )
+        self.assertTrue(
+            TaskTombstone.objects.filter(
+                kind=TaskTombstone.KIND_PROJECT, user_id=self.user.id
+            ).exists()
+        )
+
+    def test_invalid_and_expired_cursor(self):
+        response = self.client.get(self.sync_ep, {"cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        from tasks.services import TaskSyncService
+
+        old = TaskSyncService.encode_cursor(
+            timezone.now() - timedelta(days=365), 0
+        )
+        response = self.client.get(self.sync_ep, {"cursor": old})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_cursor_with_offset_or_in_the_future(self):
+        for timestamp in [
+            "2099-01-01T00:00:00+00:00", "2020-01-01T00:00:00+02:00",
+            "2099-01-01T00:00:00",
+        ]:
+            cursor = base64.urlsafe_b64encode(f"{timestamp}|1".encode()).decode()
+            with self.subTest(timestamp=timestamp):
+                response = self.client.get(self.sync_ep, {"cursor": cursor})
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_purge_tombstones_command(self):
+        TaskTombstone.objects.create(
+            task_id=1, user_id=self.user.id,
+            deleted_at=timezone.now() - timedelta(days=90),
+        )
+        TaskTombstone.objects.create(task_id=2, user_id=self.user.id)
+
+        call_command("purge_task_tombstones", days=30, stdout=StringIO())
+        self.assertEqual(
+            list(TaskTombstone.objects.filter(
+                kind=TaskTombstone.KIND_TASK
+            ).values_list("task_id", flat=True)),
+            [2],
+        )
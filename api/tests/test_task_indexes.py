@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from projects.services import ProjectService
+from tasks.models import Category, Task
+
+from .test_setup import BaseAPITestCase
+from .utils import TestHelper
+
+User = get_user_model()
+
+
+class TaskIndexPlanTests(BaseAPITestCase):
+    """
+    Plan regression tests: every task query of a list request is served
+    from an index. Sequential scans are disabled, so a statement no index
+    can serve still shows a Seq Scan; where an index was added for a
+    request, the test also checks it is the one used
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = Category.objects.create(name="Work", user=cls.user)
+        cls.project = ProjectService.create_project(owner=cls.user, name="Plans")
+        # the user owns a small share of the table, like any user in production
+        others = User.objects.bulk_create(
+            User(username=f"other{index}", email=f"other{index}@example.com")
+            for index in range(79)
+        )
+        owners = [cls.user, *others]
+        tasks = []
+        for index in range(4000):
+            owner = owners[index % len(owners)]
+            tasks.append(Task(
+                title=f"Task {index}",
+                user=owner,
+                due_date=TestHelper.get_valid_due_date(index % 30),
+                project=cls.project if index % 4 == 0 else None,
+                category=cls.category if index % 240 == 0 else None,
+                priority="LMH"[index % 3],
+                completed=index % 4 == 1,
+                is_favorite=index % 11 == 0,
+            ))
+        Task.objects.bulk_create(tasks)
+        cls.project_tasks_ep = reverse(
+            "project-tasks-list", kwargs={"project_pk": cls.project.id}
+        )
+
+    def setUp(self):
+        super().setUp()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE tasks_task")
+
+    def task_plans(self, url, params=None):
+        """EXPLAIN plans of the tasks_task SELECTs run for a GET request"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+
+        statements = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "tasks_task"' in query["sql"]
+        ]
+        self.assertTrue(statements)
+        plans = []
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for sql in statements:
+                cursor.execute(f"EXPLAIN {sql}")
+                plans.append("\n".join(row[0] for row in cursor.fetchall()))
+            cursor.execute("SET LOCAL enable_seqscan = on")
+        return plans
+
+    def assertIndexScans(self, url, params=None, index=None):
+        plans = self.task_plans(url, params)
+        for plan in plans:
+            self.assertNotIn("Seq Scan on tasks_task", plan)
+        if index is not None:
+            self.assertIn(index, "\n".join(plans))
+
+    def test_personal_list(self):
+        self.assertIndexScans(self.task_list_ep, index="task_personal_idx")
+
+    def test_personal_filters(self):
+        for params in [
+            {"completed": "false"},
+            {"completed": "true"},
+            {"priority": "H"},
+            {"is_favorite": "true"},
+            {"today": "true"},
+            {"completed": "false", "priority": "H"},
+        ]:
+            with self.subTest(**params):
+                self.assertIndexScans(self.task_list_ep, params)
+
+    def test_category_filter(self):
+        self.assertIndexScans(
+            self.task_list_ep, {"category": self.category.id},
+            index="tasks_task_categor_",
+        )
+
+    def test_favorites(self):
+        self.assertIndexScans(
+            self.task_favorites_ep, index="task_personal_favorite_idx"
+        )
+
+    def test_today(self):
+        self.assertIndexScans(self.task_today_ep)
+
+    def test_urgency_ordering(self):
+        self.assertIndexScans(
+            self.task_list_ep, {"completed": "false", "ordering": "urgency"},
+            index="tasks_task_user_id_e81759_idx",
+        )
+
+    def test_project_list(self):
+        self.assertIndexScans(self.project_tasks_ep)
+
+    def test_project_filters(self):
+        for params in [
+            {"completed": "false"},
+            {"priority": "M"},
+            {"is_favorite": "true"},
+            {"search": "Task 1"},
+        ]:
+            with self.subTest(**params):
+                self.assertIndexScans(self.project_tasks_ep, params)
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+            cursor.execute("SET LOCAL enable_seqscan = on")
+        return plan
+
+    def test_project_open_tasks_by_due_date(self):
+        # whole project scope (stats, rollups), next tasks due first
+        queryset = Task.objects.filter(
+            project=self.project, completed=False
+        ).order_by("due_date")[:10]
+        self.assertIn("tasks_task_project_9af100_idx", self.explain(queryset))
+
+    def test_open_tasks_due_soon(self):
+        # reminders: open tasks due in a window, across users
+        start = timezone.now()
+        queryset = Task.objects.filter(
+            completed=False, due_date__gte=start,
+            due_date__lt=start + timedelta(hours=1),
+        ).order_by("due_date", "id")
+        self.assertIn("task_open_due_idx", self.explain(queryset))
@@ -3,7 +3,7 @@ from django.urls import reverse
 from django.utils.timezone import now
 from rest_framework import status
 
-from projects.models import Project
+from projects.models import Project, ProjectMembership, Role
 from tasks.models import Task, Category
 
 from .test_setup import BaseAPITestCase
@@ -467,3 +467,79 @@ class TaskAPITests(BaseAPITestCase):
         self.assertEqual(
             titles, expected_titles, "Tasks are not sorted correctly by title"
         )
+
+    def sorted_titles(self, ordering):
+        response = self.client.get(self.task_list_ep, {"ordering": ordering})
+        return [task["title"] for task in response.data["results"]]
+
+    def test_sorting_by_priority(self):
+        self.assertEqual(
+            self.sorted_titles("priority"),
+            ["Future Task", "Simple Task", "Today Task"],
+            "Tasks are not sorted from low to high priority",
+        )
+        self.assertEqual(
+            self.sorted_titles("-priority"),
+            ["Today Task", "Simple Task", "Future Task"],
+            "Tasks are not sorted from high to low priority",
+        )
+
+    def test_sorting_by_urgency(self):
+        Task.objects.create(
+            title="Later High", due_date=TestHelper.get_valid_due_date(3),
+            user=self.user, priority="H",
+        )
+        self.assertEqual(
+            self.sorted_titles("urgency"),
+            ["Today Task", "Later High", "Simple Task", "Future Task"],
+            "Tasks are not sorted by priority, then due date",
+        )
+
+    def test_priority_rank_follows_priority(self):
+        self.task.priority = "H"
+        self.task.save()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.priority_rank, Task.PRIORITY_RANKS["H"])
+
+
+class ProjectTaskVisibilityTests(BaseAPITestCase):
+    """Nested task routes of projects the user cannot view answer 404"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.viewer, cls.viewer_token, _ = TestHelper.create_test_user_via_orm(
+            email="viewer@example.com"
+        )
+        cls.outsider, cls.outsider_token, _ = TestHelper.create_test_user_via_orm(
+            email="outsider@example.com"
+        )
+        cls.project = Project.objects.create(name="Hidden", owner=cls.user)
+        ProjectMembership.objects.create(
+            user=cls.viewer, project=cls.project,
+            role=Role.objects.get(name="Viewer"),
+        )
+        cls.project_tasks_ep = reverse(
+            "project-tasks-list", kwargs={"project_pk": cls.project.id}
+        )
+
+    def test_members_list_tasks(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.viewer_token}")
+        response = self.client.get(self.project_tasks_ep)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_outsiders_get_not_found(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.outsider_token}")
+        response = self.client.get(self.project_tasks_ep)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(self.project_tasks_ep, {
+            "title": "Intruder", "due_date": TestHelper.get_valid_due_date(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Task.objects.filter(title="Intruder").exists())
+
+    def test_missing_project(self):
+        url = reverse("project-tasks-list", kwargs={"project_pk": 999999})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
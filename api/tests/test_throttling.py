@@ -0,0 +1,109 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory
+
+from api import throttling
+from api.throttling import (
+    AnonSlidingWindowThrottle, CacheStore, LocalMemoryStore, SharedMemoryStore,
+)
+
+
+class StoreTestsMixin:
+    def create_store(self):
+        raise NotImplementedError
+
+    def test_counts_per_key_and_window(self):
+        store = self.create_store()
+        self.assertEqual(store.incr("a", 10, 60), (1, 0))
+        self.assertEqual(store.incr("a", 10, 60), (2, 0))
+        self.assertEqual(store.incr("b", 10, 60), (1, 0))
+        self.assertEqual(store.incr("a", 11, 60), (1, 2))  # previous window
+        self.assertEqual(store.incr("a", 11, 60, -1), (0, 2))
+        self.assertEqual(store.incr("a", 13, 60), (1, 0))  # windows skipped
+
+
+class LocalMemoryStoreTests(StoreTestsMixin, SimpleTestCase):
+    def create_store(self):
+        return LocalMemoryStore()
+
+
+class CacheStoreTests(StoreTestsMixin, SimpleTestCase):
+    def create_store(self):
+        store = CacheStore()
+        store.reset()
+        self.addCleanup(store.reset)
+        return store
+
+
+class SharedMemoryStoreTests(StoreTestsMixin, SimpleTestCase):
+    def create_store(self, slots=1024):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "throttle.bin")
+        return SharedMemoryStore(self.path, slots)
+
+    def test_processes_share_the_counters(self):
+        worker = self.create_store()
+        other_worker = SharedMemoryStore(self.path, 1024)
+        worker.incr("a", 10, 60)
+        self.assertEqual(other_worker.incr("a", 10, 60), (2, 0))
+
+    def test_full_probe_range_reuses_the_first_expiring_slot(self):
+        store = self.create_store(slots=SharedMemoryStore.PROBES)
+        days = [f"day-{index}" for index in range(SharedMemoryStore.PROBES - 1)]
+        for key in days:
+            store.incr(key, 10, 86400)
+        store.incr("minute", 1000, 60)
+        self.assertEqual(store.incr("minute", 1000, 60), (2, 0))
+
+        # table full: the minute counter expires long before the day ones
+        store.incr("day-new", 10, 86400)
+        for key in days:
+            self.assertEqual(store.incr(key, 10, 86400), (2, 0))
+        self.assertEqual(store.incr("day-new", 10, 86400), (2, 0))
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        store = mock.patch.object(throttling, "STORE", LocalMemoryStore())
+        store.start()
+        self.addCleanup(store.stop)
+        self.request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+        self.request.user = None
+        self.now = 6000.0  # start of minute window 100
+
+    def throttle(self):
+        throttle = AnonSlidingWindowThrottle()
+        throttle.rate = "3/min"
+        throttle.num_requests, throttle.duration = 3, 60
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def allow(self):
+        throttle = self.throttle()
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_rejects_over_the_rate_without_counting_rejections(self):
+        for _ in range(3):
+            self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        # the 3 requests become the previous window: a 4th request needs
+        # 1 - 2/3 of it slid out
+        self.assertAlmostEqual(throttle.wait(), 60 + 20)
+
+        self.now += 60 + 20
+        self.assertTrue(self.allow()[0])
+        self.assertFalse(self.allow()[0])
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(3):
+            self.allow()
+        self.now += 60 + 30  # half of the previous window still counts
+        self.assertTrue(self.allow()[0])  # 1.5 + 1
+        allowed, throttle = self.allow()  # 1.5 + 2
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 10)  # 1 + 1 at 2/3 slid out
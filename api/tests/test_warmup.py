@@ -0,0 +1,49 @@
+import gc
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase
+
+from api.warmup import warm_up
+from projects.models import Role
+
+
+class RoleRegistryTests(TestCase):
+    def setUp(self):
+        Role.objects.clear_cache()
+        self.addCleanup(Role.objects.clear_cache)
+
+    def test_name_lookups_are_cached(self):
+        with self.assertNumQueries(1):
+            admin = Role.objects.get_by_name("Admin")
+        with self.assertNumQueries(0):
+            self.assertEqual(Role.objects.get_by_name("Admin"), admin)
+
+    def test_saving_a_role_clears_the_cache(self):
+        Role.objects.warm()
+        Role.objects.get_by_name("Viewer").save()
+        with self.assertNumQueries(1):
+            Role.objects.get_by_name("Viewer")
+
+
+class WarmUpTests(TransactionTestCase):
+    serialized_rollback = True
+
+    def setUp(self):
+        Role.objects.clear_cache()
+        self.addCleanup(Role.objects.clear_cache)
+        self.addCleanup(gc.unfreeze)
+
+    def test_loads_caches_and_closes_connections(self):
+        connection.ensure_connection()
+        warm_up()
+        self.assertIsNone(connection.connection)
+        self.assertGreater(gc.get_freeze_count(), 0)
+        with self.assertNumQueries(0):
+            Role.objects.get_by_name("Admin")
+
+    def test_unreachable_database(self):
+        with mock.patch.object(
+            Role.objects, "warm", side_effect=DatabaseError("down")
+        ), self.assertLogs("api.warmup", "WARNING"):
+            warm_up()
@@ -0,0 +1,243 @@
+"""
+Sliding-window throttling with O(1) counters.
+
+DRF's SimpleRateThrottle keeps the list of request timestamps of every
+client in the cache and rewrites it on each request (with LocMemCache, a
+pickled list of up to `num_requests` floats per request), per process.
+
+SlidingWindowThrottle keeps two counters per client instead: requests in
+the current fixed window and in the previous one, the previous one weighted
+by how much of it still overlaps the sliding window:
+
+    estimate = previous * (1 - elapsed / duration) + current
+
+Counters live in THROTTLE_STORE:
+- SharedMemoryStore (default): a memory-mapped file shared by every worker
+  of the node, updated under a byte-range lock
+- CacheStore: atomic increments in the Django cache; holds across nodes
+  with a shared cache (Redis, Memcached)
+- LocalMemoryStore: a dict, per process
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import (
+    AnonRateThrottle, SimpleRateThrottle, UserRateThrottle,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: no SharedMemoryStore
+    fcntl = None
+
+
+class LocalMemoryStore:
+    """Counters of the current process"""
+
+    def __init__(self):
+        self._counters = {}  # key -> [window, count, previous count]
+        self._lock = threading.Lock()
+
+    def incr(self, key, window, duration, amount=1):
+        """
+        Adds to the counter of the key in the window (number `window` of
+        `duration` seconds); returns (count, previous window count)
+        """
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                if len(self._counters) > 100_000:
+                    self._counters.clear()
+                counter = self._counters[key] = [window, 0, 0]
+            roll(counter, window)
+            counter[1] += amount
+            return counter[1], counter[2]
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+def roll(counter, window):
+    """Moves a [window, count, previous] counter to the given window"""
+    if counter[0] == window:
+        return
+    counter[2] = counter[1] if counter[0] == window - 1 else 0
+    counter[1] = 0
+    counter[0] = window
+
+
+class SharedMemoryStore:
+    """
+    Counters shared by the processes of a node: a memory-mapped file of
+    fixed-size slots [key hash, window, count, previous count, expiry],
+    probed from the hash of the key. The probed slots are locked with
+    fcntl (processes) and a thread lock (threads of one process). When
+    all probed slots are in use, the one expiring first is reused.
+    """
+
+    SLOT = struct.Struct("<Qqiid")
+    PROBES = 8
+
+    def __init__(self, path=None, slots=None):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryStore needs fcntl (POSIX)")
+        self.path = path or settings.THROTTLE_SHM_PATH or default_shm_path()
+        self.slots = slots or settings.THROTTLE_SHM_SLOTS
+        self._map = None
+        self._file = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def _open(self):
+        self._file = open(self.path, "a+b")
+        size = self.slots * self.SLOT.size
+        if os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    def incr(self, key, window, duration, amount=1):
+        if self._map is None:
+            self._open()
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        key_hash = int.from_bytes(digest, "little") or 1  # 0: free slot
+        first = key_hash % (self.slots - self.PROBES + 1)
+        start, length = first * self.SLOT.size, self.PROBES * self.SLOT.size
+        window_start = window * duration
+        slot_struct = self.SLOT
+
+        with self._lock:
+            fcntl.lockf(self._file, fcntl.LOCK_EX, length, start)
+            try:
+                position = free = victim = None
+                for offset in range(start, start + length, slot_struct.size):
+                    slot_hash, slot_window, count, previous, expiry = (
+                        slot_struct.unpack_from(self._map, offset)
+                    )
+                    if slot_hash == key_hash:
+                        position, counter = offset, [slot_window, count, previous]
+                        break
+                    if expiry <= window_start:  # free or expired
+                        free = offset if free is None else free
+                    elif victim is None or expiry < victim[1]:
+                        victim = (offset, expiry)
+                if position is None:
+                    position = free if free is not None else victim[0]
+                    counter = [window, 0, 0]
+
+                roll(counter, window)
+                counter[1] += amount
+                # both counters are useless two windows later
+                slot_struct.pack_into(
+                    self._map, position, key_hash, *counter,
+                    (window + 2) * duration,
+                )
+                return counter[1], counter[2]
+            finally:
+                fcntl.lockf(self._file, fcntl.LOCK_UN, length, start)
+
+    def reset(self):
+        if self._map is None:
+            self._open()
+        with self._lock:
+            self._map[:] = bytes(len(self._map))
+
+
+def default_shm_path():
+    """Per-checkout file in /dev/shm (RAM) when available"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    suffix = hashlib.sha1(str(settings.BASE_DIR).encode()).hexdigest()[:8]
+    return os.path.join(directory, f"tms-throttle-{suffix}.bin")
+
+
+class CacheStore:
+    """Counters in the Django cache, one key per client and window"""
+
+    def __init__(self, cache_alias="default"):
+        self.cache = caches[cache_alias]
+
+    def incr(self, key, window, duration, amount=1):
+        current_key = f"throttle:{key}:{window}"
+        try:
+            count = self.cache.incr(current_key, amount)
+        except ValueError:  # first request of the window
+            self.cache.add(current_key, 0, 2 * duration)
+            count = self.cache.incr(current_key, amount)
+        previous = self.cache.get(f"throttle:{key}:{window - 1}", 0)
+        return count, previous
+
+    def reset(self):
+        self.cache.clear()
+
+
+STORE = None
+
+
+def get_store():
+    global STORE
+    if STORE is None:
+        store_class = import_string(settings.THROTTLE_STORE)
+        if store_class is SharedMemoryStore and fcntl is None:
+            store_class = LocalMemoryStore
+        STORE = store_class()
+    return STORE
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with sliding-window counters (see module docstring).
+    Rejected requests are not counted, as with DRF's throttles
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        store = get_store()
+        window, elapsed = divmod(self.timer(), self.duration)
+        window = int(window)
+        count, previous = store.incr(self.key, window, self.duration)
+        self.estimate = (count, previous, elapsed)
+        if previous * (1 - elapsed / self.duration) + count <= self.num_requests:
+            return True
+        store.incr(self.key, window, self.duration, -1)
+        return self.throttle_failure()
+
+    def wait(self):
+        """Seconds until the estimate lets one more request through"""
+        count, previous, elapsed = self.estimate
+        count -= 1  # the rejected request is not counted
+        allowed = self.num_requests - 1
+        if count <= allowed and previous:
+            # wait for the previous window to slide out enough
+            overlap = (allowed - count) / previous
+            return max((1 - overlap) * self.duration - elapsed, 0.0)
+        # count alone is over the limit: it becomes the previous window
+        next_window = self.duration - elapsed
+        if count <= 0:
+            return next_window
+        overlap = allowed / count
+        return next_window + max(1 - overlap, 0.0) * self.duration
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottle, AnonRateThrottle):
+    """AnonRateThrottle (per IP address, "anon" rate) on sliding windows"""
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottle, UserRateThrottle):
+    """UserRateThrottle (per user, "user" rate) on sliding windows"""
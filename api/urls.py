@@ -1,8 +1,16 @@
 from django.urls import path, include
-from api.views import api_status
+from api.views import (
+    api_status, database_status_view, metrics_view, profile_download,
+    profile_list, query_report,
+)
 
 urlpatterns = [
     path("status/", api_status),
+    path("status/database/", database_status_view, name="database-status"),
+    path("metrics/", metrics_view, name="metrics"),
+    path("profiles/", profile_list, name="profile-list"),
+    path("profiles/<str:name>/", profile_download, name="profile-download"),
+    path("queries/", query_report, name="query-report"),
     path("account/", include("users.urls")),
     path("tasks/", include("tasks.urls")),
     path("projects/", include("projects.urls")),
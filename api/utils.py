@@ -1,6 +1,7 @@
+import hashlib
 import logging
-import traceback
 from typing import Optional
+from django.utils.http import parse_etags
 from rest_framework.response import Response
 from rest_framework import status
 
@@ -18,8 +19,8 @@ def error_response(
     If exc is passed, it logs the stack trace on the server
     """
     if exc is not None:
-        # Logging of a full stack trade
-        logger.error("Internal error: %s\n%s", exc, traceback.format_exc())
+        # Full stack trace, formatted by the logging thread
+        logger.error("Internal error: %s", exc, exc_info=exc)
 
     # We return only a general message to the client
     safe_message = message or "An internal server error occurred"
@@ -31,3 +32,36 @@ def status_response(message, http_status=None):
     Generates a response with the ‘status’ field and the specified HTTP status
     """
     return Response({"status": message}, status=http_status)
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    """
+    Builds a quoted ETag from arbitrary validator parts
+    (timestamps, counters, ids, query strings)
+    """
+    raw = "|".join(str(part) for part in parts).encode()
+    digest = hashlib.blake2b(raw, digest_size=12).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(header: Optional[str], etag: str, *, weak: bool = True):
+    """
+    Checks an If-None-Match (weak comparison) or
+    If-Match (strong comparison, weak=False) header against an ETag
+    """
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if "*" in candidates:
+        return True
+    if weak:
+        opaque = etag.removeprefix("W/")
+        return any(tag.removeprefix("W/") == opaque for tag in candidates)
+    return not etag.startswith("W/") and etag in candidates
+
+
+def not_modified_response(etag: str):
+    """
+    Generates an empty 304 Not Modified response carrying the ETag
+    """
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
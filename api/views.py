@@ -1,13 +1,58 @@
+import hmac
+import time
+
 from django.conf import settings
 from datetime import datetime
+from django.db import DatabaseError, connection
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework import status
 from rest_framework.response import Response
 
+from api import profiling, querylog
+from api.metrics import REGISTRY
+from api.utils import error_response
+
+QUERY_REPORT_MAX_LIMIT = 200
+
+
+def database_status():
+    """
+    Readiness of the default database: round-trip latency and, with
+    DB_POOL, the pool saturation (connections in use / max size)
+    """
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return {"status": "unavailable"}
+    info = {
+        "status": "ok",
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+    }
+
+    pool = connection.pool
+    if pool is not None:
+        stats = pool.get_stats()
+        in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+        info["pool"] = {
+            "size": stats.get("pool_size", 0),
+            "max_size": pool.max_size,
+            "in_use": in_use,
+            "waiting": stats.get("requests_waiting", 0),
+            "saturation": round(in_use / pool.max_size, 2),
+        }
+    return info
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def api_status(request):
+    """Public liveness probe: no database access, no internals"""
     return Response(
         {
             "status": "ok",
@@ -16,3 +61,84 @@ def api_status(request):
             "message": "TaskManager API is up and running",
         }
     )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def database_status_view(request):
+    """
+    Database readiness (staff only): latency, connection reuse and pool
+    saturation; 503 while the database is unreachable
+    """
+    database = database_status()
+    ready = database["status"] == "ok"
+    return Response(
+        database,
+        status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint (plain Django view: no JWT, throttling or
+    content negotiation). Requires `Authorization: Bearer <METRICS_TOKEN>`
+    when the token is set, otherwise only served in DEBUG
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        expected = f"Bearer {token}"
+        given = request.META.get("HTTP_AUTHORIZATION", "")
+        if not hmac.compare_digest(given.encode(), expected.encode()):
+            return HttpResponseForbidden("Invalid metrics token")
+    elif not settings.DEBUG:
+        return HttpResponseForbidden("METRICS_TOKEN is not configured")
+
+    return HttpResponse(
+        REGISTRY.exposition(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+metrics_view.query_budget = 0
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Stored request profiles, newest first (staff only)"""
+    return Response(profiling.list_profiles())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_download(request, name):
+    """
+    Raw profile file: collapsed stacks (flamegraph.pl, speedscope) or a
+    pstats dump (snakeviz)
+    """
+    path = profiling.get_profile_path(name)
+    if path is None:
+        raise Http404("Profile not found")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def query_report(request):
+    """
+    Heaviest SQL fingerprints of all workers (staff only);
+    ?sort=total|count|max|mean&limit=20 (1..200)
+    """
+    sort = request.query_params.get("sort", "total")
+    if sort not in querylog.SORT_KEYS:
+        return error_response(
+            f"sort must be one of: {', '.join(querylog.SORT_KEYS)}"
+        )
+    try:
+        limit = int(request.query_params.get("limit", 20))
+    except (TypeError, ValueError):
+        limit = 0
+    if limit < 1:
+        return error_response("limit must be a positive integer")
+    limit = min(limit, QUERY_REPORT_MAX_LIMIT)
+    return Response(querylog.top_queries(sort=sort, limit=limit))
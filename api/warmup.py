@@ -0,0 +1,42 @@
+"""
+Work done once in the gunicorn master before it forks the workers
+(gunicorn.conf.py, preload_app): whatever is loaded here is shared
+copy-on-write by all workers instead of being rebuilt by each of them on
+its first request.
+
+- imports the URLconf and every view, serializer and filter it references,
+  and builds the URL resolver caches
+- loads the Role registry
+- closes the database connections (a socket must not be shared by forked
+  processes) and moves the objects loaded so far out of the garbage
+  collector, so that collections in the workers do not touch (and copy)
+  their pages
+"""
+
+import gc
+import logging
+import time
+
+from django.db import DatabaseError, connections
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    started = time.perf_counter()
+
+    get_resolver().url_patterns
+    reverse("metrics")  # fills the reverse lookup caches
+
+    from projects.models import Role
+
+    try:
+        Role.objects.warm()
+    except DatabaseError as exc:  # database not reachable yet: lazy lookups
+        logger.warning("Role registry not warmed: %s", exc)
+
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+    logger.info("Warmed up in %.0f ms", (time.perf_counter() - started) * 1000)
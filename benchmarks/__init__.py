@@ -0,0 +1,6 @@
+"""
+Standalone performance benchmarks.
+
+Each module is runnable as `python -m benchmarks.<name>` and works
+against a throwaway test database, so it never touches real data
+"""
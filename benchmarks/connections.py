@@ -0,0 +1,91 @@
+"""
+Measures the per-request cost of opening database connections: the same
+authenticated request with a new connection per request (CONN_MAX_AGE=0),
+persistent connections (with and without health checks) and, when DB_POOL
+is enabled, the psycopg pool.
+
+Requests run through the same connection lifecycle as a WSGI worker
+(close_old_connections on request start and finish).
+
+Usage:
+    python -m benchmarks.connections [--repeat 200]
+"""
+
+import argparse
+
+from .utils import measure, print_table, setup_django, test_database
+
+
+def run(repeat):
+    from django.contrib.auth import get_user_model
+    from django.db import close_old_connections, connection
+    from django.db.backends.signals import connection_created
+    from rest_framework.test import APIClient
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from tasks.models import Task
+
+    user = get_user_model().objects.create_user(
+        username="bench", email="bench@example.com", password="benchpass123"
+    )
+    Task.objects.bulk_create(
+        Task(title=f"Task {i}", user=user, due_date=timezone.now())
+        for i in range(50)
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+
+    def request():
+        close_old_connections()  # request_started
+        response = client.get("/api/v1/tasks/")
+        close_old_connections()  # request_finished
+        return response
+
+    connects = []
+    connection_created.connect(lambda **kwargs: connects.append(1), weak=False)
+
+    modes = [
+        ("new connection per request", 0, False),
+        ("persistent", 60, False),
+        ("persistent + health checks", 60, True),
+    ]
+    if connection.pool is not None:
+        modes = [("pool (DB_POOL)", 0, True)]
+    original = dict(connection.settings_dict)
+
+    rows = []
+    for name, max_age, health_checks in modes:
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+        connects.clear()
+        timings, response = measure(request, repeat=repeat)
+        assert response.status_code == 200, response.status_code
+        rows.append({
+            "mode": name,
+            "connects": len(connects),
+            "mean_ms": f"{timings['mean_ms']:.2f}",
+            "p50_ms": f"{timings['p50_ms']:.2f}",
+            "p95_ms": f"{timings['p95_ms']:.2f}",
+        })
+
+    connection.close()
+    connection.settings_dict.update(original)
+    print_table(rows, ["mode", "connects", "mean_ms", "p50_ms", "p95_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Delay between a committed cache invalidation and the eviction of the key
+from the local tier of another worker, through the invalidation bus
+(api.invalidation: NOTIFY on commit, LISTEN thread per process), and the
+cost of publishing it in the writing request.
+
+Usage:
+    python -m benchmarks.invalidation [--repeat 500]
+"""
+
+import argparse
+import time
+
+from .utils import print_table, setup_django, summarize, test_database
+
+
+def run(repeat):
+    from django.db import transaction
+
+    from api.cache import TwoTierCache
+    from api.invalidation import Listener
+
+    writer = TwoTierCache("bench-bus", local_timeout=3600)
+    worker = TwoTierCache("bench-bus", local_timeout=3600)  # another process
+    listener = Listener()
+    listener.start()
+    assert listener.connected.wait(5), "listener could not connect"
+
+    publish, delivery = [], []
+    try:
+        for index in range(repeat):
+            key = str(index)
+            worker._set_local(key, index)
+            started = time.perf_counter()
+            with transaction.atomic():
+                writer.invalidate(key)
+            committed = time.perf_counter()
+            while key in worker._local:
+                time.sleep(0.0001)
+            publish.append((committed - started) * 1000)
+            delivery.append((time.perf_counter() - committed) * 1000)
+    finally:
+        listener.stop()
+
+    rows = []
+    for name, samples in [
+        ("invalidate() + commit", publish),
+        ("commit -> evicted in the worker", delivery),
+    ]:
+        timings = summarize(samples)
+        rows.append({
+            "step": name,
+            "mean_ms": f"{timings['mean_ms']:.3f}",
+            "p50_ms": f"{timings['p50_ms']:.3f}",
+            "p99_ms": f"{timings['p99_ms']:.3f}",
+        })
+    print_table(rows, ["step", "mean_ms", "p50_ms", "p99_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
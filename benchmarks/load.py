@@ -0,0 +1,580 @@
+"""
+End-to-end HTTP load benchmark for the API.
+
+Drives weighted scenario mixes through the real URLconf, either
+in-process (Django test client on a throwaway database seeded with
+seed_benchmark_data; SQL queries are counted per request) or against a
+running server (--url; the server database must be seeded with the same
+--seed; query counts are read from its Server-Timing header). Records
+p50/p95/p99 latency, throughput, errors and queries per request, writes
+JSON results and flags regressions against a baseline.
+
+Usage:
+    python -m benchmarks.load [--scenario dashboard --scenario login_burst]
+    python -m benchmarks.load --requests 1000 --concurrency 4 --output run.json
+    python -m benchmarks.load --baseline base.json   # exits 1 on regression
+    python -m benchmarks.load --url http://127.0.0.1:8000 --seed 42
+"""
+
+import argparse
+import io
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from .utils import print_table, setup_django, summarize, test_database
+
+API = "/api/v1"
+PASSWORD = "benchmark-pass"
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    data: dict | None = None
+    user: "BenchUser | None" = None
+
+
+@dataclass
+class Result:
+    status: int
+    body: bytes
+    queries: int | None = None
+
+
+@dataclass
+class BenchUser:
+    email: str
+    username: str = ""
+    access: str = ""
+    project_ids: list = field(default_factory=list)
+    owned_project_ids: list = field(default_factory=list)
+    task_ids: list = field(default_factory=list)
+
+
+#
+# === TRANSPORTS ===
+#
+
+class InProcessTransport:
+    """Calls the URLconf through the test client and counts SQL queries"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            from rest_framework.test import APIClient
+
+            client = APIClient()
+            client.raise_request_exception = False
+            self._local.client = client
+        return client
+
+    def send(self, request):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        headers = {}
+        if request.user and request.user.access:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {request.user.access}"
+        call = getattr(self._client(), request.method.lower())
+        with CaptureQueriesContext(connection) as ctx:
+            response = call(
+                request.path, request.data, format="json", **headers
+            )
+        return Result(
+            response.status_code, response.content, len(ctx.captured_queries)
+        )
+
+    def close_thread(self):
+        from django.db import connection
+
+        connection.close()
+
+
+class HttpTransport:
+    """
+    Sends real HTTP requests to a running server; query counts come from
+    the Server-Timing header when the server instruments queries
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request):
+        body = None
+        headers = {"Accept": "application/json"}
+        if request.data is not None:
+            body = json.dumps(request.data).encode()
+            headers["Content-Type"] = "application/json"
+        if request.user and request.user.access:
+            headers["Authorization"] = f"Bearer {request.user.access}"
+
+        http_request = urllib.request.Request(
+            self.base_url + request.path, data=body, headers=headers,
+            method=request.method,
+        )
+        try:
+            with urllib.request.urlopen(http_request, timeout=30) as response:
+                return Result(
+                    response.status, response.read(),
+                    self.server_queries(response.headers),
+                )
+        except urllib.error.HTTPError as exc:
+            return Result(exc.code, exc.read(), self.server_queries(exc.headers))
+
+    @staticmethod
+    def server_queries(headers):
+        """Query count from the Server-Timing header (db;desc="N queries")"""
+        match = SERVER_TIMING_QUERIES.search(headers.get("Server-Timing", ""))
+        return int(match.group(1)) if match else None
+
+    def close_thread(self):
+        pass
+
+
+#
+# === WORLD ===
+#
+
+def results_of(payload):
+    """Items of a (possibly paginated) list response"""
+    data = json.loads(payload)
+    return data["results"] if isinstance(data, dict) else data
+
+
+class World:
+    """
+    Users, projects, tasks and invite links discovered through the API,
+    shared by all worker threads
+    """
+
+    def __init__(self, transport, seed, user_count):
+        self.transport = transport
+        self.users = [
+            BenchUser(email=f"bench{seed}_{i}@example.com")
+            for i in range(user_count)
+        ]
+        self.invite_tokens = []
+        self.created_tasks = deque()
+
+    def call(self, request, expected=(200,)):
+        result = self.transport.send(request)
+        if result.status not in expected:
+            raise RuntimeError(
+                f"{request.method} {request.path} -> {result.status}: "
+                f"{result.body[:200]!r}"
+            )
+        return json.loads(result.body) if result.body else None
+
+    def login(self, user):
+        data = self.call(Request(
+            "POST", f"{API}/account/login/",
+            {"email": user.email, "password": PASSWORD},
+        ))
+        user.username, user.access = data["username"], data["access"]
+
+    def discover(self):
+        for user in self.users:
+            self.login(user)
+        roles = results_of(self.transport.send(Request(
+            "GET", f"{API}/projects/roles/", user=self.users[0]
+        )).body)
+        viewer_role = next(r["id"] for r in roles if r["name"] == "Viewer")
+
+        for user in self.users:
+            projects = results_of(self.transport.send(Request(
+                "GET", f"{API}/projects/?fields=id,owner_name", user=user
+            )).body)
+            user.project_ids = [p["id"] for p in projects]
+            user.owned_project_ids = [
+                p["id"] for p in projects if p["owner_name"] == user.username
+            ]
+            tasks = results_of(self.transport.send(Request(
+                "GET", f"{API}/tasks/?fields=id", user=user
+            )).body)
+            user.task_ids = [task["id"] for task in tasks]
+            for project_id in user.owned_project_ids[:1]:
+                self.invite_tokens.append(
+                    self.invite_token(user, project_id, viewer_role)
+                )
+
+        if not any(user.task_ids for user in self.users):
+            raise RuntimeError("Seeded users have no personal tasks")
+
+    def invite_token(self, owner, project_id, role_id):
+        path = f"{API}/projects/{project_id}/share_links/"
+        result = self.transport.send(Request(
+            "POST", path, {"role_id": role_id, "expires_in": 600}, user=owner
+        ))
+        if result.status == 201:
+            return json.loads(result.body)["token"]
+        # an active link already exists
+        links = results_of(self.transport.send(Request(
+            "GET", path, user=owner
+        )).body)
+        return next(link["token"] for link in links if link["is_active"])
+
+    def pick_user(self, rng, with_tasks=False, with_projects=False):
+        users = self.users
+        if with_tasks:
+            users = [u for u in users if u.task_ids]
+        if with_projects:
+            users = [u for u in users if u.project_ids] or users
+        return rng.choice(users)
+
+
+#
+# === OPERATIONS ===
+#
+
+def due_date():
+    return (datetime.now(dt_timezone.utc) + timedelta(days=3)).isoformat()
+
+
+def list_tasks(world, rng):
+    return Request("GET", f"{API}/tasks/", user=world.pick_user(rng))
+
+
+def list_tasks_today(world, rng):
+    return Request("GET", f"{API}/tasks/?today=true", user=world.pick_user(rng))
+
+
+def task_stats(world, rng):
+    return Request("GET", f"{API}/tasks/stats/", user=world.pick_user(rng))
+
+
+def list_projects(world, rng):
+    return Request("GET", f"{API}/projects/", user=world.pick_user(rng))
+
+
+def project_tasks(world, rng):
+    user = world.pick_user(rng, with_projects=True)
+    if not user.project_ids:
+        return list_tasks(world, rng)
+    project_id = rng.choice(user.project_ids)
+    return Request("GET", f"{API}/projects/{project_id}/tasks/", user=user)
+
+
+def patch_task(world, rng):
+    user = world.pick_user(rng, with_tasks=True)
+    task_id = rng.choice(user.task_ids)
+    return Request(
+        "PATCH", f"{API}/tasks/{task_id}/",
+        {"priority": rng.choice("LMH")}, user=user,
+    )
+
+
+def toggle_completed(world, rng):
+    user = world.pick_user(rng, with_tasks=True)
+    task_id = rng.choice(user.task_ids)
+    return Request(
+        "POST", f"{API}/tasks/{task_id}/toggle_completed/", {}, user=user
+    )
+
+
+def create_task(world, rng):
+    return Request(
+        "POST", f"{API}/tasks/",
+        {"title": f"Load {rng.randrange(10**6)}", "due_date": due_date()},
+        user=world.pick_user(rng),
+    )
+
+
+def delete_task(world, rng):
+    try:
+        user, task_id = world.created_tasks.popleft()
+    except IndexError:
+        return create_task(world, rng)
+    return Request("DELETE", f"{API}/tasks/{task_id}/", user=user)
+
+
+def join_project(world, rng):
+    if not world.invite_tokens:
+        return list_projects(world, rng)
+    token = rng.choice(world.invite_tokens)
+    return Request(
+        "POST", f"{API}/projects/join/{token}/", {}, user=world.pick_user(rng)
+    )
+
+
+def login(world, rng):
+    user = world.pick_user(rng)
+    return Request(
+        "POST", f"{API}/account/login/",
+        {"email": user.email, "password": PASSWORD},
+    )
+
+
+SCENARIOS = {
+    "dashboard": [
+        (5, list_tasks), (2, task_stats), (2, list_projects),
+        (3, project_tasks), (1, list_tasks_today),
+    ],
+    "bulk_edit": [
+        (4, patch_task), (3, toggle_completed), (2, create_task),
+        (1, delete_task),
+    ],
+    "invite_storm": [(1, join_project)],
+    "login_burst": [(1, login)],
+}
+
+
+#
+# === RUNNER ===
+#
+
+def run_scenario(world, name, requests, concurrency, warmup, seed):
+    operations = SCENARIOS[name]
+    weights = [weight for weight, _ in operations]
+    samples = defaultdict(list)
+    lock = threading.Lock()
+
+    def worker(index, count, record):
+        rng = random.Random(f"{seed}:{name}:{index}:{record}")
+        try:
+            for _ in range(count):
+                op = rng.choices(operations, weights=weights)[0][1]
+                request = op(world, rng)
+                started = time.perf_counter()
+                result = world.transport.send(request)
+                elapsed = (time.perf_counter() - started) * 1000
+                if op is create_task and result.status == 201:
+                    world.created_tasks.append(
+                        (request.user, json.loads(result.body)["id"])
+                    )
+                if record:
+                    with lock:
+                        samples[op.__name__].append(
+                            (elapsed, result.status, result.queries)
+                        )
+        finally:
+            world.transport.close_thread()
+
+    def run(total, record):
+        shares = [total // concurrency] * concurrency
+        for i in range(total % concurrency):
+            shares[i] += 1
+        with ThreadPoolExecutor(concurrency) as pool:
+            futures = [
+                pool.submit(worker, i, share, record)
+                for i, share in enumerate(shares) if share
+            ]
+            for future in futures:
+                future.result()
+
+    if warmup:
+        run(warmup, record=False)
+    started = time.perf_counter()
+    run(requests, record=True)
+    wall = time.perf_counter() - started
+    return aggregate(samples, wall)
+
+
+def stats_of(entries, wall=None):
+    queries = [q for _, _, q in entries if q is not None]
+    stats = {
+        "requests": len(entries),
+        "errors": sum(1 for _, status, _ in entries if status >= 400),
+        **{
+            key: round(value, 3)
+            for key, value in summarize([e for e, _, _ in entries]).items()
+        },
+        "queries_per_request": (
+            round(sum(queries) / len(queries), 2) if queries else None
+        ),
+    }
+    if wall:
+        stats["throughput_rps"] = round(len(entries) / wall, 2)
+    return stats
+
+
+def aggregate(samples, wall):
+    everything = [entry for entries in samples.values() for entry in entries]
+    return {
+        **stats_of(everything, wall),
+        "operations": {
+            op: stats_of(entries) for op, entries in sorted(samples.items())
+        },
+    }
+
+
+#
+# === BASELINE ===
+#
+
+def compare(current, baseline, tolerance, min_ms):
+    """
+    Returns regressions: p95 slower than baseline by more than tolerance
+    (and min_ms), more queries per request, or lower throughput
+    """
+    regressions = []
+    for name, scenario in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if scenario["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                (name, "*", "throughput_rps",
+                 base["throughput_rps"], scenario["throughput_rps"])
+            )
+        for op, stats in scenario["operations"].items():
+            old = base["operations"].get(op)
+            if not old:
+                continue
+            if (
+                stats["p95_ms"] > old["p95_ms"] * (1 + tolerance)
+                and stats["p95_ms"] - old["p95_ms"] > min_ms
+            ):
+                regressions.append(
+                    (name, op, "p95_ms", old["p95_ms"], stats["p95_ms"])
+                )
+            if (
+                stats["queries_per_request"] is not None
+                and old["queries_per_request"] is not None
+                and stats["queries_per_request"] > old["queries_per_request"] + 0.5
+            ):
+                regressions.append((
+                    name, op, "queries_per_request",
+                    old["queries_per_request"], stats["queries_per_request"],
+                ))
+    return regressions
+
+
+def report(results):
+    rows = []
+    for name, scenario in results["scenarios"].items():
+        for op, stats in scenario["operations"].items():
+            rows.append({"scenario": name, "operation": op, **stats})
+        rows.append({
+            "scenario": name, "operation": "(all)",
+            **{k: v for k, v in scenario.items() if k != "operations"},
+        })
+    columns = [
+        "scenario", "operation", "requests", "errors", "p50_ms", "p95_ms",
+        "p99_ms", "queries_per_request",
+    ]
+    print_table(rows, columns)
+    print()
+    print_table(
+        [
+            {"scenario": name, "throughput_rps": s["throughput_rps"]}
+            for name, s in results["scenarios"].items()
+        ],
+        ["scenario", "throughput_rps"],
+    )
+
+
+def execute(args, transport):
+    world = World(transport, args.seed, args.users)
+    world.discover()
+
+    results = {
+        "meta": {
+            "mode": "http" if args.url else "in-process",
+            "url": args.url,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "started_at": datetime.now(dt_timezone.utc).isoformat(),
+        },
+        "scenarios": {},
+    }
+    for name in args.scenario or list(SCENARIOS):
+        results["scenarios"][name] = run_scenario(
+            world, name, args.requests, args.concurrency, args.warmup,
+            args.seed,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scenario", action="append", choices=list(SCENARIOS),
+        help="Scenario to run (repeatable); all by default",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--users", type=int, default=20,
+        help="Seeded users driving the load",
+    )
+    parser.add_argument(
+        "--url", help="Run against this server instead of in-process"
+    )
+    parser.add_argument(
+        "--dataset", default="200,40,20000",
+        help="users,projects,tasks seeded for in-process runs",
+    )
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare to these JSON results")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2,
+        help="Allowed relative slowdown before flagging a regression",
+    )
+    parser.add_argument(
+        "--min-ms", type=float, default=1.0,
+        help="Ignore p95 slowdowns smaller than this (noise floor)",
+    )
+    args = parser.parse_args()
+
+    if args.url:
+        results = execute(args, HttpTransport(args.url))
+    else:
+        setup_django()
+        from django.core.management import call_command
+
+        users, projects, tasks = (int(n) for n in args.dataset.split(","))
+        with test_database():
+            call_command(
+                "seed_benchmark_data", users=max(users, args.users),
+                projects=projects, tasks=tasks, seed=args.seed, verbosity=0,
+                stdout=io.StringIO(),
+            )
+            results = execute(args, InProcessTransport())
+
+    report(results)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        regressions = compare(results, baseline, args.tolerance, args.min_ms)
+        if regressions:
+            print("\nRegressions against baseline:")
+            print_table(
+                [
+                    dict(zip(
+                        ["scenario", "operation", "metric", "baseline", "current"],
+                        row,
+                    ))
+                    for row in regressions
+                ],
+                ["scenario", "operation", "metric", "baseline", "current"],
+            )
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
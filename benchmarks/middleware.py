@@ -0,0 +1,107 @@
+"""
+Measures the per-request cost of the session middleware stack
+(SESSION_MIDDLEWARE: sessions, CSRF, auth, messages) on JWT API requests:
+the same requests with the stack inlined in MIDDLEWARE, as every request
+used to run it, and behind PathDispatchMiddleware, which skips it for
+STATELESS_PATH_PREFIXES.
+
+Usage:
+    python -m benchmarks.middleware [--repeat 1000]
+"""
+
+import argparse
+import time
+
+from .utils import print_table, setup_django, summarize, test_database
+
+DISPATCHER = "TaskManagerSystem.middleware.PathDispatchMiddleware"
+
+
+def inlined_middleware():
+    from django.conf import settings
+
+    index = settings.MIDDLEWARE.index(DISPATCHER)
+    return (
+        settings.MIDDLEWARE[:index] + settings.SESSION_MIDDLEWARE
+        + settings.MIDDLEWARE[index + 1:]
+    )
+
+
+def run(repeat):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.test import override_settings
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from tasks.models import Task
+
+    user = get_user_model().objects.create_user(
+        username="bench", email="bench@example.com", password="benchpass123"
+    )
+    Task.objects.bulk_create(
+        Task(title=f"Task {i}", user=user, due_date=timezone.now())
+        for i in range(10)
+    )
+    token = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+    modes = [
+        ("session stack on every request", inlined_middleware()),
+        ("path dispatch", settings.MIDDLEWARE),
+    ]
+    clients = []
+    for _, middleware in modes:
+        with override_settings(MIDDLEWARE=middleware):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=token)
+            client.get("/")  # loads the middleware of the mode
+        clients.append(client)
+
+    endpoints = [
+        ("/api/v1/unknown/", 404),  # middleware and URL resolving only
+        ("/api/v1/status/", 200),
+        ("/api/v1/tasks/", 200),
+    ]
+    rows = []
+    for endpoint, status in endpoints:
+        samples = [[] for _ in modes]
+        for client in clients:  # warm up
+            for _ in range(20):
+                client.get(endpoint)
+        # interleaved rounds, so that drift affects both modes alike
+        for _ in range(20):
+            cache.clear()  # throttling history
+            for client, mode_samples in zip(clients, samples):
+                for _ in range(max(repeat // 20, 1)):
+                    started = time.perf_counter()
+                    response = client.get(endpoint)
+                    mode_samples.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == status, response.status_code
+
+        for (name, _), mode_samples in zip(modes, samples):
+            timings = summarize(mode_samples)
+            rows.append({
+                "endpoint": endpoint,
+                "middleware": name,
+                "mean_ms": f"{timings['mean_ms']:.3f}",
+                "p50_ms": f"{timings['p50_ms']:.3f}",
+                "p95_ms": f"{timings['p95_ms']:.3f}",
+            })
+
+    print_table(rows, ["endpoint", "middleware", "mean_ms", "p50_ms", "p95_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Bursts of identical concurrent reads: `--clients` clients of one user
+(tabs, devices, retries) request the same /projects/{pk}/tasks/ page at
+once (one thread each, as in a threaded worker), with and without request
+coalescing (SINGLE_FLIGHT_ENABLED). Reports the burst duration and how
+many times the page was actually queried and serialized.
+
+Usage:
+    python -m benchmarks.single_flight [--clients 32] [--tasks 100] [--bursts 20]
+"""
+
+import argparse
+import threading
+import time
+
+from .utils import print_table, setup_django, summarize, test_database
+
+
+def run(clients, tasks, bursts):
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from django.test import override_settings
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from projects.services import ProjectService
+    from tasks.models import Task
+    from tasks.views import TaskViewSet
+
+    User = get_user_model()
+    owner = User.objects.create_user(
+        username="owner", email="owner@example.com", password="benchpass123"
+    )
+    project = ProjectService.create_project(owner=owner, name="Burst")
+    Task.objects.bulk_create(
+        Task(title=f"Task {i}", user=owner, project=project, due_date=timezone.now())
+        for i in range(tasks)
+    )
+    url = reverse("project-tasks-list", kwargs={"project_pk": project.pk})
+    token = RefreshToken.for_user(owner).access_token
+    api_clients = []
+    for _ in range(clients):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        api_clients.append(client)
+
+    pages = [0]
+    paginate = TaskViewSet.paginate_queryset
+
+    def counting_paginate(self, queryset):
+        pages[0] += 1
+        return paginate(self, queryset)
+
+    TaskViewSet.paginate_queryset = counting_paginate
+
+    def burst():
+        barrier = threading.Barrier(clients + 1)
+        statuses = []
+
+        def request(client):
+            barrier.wait()
+            statuses.append(client.get(url).status_code)
+            connections.close_all()
+
+        threads = [
+            threading.Thread(target=request, args=(client,))
+            for client in api_clients
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        assert statuses == [200] * clients, statuses
+        return (time.perf_counter() - started) * 1000
+
+    rows = []
+    for name, enabled in [("no coalescing", False), ("single flight", True)]:
+        with override_settings(SINGLE_FLIGHT_ENABLED=enabled):
+            burst()  # warm up (connections, caches)
+            pages[0] = 0
+            samples = [burst() for _ in range(bursts)]
+        timings = summarize(samples)
+        rows.append({
+            "mode": name,
+            "burst_p50_ms": f"{timings['p50_ms']:.1f}",
+            "burst_p95_ms": f"{timings['p95_ms']:.1f}",
+            "pages_computed": f"{pages[0] / bursts:.1f}/{clients}",
+        })
+
+    TaskViewSet.paginate_queryset = paginate
+    print_table(rows, ["mode", "burst_p50_ms", "burst_p95_ms", "pages_computed"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--bursts", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.clients, args.tasks, args.bursts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compares full and sparse representations of the task, project and
+category list endpoints: payload size, latency and SQL executed.
+
+Usage:
+    python -m benchmarks.sparse_fields [--tasks 2000] [--repeat 50]
+"""
+
+import argparse
+
+from .utils import measure, print_table, setup_django, test_database
+
+SCENARIOS = [
+    ("tasks", "/api/v1/tasks/", ""),
+    ("tasks", "/api/v1/tasks/", "fields=id,title,due_date,completed"),
+    ("tasks/today", "/api/v1/tasks/", "today=true"),
+    ("tasks/today", "/api/v1/tasks/", "today=true&fields=id,title,due_date"),
+    ("projects", "/api/v1/projects/", ""),
+    ("projects", "/api/v1/projects/", "fields=id,name"),
+    ("categories", "/api/v1/tasks/manage/categories/", ""),
+    ("categories", "/api/v1/tasks/manage/categories/", "fields=id,name"),
+]
+
+
+def seed(task_count):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from projects.services import ProjectService
+    from tasks.models import Category, Task
+
+    user = get_user_model().objects.create_user(
+        username="bench", email="bench@example.com", password="benchpass123"
+    )
+    categories = Category.objects.bulk_create(
+        Category(name=f"Category {i}", user=user) for i in range(10)
+    )
+    for i in range(20):
+        ProjectService.create_project(owner=user, name=f"Project {i}")
+
+    now = timezone.now()
+    Task.objects.bulk_create(
+        (
+            Task(
+                title=f"Task {i}",
+                description="Lorem ipsum dolor sit amet " * 8,
+                due_date=now,
+                user=user,
+                category=categories[i % len(categories)],
+                completed_by=user if i % 3 == 0 else None,
+                completed=i % 3 == 0,
+            )
+            for i in range(task_count)
+        ),
+        batch_size=1000,
+    )
+    return user
+
+
+def run(task_count, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user = seed(task_count)
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+
+    rows = []
+    for name, path, query in SCENARIOS:
+        url = f"{path}?{query}" if query else path
+        timings, response = measure(lambda: client.get(url), repeat=repeat)
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(url)
+        rows.append({
+            "endpoint": name,
+            "params": query or "(full)",
+            "bytes": len(response.content),
+            "queries": len(ctx.captured_queries),
+            "p50_ms": f"{timings['p50_ms']:.2f}",
+            "p95_ms": f"{timings['p95_ms']:.2f}",
+        })
+
+    print_table(
+        rows, ["endpoint", "params", "bytes", "queries", "p50_ms", "p95_ms"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.tasks, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
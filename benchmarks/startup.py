@@ -0,0 +1,237 @@
+"""
+Startup profile of an API worker.
+
+Imports: boots fresh interpreters under `python -X importtime` the way a
+worker gets ready for its first request (WSGI application + URLconf) and
+reports boot time, peak RSS and the slowest modules and packages (self
+import time, i.e. excluding the modules they import). Pass --env to compare
+configurations, e.g. `--env DOCS_ENABLED=False`.
+
+Workers (--workers N, Linux): starts gunicorn with gunicorn.conf.py with
+and without preload_app, and reports the time until the server answers and
+the memory of each worker once all of them served requests: RSS, PSS
+(shared pages divided among the processes sharing them) and private
+memory (pages only this worker holds).
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--top 20]
+    python -m benchmarks.startup --env DOCS_ENABLED=False
+    python -m benchmarks.startup --workers 4
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import print_table
+
+BOOT = """
+import json, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+print(json.dumps({
+    "boot_ms": (time.perf_counter() - started) * 1000,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+}))
+"""
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output):
+    """[(module, self µs, cumulative µs)] of `-X importtime` output"""
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules.append(
+                (match.group(4), int(match.group(1)), int(match.group(2)))
+            )
+    return modules
+
+
+def boot(env):
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = (time.perf_counter() - started) * 1000
+    return result, parse_importtime(process.stderr)
+
+
+def profile_imports(env, runs, top):
+    boot(env)  # warm the file system cache
+    results = [boot(env) for _ in range(runs)]
+    samples = [result for result, _ in results]
+    print_table([{
+        "runs": runs,
+        "wall_ms": f"{statistics.median(s['wall_ms'] for s in samples):.0f}",
+        "boot_ms": f"{statistics.median(s['boot_ms'] for s in samples):.0f}",
+        "rss_mb": f"{statistics.median(s['rss_mb'] for s in samples):.1f}",
+        "modules": samples[-1]["modules"],
+    }], ["runs", "wall_ms", "boot_ms", "rss_mb", "modules"])
+
+    # median times of every module over the runs
+    self_times = defaultdict(list)
+    cumulative_times = defaultdict(list)
+    for _, modules in results:
+        for name, self_us, cumulative_us in modules:
+            self_times[name].append(self_us)
+            cumulative_times[name].append(cumulative_us)
+    medians = {name: statistics.median(t) for name, t in self_times.items()}
+    cumulative = {
+        name: statistics.median(t) for name, t in cumulative_times.items()
+    }
+
+    packages = defaultdict(float)
+    for name, self_us in medians.items():
+        packages[name.split(".")[0]] += self_us
+
+    print(f"\nSlowest packages (self time of all their modules, top {top})")
+    print_table([
+        {"package": name, "self_ms": f"{us / 1000:.1f}"}
+        for name, us in sorted(packages.items(), key=lambda p: -p[1])[:top]
+    ], ["package", "self_ms"])
+
+    print(f"\nSlowest modules (top {top})")
+    print_table([
+        {
+            "module": name, "self_ms": f"{us / 1000:.1f}",
+            "cumulative_ms": f"{cumulative[name] / 1000:.1f}",
+        }
+        for name, us in sorted(medians.items(), key=lambda m: -m[1])[:top]
+    ], ["module", "self_ms", "cumulative_ms"])
+
+
+#
+# === GUNICORN WORKERS ===
+#
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fp:
+                # the command name may contain spaces: fields after ")"
+                ppid = int(fp.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children
+
+
+def memory_kb(pid):
+    """Rss, Pss and private memory of a process from smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fp:
+        for line in fp:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"], "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:  # 503 without a database is fine
+        return exc.code
+
+
+def run_server(workers, preload, env):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/status/"
+    env = dict(env, GUNICORN_PRELOAD=str(preload), WEB_CONCURRENCY=str(workers))
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "--bind", f"127.0.0.1:{port}", "TaskManagerSystem.wsgi:application"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("gunicorn exited, run it by hand for details")
+            try:
+                get(url)
+                break
+            except OSError:
+                time.sleep(0.01)
+        ready_ms = (time.perf_counter() - started) * 1000
+
+        # enough concurrent requests for every worker to serve some
+        with ThreadPoolExecutor(workers * 4) as pool:
+            list(pool.map(get, [url] * workers * 50))
+
+        pids = child_pids(server.pid)
+        usage = [memory_kb(pid) for pid in pids]
+
+        def mean_mb(field):
+            return f"{statistics.fmean(u[field] for u in usage) / 1024:.1f}"
+
+        total_pss = sum(u["pss"] for u in usage) + memory_kb(server.pid)["pss"]
+        return {
+            "preload": preload,
+            "workers": len(pids),
+            "ready_ms": f"{ready_ms:.0f}",
+            "worker_rss_mb": mean_mb("rss"),
+            "worker_pss_mb": mean_mb("pss"),
+            "worker_private_mb": mean_mb("private"),
+            "total_pss_mb": f"{total_pss / 1024:.1f}",
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--env", action="append", default=[],
+                        metavar="NAME=VALUE", help="setting for the workers")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="also compare gunicorn with and without preload")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "TaskManagerSystem.settings")
+    env.update(item.split("=", 1) for item in args.env)
+
+    profile_imports(env, args.runs, args.top)
+    if args.workers:
+        print(f"\ngunicorn, {args.workers} workers")
+        rows = [run_server(args.workers, preload, env) for preload in (False, True)]
+        print_table(rows, list(rows[0]))
+
+
+if __name__ == "__main__":
+    main()
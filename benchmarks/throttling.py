@@ -0,0 +1,93 @@
+"""
+Microbenchmark of one throttle check (allow_request) for a client making
+requests under its rate: DRF's UserRateThrottle (timestamp list in the
+default cache) against UserSlidingWindowThrottle on each counter store.
+
+DRF's cost grows with the number of requests already in the window (the
+list is read, trimmed and written back whole), so each throttle is
+measured after `--history` requests (the `--repeat` measured requests add
+to it).
+
+Usage:
+    python -m benchmarks.throttling [--history 10 --history 1000] [--repeat 2000]
+"""
+
+import argparse
+import os
+import tempfile
+
+from .utils import measure, print_table, setup_django
+
+
+def run(histories, repeat):
+    from django.core.cache import cache
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import UserRateThrottle
+
+    from api import throttling
+    from api.throttling import (
+        CacheStore, LocalMemoryStore, SharedMemoryStore,
+        UserSlidingWindowThrottle,
+    )
+
+    class User:
+        pk = 1
+        is_authenticated = True
+
+    request = APIRequestFactory().get("/api/v1/tasks/")
+    request.user = User()
+
+    directory = tempfile.TemporaryDirectory()
+    throttles = [
+        ("UserRateThrottle (DRF, cache list)", UserRateThrottle, None),
+        ("sliding window, LocalMemoryStore", UserSlidingWindowThrottle,
+         LocalMemoryStore()),
+        ("sliding window, SharedMemoryStore", UserSlidingWindowThrottle,
+         SharedMemoryStore(os.path.join(directory.name, "throttle.bin"), 65536)),
+        ("sliding window, CacheStore", UserSlidingWindowThrottle,
+         CacheStore()),
+    ]
+
+    rows = []
+    for history in histories:
+        rate = f"{history + repeat * 2}/hour"  # never rejects
+        for name, throttle_class, store in throttles:
+            cache.clear()
+            if store is not None:
+                store.reset()
+            throttling.STORE = store
+
+            def check():
+                throttle = throttle_class()
+                throttle.rate = rate
+                throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+                assert throttle.allow_request(request, None)
+
+            for _ in range(history):
+                check()
+            timings, _ = measure(check, repeat=repeat, warmup=0)
+            rows.append({
+                "history": history,
+                "throttle": name,
+                "mean_us": f"{timings['mean_ms'] * 1000:.1f}",
+                "p50_us": f"{timings['p50_ms'] * 1000:.1f}",
+                "p99_us": f"{timings['p99_ms'] * 1000:.1f}",
+            })
+
+    throttling.STORE = None
+    directory.cleanup()
+    print_table(rows, ["history", "throttle", "mean_us", "p50_us", "p99_us"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, action="append")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.history or [10, 1000, 10000], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
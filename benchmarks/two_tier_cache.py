@@ -0,0 +1,90 @@
+"""
+Cost of the hot lookups of an authenticated project request (token user,
+project metadata, membership role): straight from the database, from the
+shared tier only (local LRU disabled, as in another worker) and from the
+local tier of the two-tier caches (api.cache).
+
+The shared tier is CACHES["default"]; run with CACHE_BACKEND/CACHE_LOCATION
+pointing at Redis or Memcached to include the network round trip (the
+default LocMemCache is per process and is not used as a shared tier).
+
+Usage:
+    python -m benchmarks.two_tier_cache [--repeat 2000]
+"""
+
+import argparse
+
+from .utils import measure, print_table, setup_django, test_database
+
+
+def run(repeat):
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.cache import clear_local_caches
+    from projects.models import Project, ProjectMembership, Role
+    from projects.services import (
+        MEMBER_ROLE_CACHE, PROJECT_CACHE, ProjectService,
+    )
+    from users.authentication import USER_CACHE, CachedJWTAuthentication
+
+    User = get_user_model()
+    owner = User.objects.create_user(
+        username="owner", email="owner@example.com", password="benchpass123"
+    )
+    user = User.objects.create_user(
+        username="bench", email="bench@example.com", password="benchpass123"
+    )
+    project = Project.objects.create(name="Bench", owner=owner)
+    ProjectMembership.objects.create(
+        user=user, project=project, role=Role.objects.get(name="Member")
+    )
+    token = AccessToken.for_user(user)
+
+    def database():
+        JWTAuthentication().get_user(token)
+        Project.objects.filter(pk=project.pk).values_list(
+            "id", "owner_id", "name"
+        ).first()
+        ProjectMembership.objects.filter(
+            project_id=project.pk, user_id=user.pk
+        ).values_list("role__name", flat=True).first()
+
+    def cached():
+        CachedJWTAuthentication().get_user(token)
+        ProjectService.get_project_meta(project.pk)
+        ProjectService.get_member_role(project.pk, user.pk)
+
+    rows = []
+    for name, lookup, local_timeout in [
+        ("database", database, None),
+        ("shared tier", cached, 0),
+        ("local tier", cached, 60),
+    ]:
+        for two_tier_cache in (USER_CACHE, PROJECT_CACHE, MEMBER_ROLE_CACHE):
+            two_tier_cache.local_timeout = local_timeout
+        clear_local_caches()
+        timings, _ = measure(lookup, repeat=repeat)
+        rows.append({
+            "lookups": name,
+            "mean_us": f"{timings['mean_ms'] * 1000:.1f}",
+            "p50_us": f"{timings['p50_ms'] * 1000:.1f}",
+            "p99_us": f"{timings['p99_ms'] * 1000:.1f}",
+        })
+
+    print_table(rows, ["lookups", "mean_us", "p50_us", "p99_us"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
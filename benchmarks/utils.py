@@ -0,0 +1,79 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Configures Django for a standalone benchmark script"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "TaskManagerSystem.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """
+    Creates a throwaway test database (same as the test runner does)
+    and destroys it on exit unless keepdb is set
+    """
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=keepdb
+        )
+        teardown_test_environment()
+
+
+def summarize(samples):
+    """Mean and p50/p95/p99 of latency samples in milliseconds"""
+    if not samples:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    samples = sorted(samples)
+    last = len(samples) - 1
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(last, int(len(samples) * 0.95))],
+        "p99_ms": samples[min(last, int(len(samples) * 0.99))],
+    }
+
+
+def measure(func, repeat=50, warmup=5):
+    """
+    Calls func repeatedly and returns latency percentiles in milliseconds
+    together with the last return value
+    """
+    result = None
+    for _ in range(warmup):
+        result = func()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return summarize(samples), result
+
+
+def print_table(rows, columns):
+    """Prints a list of dicts as a fixed-width table"""
+    widths = {
+        col: max(len(col), *(len(f"{row[col]}") for row in rows))
+        for col in columns
+    }
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(f"{row[col]}".ljust(widths[col]) for col in columns))
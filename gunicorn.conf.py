@@ -0,0 +1,21 @@
+"""
+Production gunicorn configuration (`gunicorn -c gunicorn.conf.py
+TaskManagerSystem.wsgi:application`).
+
+The application is loaded and warmed up (api.warmup) once in the master:
+workers are forked with Django, the URLconf and the Role registry already
+in memory, shared copy-on-write, and start serving immediately.
+"""
+
+import decouple  # not `config`: gunicorn reads it as its --config setting
+
+bind = decouple.config("GUNICORN_BIND", default="0.0.0.0:8000")
+workers = decouple.config("WEB_CONCURRENCY", default=2, cast=int)
+preload_app = decouple.config("GUNICORN_PRELOAD", default=True, cast=bool)
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from api.warmup import warm_up
+
+        warm_up()
@@ -8,6 +8,8 @@ class ProjectsConfig(AppConfig):
     name = "projects"
 
     def ready(self):
+        from . import signals  # noqa: F401
+
         post_migrate.connect(self.create_roles_and_permissions, sender=self)
 
     def create_roles_and_permissions(self, **kwargs):
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from projects.models import Project
+from projects.services import ProjectRollupService
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds per-project daily rollups (burndown/velocity) from task "
+        "history. Only creation and completion dates are stored on tasks, "
+        "so reopens, moves and deletions before the rollups existed are lost"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project", type=int, action="append", dest="projects",
+            help="Project id to rebuild (repeatable); all projects by default",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Projects rebuilt per transaction",
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects.order_by("id")
+        if options["projects"]:
+            projects = projects.filter(id__in=options["projects"])
+
+        written = ProjectRollupService.backfill(
+            projects.values_list("id", flat=True),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {written} rollup row(s)")
+        )
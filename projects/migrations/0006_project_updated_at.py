@@ -0,0 +1,18 @@
+# Generated by Django 5.1.9 on 2026-10-19 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_alter_project_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Touched on edits, task and membership changes (ETag validator)'),
+        ),
+    ]
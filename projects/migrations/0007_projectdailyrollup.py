@@ -0,0 +1,33 @@
+# Generated by Django 5.1.9 on 2026-10-19 18:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('reopened', models.PositiveIntegerField(default=0)),
+                ('moved_in', models.PositiveIntegerField(default=0)),
+                ('moved_out', models.PositiveIntegerField(default=0)),
+                ('deleted', models.PositiveIntegerField(default=0)),
+                ('open_delta', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='projects.project')),
+            ],
+            options={
+                'ordering': ['project', 'day'],
+                'constraints': [models.UniqueConstraint(fields=('project', 'day'), name='unique_project_daily_rollup')],
+            },
+        ),
+    ]
@@ -7,8 +7,11 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 
+from api.cache import TwoTierCache
 from api.validators import TEXT_FIELD_VALIDATOR
 
+ROLE_CACHE = TwoTierCache("roles", local_timeout=None)
+
 
 class Project(models.Model):
     """Project with name, description, and owner"""
@@ -21,6 +24,10 @@ class Project(models.Model):
         related_name="projects",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Touched on edits, task and membership changes (ETag validator)",
+    )
 
     class Meta:
         ordering = ["id"]
@@ -29,12 +36,37 @@ class Project(models.Model):
         return f"{self.name} (Owner: {self.owner.username})"
 
 
+class RoleManager(models.Manager):
+    """
+    Roles are static (created on migrate): name lookups are cached in
+    both tiers of ROLE_CACHE with no local expiry, warmed before gunicorn
+    forks (api.warmup)
+    """
+
+    def get_by_name(self, name):
+        role = ROLE_CACHE.get_or_set(
+            name, lambda: self.filter(name=name).first()
+        )
+        if role is None:
+            raise Role.DoesNotExist(f"Role {name!r} does not exist")
+        return role
+
+    def warm(self):
+        for role in self.all():
+            ROLE_CACHE.set(role.name, role)
+
+    def clear_cache(self):
+        ROLE_CACHE.clear()
+
+
 class Role(models.Model):
     """Static project roles; prohibition to create custom ones"""
 
     name = models.CharField(max_length=64, unique=True)
     permissions = models.ManyToManyField(Permission, blank=True)
 
+    objects = RoleManager()
+
     def clean(self):
         fixed = settings.ROLE_ORDER
         if self.name not in fixed:
@@ -127,3 +159,39 @@ class ProjectShareLink(models.Model):
 
     def __str__(self):
         return f"Link to {self.project.name} ({self.role.name})"
+
+
+class ProjectDailyRollup(models.Model):
+    """
+    Per-project, per-day task counters for burndown/velocity charts.
+    Maintained incrementally on task writes (see ProjectRollupService);
+    open_delta is the net change of open tasks on that day
+    """
+
+    COUNTERS = (
+        "created", "completed", "reopened", "moved_in", "moved_out",
+        "deleted", "open_delta",
+    )
+
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="daily_rollups"
+    )
+    day = models.DateField()
+    created = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    reopened = models.PositiveIntegerField(default=0)
+    moved_in = models.PositiveIntegerField(default=0)
+    moved_out = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    open_delta = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "day"], name="unique_project_daily_rollup"
+            ),
+        ]
+        ordering = ["project", "day"]
+
+    def __str__(self):
+        return f"{self.project_id} @ {self.day}"
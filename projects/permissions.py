@@ -3,14 +3,15 @@ import logging
 from django.conf import settings
 from rest_framework.permissions import BasePermission
 
-from .models import Project, ProjectMembership
+from .models import Project
+from .services import ProjectMeta, ProjectService
 
 logger = logging.getLogger(__name__)
 
 
 def _get_project_from_obj(obj):
     """Gets a project object from any related object"""
-    if isinstance(obj, Project):
+    if isinstance(obj, (Project, ProjectMeta)):
         return obj
     return getattr(obj, "project", None)
 
@@ -22,9 +23,7 @@ def _user_is_owner(user, project):
 
 def _user_has_role(user, project, roles):
     """Checks if the user has one of the specified roles in the project"""
-    return ProjectMembership.objects.filter(
-        project=project, user=user, role__name__in=roles
-    ).exists()
+    return ProjectService.get_member_role(project.id, user.id) in roles
 
 
 class IsProjectAdmin(BasePermission):
@@ -51,7 +50,7 @@ class IsProjectAdmin(BasePermission):
 
         if not is_admin:
             logger.warning(
-                f"User {user.id} lacks admin role for project {project.id}"
+                "User %s lacks admin role for project %s", user.id, project.id
             )
 
         return is_admin
@@ -85,14 +84,11 @@ class IsProjectMinRole(BasePermission):
         if _user_is_owner(user, project):
             return True
 
-        try:
-            membership = ProjectMembership.objects.select_related("role").get(
-                project=obj, user=user
-            )
-        except ProjectMembership.DoesNotExist:
+        role_name = ProjectService.get_member_role(project.id, user.id)
+        if role_name is None:
             return False
 
-        user_rank = self.ROLE_ORDER.index(membership.role.name)
+        user_rank = self.ROLE_ORDER.index(role_name)
         min_rank = self.ROLE_ORDER.index(self.min_role)
 
         return user_rank >= min_rank
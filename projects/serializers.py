@@ -1,9 +1,12 @@
 from rest_framework import serializers
 
+from api.mixins import SparseFieldsetSerializerMixin
 from .models import Project, ProjectShareLink, Role, ProjectMembership
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     tasks_count = serializers.SerializerMethodField(read_only=True)
     owner_name: serializers.StringRelatedField = (
         serializers.StringRelatedField(source="owner.username", read_only=True)
@@ -15,6 +18,10 @@ class ProjectSerializer(serializers.ModelSerializer):
             "id", "name", "description", "owner", "owner_name", "tasks_count", "created_at"
         ]
         read_only_fields = ["id", "owner", "tasks_count", "created_at"]
+        field_requirements = {
+            "owner_name": ["owner__username"],
+            "tasks_count": [],
+        }
 
     def get_tasks_count(self, obj):
         return getattr(obj, "tasks_count", 0)
@@ -96,3 +103,17 @@ class KickUserSerializer(serializers.Serializer):
 class AssignRoleSerializer(serializers.Serializer):
     user_id = serializers.IntegerField()
     role_id = serializers.IntegerField()
+
+
+class BurndownPointSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    remaining = serializers.IntegerField()
+    created = serializers.IntegerField()
+    completed = serializers.IntegerField()
+
+
+class VelocityWeekSerializer(serializers.Serializer):
+    week_start = serializers.DateField()
+    completed = serializers.IntegerField()
+    reopened = serializers.IntegerField()
+    net = serializers.IntegerField()
@@ -1,11 +1,24 @@
+from collections import namedtuple
 from datetime import timedelta
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied
 
-from .models import Project, ProjectMembership, ProjectShareLink, Role
+from api.cache import TwoTierCache
+
+from .models import (
+    Project, ProjectDailyRollup, ProjectMembership, ProjectShareLink, Role,
+)
+
+# Fields of a project that permission checks need; usable in place of it
+ProjectMeta = namedtuple("ProjectMeta", ["id", "owner_id", "name"])
+
+PROJECT_CACHE = TwoTierCache("projects")  # pk -> ProjectMeta or None
+MEMBER_ROLE_CACHE = TwoTierCache("member_roles", strict=True)  # "project:user" -> role name
 
 
 class ProjectService:
@@ -13,6 +26,7 @@ class ProjectService:
     Service for working with projects:
     - creating a project with automatic assignment of the Admin role
     - receiving a project with access verification
+    - cached project metadata and membership roles (permission checks)
     """
 
     @staticmethod
@@ -20,7 +34,7 @@ class ProjectService:
     def create_project(owner, **data):
         """Creates a new project and adds an owner with the Admin role"""
         project = Project.objects.create(owner=owner, **data)
-        admin_role = Role.objects.get(name="Admin")
+        admin_role = Role.objects.get_by_name("Admin")
 
         ProjectMembership.objects.get_or_create(
             user=owner, project=project, defaults={"role": admin_role}
@@ -37,12 +51,234 @@ class ProjectService:
             Project.objects.prefetch_related("memberships__role"), pk=pk
         )
 
-        is_member = project.memberships.filter(user=user).exists()
-        if project.owner != user and not is_member:
+        is_member = ProjectService.get_member_role(project.id, user.id) is not None
+        if project.owner_id != user.id and not is_member:
             raise PermissionError("You do not have acces to this project")
 
         return project
 
+    @staticmethod
+    def get_project_meta(pk):
+        """Cached ProjectMeta of the project, None if it does not exist"""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+
+        def load():
+            row = Project.objects.filter(pk=pk).values_list(
+                "id", "owner_id", "name"
+            ).first()
+            return ProjectMeta(*row) if row else None
+
+        return PROJECT_CACHE.get_or_set(str(pk), load)
+
+    @staticmethod
+    def get_member_role(project_id, user_id):
+        """Cached role name of the user in the project, None if not a member"""
+        return MEMBER_ROLE_CACHE.get_or_set(
+            f"{project_id}:{user_id}",
+            lambda: ProjectMembership.objects.filter(
+                project_id=project_id, user_id=user_id
+            ).values_list("role__name", flat=True).first(),
+        )
+
+    @staticmethod
+    def invalidate_member_role(project_id, user_id):
+        MEMBER_ROLE_CACHE.invalidate(f"{project_id}:{user_id}")
+
+    @staticmethod
+    def invalidate_project_meta(pk):
+        PROJECT_CACHE.invalidate(str(pk))
+
+    @staticmethod
+    def touch_projects(*project_ids):
+        """
+        Bumps updated_at of the given projects without loading them;
+        used when tasks or memberships change the project representation
+        """
+        ids = {pk for pk in project_ids if pk is not None}
+        if ids:
+            Project.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+
+
+class ProjectRollupService:
+    """
+    Service for per-project daily counters (burndown/velocity):
+    - incremental upserts from task writes
+    - chart series read from O(days) rollup rows
+    - chunked backfill from task history
+    """
+
+    @staticmethod
+    def bump(project_id, day=None, **deltas):
+        """
+        Adds deltas to the (project, day) counters with an
+        UPDATE ... SET x = x + n; inserts the row on the first write
+        """
+        deltas = {name: n for name, n in deltas.items() if n}
+        if project_id is None or not deltas:
+            return
+        day = day or timezone.now().date()
+        rows = ProjectDailyRollup.objects.filter(project_id=project_id, day=day)
+        increments = {name: F(name) + n for name, n in deltas.items()}
+
+        if rows.update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                ProjectDailyRollup.objects.create(
+                    project_id=project_id, day=day, **deltas
+                )
+        except IntegrityError:
+            # a concurrent writer inserted the row first
+            rows.update(**increments)
+
+    @staticmethod
+    def record_created(task):
+        ProjectRollupService.bump(
+            task.project_id,
+            created=1,
+            completed=int(task.completed),
+            open_delta=int(not task.completed),
+        )
+
+    @staticmethod
+    def record_deleted(task):
+        ProjectRollupService.bump(
+            task.project_id, deleted=1, open_delta=-int(not task.completed)
+        )
+
+    @staticmethod
+    def record_completion(task):
+        """Records a completed/reopened transition of a task"""
+        if task.completed:
+            ProjectRollupService.bump(task.project_id, completed=1, open_delta=-1)
+        else:
+            ProjectRollupService.bump(task.project_id, reopened=1, open_delta=1)
+
+    @staticmethod
+    def record_moved(task, old_project_id):
+        if old_project_id == task.project_id:
+            return
+        is_open = int(not task.completed)
+        ProjectRollupService.bump(
+            old_project_id, moved_out=1, open_delta=-is_open
+        )
+        ProjectRollupService.bump(
+            task.project_id, moved_in=1, open_delta=is_open
+        )
+
+    @staticmethod
+    def burndown(project_id, days):
+        """
+        Remaining open tasks at the end of each of the last `days` days:
+        the baseline is the open_delta sum before the window
+        """
+        end = timezone.now().date()
+        start = end - timedelta(days=days - 1)
+        rollups = ProjectDailyRollup.objects.filter(project_id=project_id)
+        remaining = rollups.filter(day__lt=start).aggregate(
+            total=Sum("open_delta")
+        )["total"] or 0
+        by_day = {row.day: row for row in rollups.filter(day__gte=start)}
+
+        points = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            row = by_day.get(day)
+            if row:
+                remaining += row.open_delta
+            points.append({
+                "date": day,
+                "remaining": remaining,
+                "created": row.created + row.moved_in if row else 0,
+                "completed": row.completed if row else 0,
+            })
+        return points
+
+    @staticmethod
+    def velocity(project_id, weeks):
+        """Completed (net of reopened) tasks per ISO week, oldest first"""
+        today = timezone.now().date()
+        current_week = today - timedelta(days=today.weekday())
+        start = current_week - timedelta(weeks=weeks - 1)
+        buckets = {
+            start + timedelta(weeks=n): {"completed": 0, "reopened": 0}
+            for n in range(weeks)
+        }
+        rows = ProjectDailyRollup.objects.filter(
+            project_id=project_id, day__gte=start
+        ).values_list("day", "completed", "reopened")
+        for day, completed, reopened in rows:
+            bucket = buckets[day - timedelta(days=day.weekday())]
+            bucket["completed"] += completed
+            bucket["reopened"] += reopened
+
+        return [
+            {
+                "week_start": week,
+                "completed": counts["completed"],
+                "reopened": counts["reopened"],
+                "net": counts["completed"] - counts["reopened"],
+            }
+            for week, counts in sorted(buckets.items())
+        ]
+
+    @staticmethod
+    def backfill(project_ids, batch_size=500):
+        """
+        Rebuilds the rollups of the given projects from Task.created_at and
+        Task.completed_at, batch_size projects per transaction.
+        History that is not stored on tasks (reopens, moves, deletions)
+        cannot be recovered: tasks count as created in their current project
+        """
+        from tasks.models import Task
+
+        project_ids = list(project_ids)
+        written = 0
+        for offset in range(0, len(project_ids), batch_size):
+            chunk = project_ids[offset:offset + batch_size]
+            tasks = Task.objects.filter(project_id__in=chunk).order_by()
+            counters = {}
+
+            created = (
+                tasks.annotate(day=TruncDate("created_at"))
+                .values("project_id", "day")
+                .annotate(n=Count("id"))
+            )
+            for row in created:
+                rollup = counters.setdefault(
+                    (row["project_id"], row["day"]), {}
+                )
+                rollup["created"] = row["n"]
+                rollup["open_delta"] = row["n"]
+
+            completed = (
+                tasks.filter(completed=True, completed_at__isnull=False)
+                .annotate(day=TruncDate("completed_at"))
+                .values("project_id", "day")
+                .annotate(n=Count("id"))
+            )
+            for row in completed:
+                rollup = counters.setdefault(
+                    (row["project_id"], row["day"]), {}
+                )
+                rollup["completed"] = row["n"]
+                rollup["open_delta"] = rollup.get("open_delta", 0) - row["n"]
+
+            with transaction.atomic():
+                ProjectDailyRollup.objects.filter(project_id__in=chunk).delete()
+                ProjectDailyRollup.objects.bulk_create(
+                    [
+                        ProjectDailyRollup(project_id=pk, day=day, **values)
+                        for (pk, day), values in counters.items()
+                    ],
+                    batch_size=1000,
+                )
+            written += len(counters)
+        return written
+
 
 class ProjectShareLinkService:
     """
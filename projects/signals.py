@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Project, ProjectMembership, Role
+from .services import ProjectService
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def clear_role_cache(sender, **kwargs):
+    """Signal: roles are cached by name (ROLE_CACHE)"""
+    Role.objects.clear_cache()
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_meta(sender, instance, **kwargs):
+    """Signal: owner and name are cached for permission checks"""
+    ProjectService.invalidate_project_meta(instance.pk)
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def invalidate_member_role(sender, instance, **kwargs):
+    """Signal: membership roles are cached for permission checks"""
+    ProjectService.invalidate_member_role(instance.project_id, instance.user_id)
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def touch_project_on_membership_change(sender, instance, **kwargs):
+    """Signal: joining/leaving changes who sees the project"""
+    ProjectService.touch_projects(instance.project_id)
+
+
+@receiver(post_delete, sender=ProjectMembership)
+def revoke_event_channel(sender, instance, **kwargs):
+    """Signal: a removed member stops receiving the project events"""
+    from tasks.services import TaskEventService
+
+    TaskEventService.publish_access_revoked(
+        instance.user_id, instance.project_id
+    )
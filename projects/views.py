@@ -6,21 +6,28 @@ from django.db import transaction
 from django.db.models import Q, Count
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from api.mixins import UserQuerysetMixin
+from api.mixins import (
+    ConditionalGetMixin, SingleFlightMixin, SparseFieldsetMixin,
+    UserQuerysetMixin,
+)
 from api.utils import error_response, status_response
 
 from .models import Project, ProjectMembership, Role, ProjectShareLink
 from .serializers import (
     KickUserSerializer, ProjectSerializer, ProjectShareLinkSerializer,
-    RoleSerializer, ProjectMembershipSerializer, ShareLinkCreateSerializer
+    RoleSerializer, ProjectMembershipSerializer, ShareLinkCreateSerializer,
+    BurndownPointSerializer, VelocityWeekSerializer,
 )
 from .services import (
-    ProjectService, ProjectMembershipService, ProjectShareLinkService,
+    ProjectService, ProjectMembershipService, ProjectRollupService,
+    ProjectShareLinkService,
 )
 from .permissions import IsProjectAdmin, IsProjectMinRole
 
@@ -28,17 +35,28 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-class ProjectViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
+class ProjectViewSet(
+    SparseFieldsetMixin, ConditionalGetMixin, SingleFlightMixin,
+    UserQuerysetMixin, viewsets.ModelViewSet,
+):
     """
     ViewSet for operations with projects
 
     Allows you to view, create, edit, and delete projects
     Includes an additional method for getting tasks in a project
+    Supports sparse fieldsets via `?fields=` / `?exclude=`
+    and conditional requests (ETag, If-None-Match, If-Match)
+    Identical concurrent list requests share one page (SingleFlightMixin)
     """
 
     serializer_class = ProjectSerializer
-    queryset = Project.objects.all().prefetch_related("tasks")
+    queryset = Project.objects.all()
     permission_classes = [IsAuthenticated]
+    sparse_always_load = ("owner",)
+    # SQL queries per request; QueryInstrumentationMiddleware logs overruns
+    query_budgets = {
+        "list": 4, "retrieve": 3, "burndown": 5, "velocity": 4, "*": 10,
+    }
 
     ACTION_PERMISSIONS = {
         "list": ["Viewer"],
@@ -51,8 +69,13 @@ class ProjectViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
         "kick": ["Admin"],
         "destroy": ["Admin"],
         "leave_project": ["Viewer"],
+        "burndown": ["Viewer"],
+        "velocity": ["Viewer"],
     }
 
+    MAX_BURNDOWN_DAYS = 365
+    MAX_VELOCITY_WEEKS = 52
+
     def get_permissions(self):
         perms = [IsAuthenticated()]
         min_role = self.ACTION_PERMISSIONS.get(self.action)
@@ -65,14 +88,22 @@ class ProjectViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
         return perms
 
     def get_queryset(self):
+        # Used for schema generation (no request user)
+        if getattr(self, "swagger_fake_view", False):
+            return self.queryset.none()
         user = self.request.user
-        return (
-            self.queryset
-            .filter(Q(owner=user) | Q(memberships__user=user))
-            .annotate(tasks_count=Count("tasks"))
-            .distinct()
-            .order_by('id')
-        )
+        qs = self.queryset.filter(Q(owner=user) | Q(memberships__user=user))
+        if self.wants_field("tasks_count"):
+            qs = qs.annotate(tasks_count=Count("tasks"))
+        return self.prune_queryset(qs.distinct().order_by('id'))
+
+    def get_list_validator(self, queryset):
+        # validate on the bare visibility filter, without the tasks join
+        user = self.request.user
+        visible = Project.objects.filter(
+            Q(owner=user) | Q(memberships__user=user)
+        ).distinct()
+        return super().get_list_validator(visible)
 
     def perform_create(self, serializer):
         project = ProjectService.create_project(
@@ -97,6 +128,15 @@ class ProjectViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
     def _forbidden(self, msg):
         return error_response(msg, status.HTTP_403_FORBIDDEN)
 
+    def _get_window(self, param, default, maximum):
+        """Parses a positive chart window (days/weeks) query parameter"""
+        value = self.request.query_params.get(param, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return None
+        return value if 0 < value <= maximum else None
+
     #
     # === ACTIONS ===
     #
@@ -162,6 +202,53 @@ class ProjectViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
         membership.delete()
         return status_response("Member excluded")
 
+    @swagger_auto_schema(
+        method="get",
+        manual_parameters=[
+            openapi.Parameter(
+                "days", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                description="Window size, default 30",
+            ),
+        ],
+        responses={200: BurndownPointSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def burndown(self, request, pk=None):
+        """
+        Remaining open tasks per day over the last `days` days
+        (read from daily rollups, not from the tasks)
+        """
+        project = self.get_object()
+        days = self._get_window("days", 30, self.MAX_BURNDOWN_DAYS)
+        if days is None:
+            return error_response(
+                f"days must be between 1 and {self.MAX_BURNDOWN_DAYS}"
+            )
+        points = ProjectRollupService.burndown(project.id, days)
+        return Response(BurndownPointSerializer(points, many=True).data)
+
+    @swagger_auto_schema(
+        method="get",
+        manual_parameters=[
+            openapi.Parameter(
+                "weeks", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                description="Window size, default 8",
+            ),
+        ],
+        responses={200: VelocityWeekSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def velocity(self, request, pk=None):
+        """Completed tasks per week over the last `weeks` weeks"""
+        project = self.get_object()
+        weeks = self._get_window("weeks", 8, self.MAX_VELOCITY_WEEKS)
+        if weeks is None:
+            return error_response(
+                f"weeks must be between 1 and {self.MAX_VELOCITY_WEEKS}"
+            )
+        weeks_data = ProjectRollupService.velocity(project.id, weeks)
+        return Response(VelocityWeekSerializer(weeks_data, many=True).data)
+
     @action(detail=True, methods=["post"], url_path="leave")
     def leave_project(self, request, pk=None):
         """
@@ -190,6 +277,7 @@ class RoleViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {"list": 3, "retrieve": 2}
 
 
 class ProjectMembershipViewSet(viewsets.ReadOnlyModelViewSet):
@@ -199,8 +287,12 @@ class ProjectMembershipViewSet(viewsets.ReadOnlyModelViewSet):
 
     serializer_class = ProjectMembershipSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {"list": 3, "retrieve": 2}
 
     def get_queryset(self):
+        # Used for schema generation (no request user)
+        if getattr(self, "swagger_fake_view", False):
+            return ProjectMembership.objects.none()
         user = self.request.user
         projects = Project.objects.filter(
             Q(owner=user) | Q(memberships__user=user)
@@ -220,6 +312,7 @@ class ProjectShareLinkViewSet(viewsets.ModelViewSet):
 
     lookup_field = "id"
     permission_classes = [IsAuthenticated]
+    query_budgets = {"*": 8}
 
     def get_permissions(self):
         perms = super().get_permissions()
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.services import TaskSyncService
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes delta sync tombstones older than the retention window "
+        "(SYNC_TOMBSTONE_RETENTION_DAYS). Run it periodically, e.g. from cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help="Retention window in days",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Rows deleted per statement",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options["days"])
+        deleted = TaskSyncService.purge_tombstones(
+            older_than, batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} tombstone(s)")
+        )
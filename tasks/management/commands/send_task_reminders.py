@@ -0,0 +1,51 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import get_reminder_backend
+from tasks.services import TaskReminderService
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends due-date reminders for open tasks due within the lead time. "
+        "Run it from cron, or keep it running with --interval"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lead-minutes", type=int,
+            default=settings.REMINDER_LEAD_MINUTES,
+            help="Remind about tasks due within this many minutes",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.REMINDER_BATCH_SIZE,
+            help="Tasks read per batch",
+        )
+        parser.add_argument(
+            "--backend", default=None,
+            help="Dotted path of the delivery backend "
+                 "(defaults to REMINDERS_BACKEND)",
+        )
+        parser.add_argument(
+            "--interval", type=int, default=0,
+            help="Repeat every N seconds instead of running once",
+        )
+
+    def handle(self, *args, **options):
+        lead = timedelta(minutes=options["lead_minutes"])
+        while True:
+            result = TaskReminderService.send_due_reminders(
+                lead=lead,
+                batch_size=options["batch_size"],
+                backend=get_reminder_backend(options["backend"]),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Reminded {result['users']} user(s) about "
+                f"{result['tasks']} task(s), {result['failed']} failed"
+            ))
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.9 on 2026-10-19 19:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_projectdailyrollup'),
+        ('tasks', '0007_taskreminder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(priority='L', then=models.Value(1)), models.When(priority='M', then=models.Value(2)), models.When(priority='H', then=models.Value(3)), default=models.Value(2)), output_field=models.PositiveSmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'completed', '-priority_rank', 'due_date'], name='tasks_task_user_id_e81759_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'completed', '-priority_rank', 'due_date'], name='tasks_task_project_303d4a_idx'),
+        ),
+    ]
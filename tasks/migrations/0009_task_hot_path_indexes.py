@@ -0,0 +1,36 @@
+# Generated by Django 5.1.9 on 2026-10-19 20:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_projectdailyrollup'),
+        ('tasks', '0008_task_priority_rank'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('project__isnull', True)), fields=['user', 'id'], name='task_personal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_favorite', True), ('project__isnull', True)), fields=['user', 'id'], name='task_personal_favorite_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'completed', 'due_date'], name='tasks_task_project_9af100_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['category', 'user'], name='tasks_task_categor_7d0abc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['due_date'], name='task_open_due_idx'),
+        ),
+    ]
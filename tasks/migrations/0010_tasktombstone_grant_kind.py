@@ -0,0 +1,18 @@
+# Generated by Django 5.1.9 on 2026-10-19 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tasktombstone',
+            name='kind',
+            field=models.CharField(choices=[('task', 'Task'), ('project', 'Project'), ('grant', 'Project access granted')], default='task', max_length=7),
+        ),
+    ]
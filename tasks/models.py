@@ -4,7 +4,6 @@ import logging
 
 from django.conf import settings
 from django.db import models
-from django.dispatch import receiver
 from django.utils import timezone
 
 from api.validators import TEXT_FIELD_VALIDATOR
@@ -44,6 +43,8 @@ class Task(models.Model):
         ("M", "Medium"),
         ("H", "High"),
     ]
+    # numeric order of the priorities (the codes sort H < L < M)
+    PRIORITY_RANKS = {"L": 1, "M": 2, "H": 3}
 
     title = models.CharField(max_length=64, validators=[TEXT_FIELD_VALIDATOR])
     description = models.TextField(
@@ -66,6 +67,18 @@ class Task(models.Model):
     priority = models.CharField(
         max_length=1, choices=PRIORITY_CHOICES, default="M"
     )
+    # computed by the database from priority, for ordering and indexes
+    priority_rank = models.GeneratedField(
+        expression=models.Case(
+            *(
+                models.When(priority=code, then=models.Value(rank))
+                for code, rank in PRIORITY_RANKS.items()
+            ),
+            default=models.Value(PRIORITY_RANKS["M"]),
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
     is_favorite = models.BooleanField(default=False, verbose_name="Favorite")
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -83,7 +96,36 @@ class Task(models.Model):
     )
 
     class Meta:
-        indexes = [models.Index(fields=["due_date"]),]
+        indexes = [
+            models.Index(fields=["due_date"]),
+            # delta sync: personal and project changes since a cursor
+            models.Index(fields=["user", "updated_at"]),
+            models.Index(fields=["project", "updated_at"]),
+            # ?ordering=urgency: highest priority, then earliest due date
+            models.Index(
+                fields=["user", "completed", "-priority_rank", "due_date"]
+            ),
+            models.Index(
+                fields=["project", "completed", "-priority_rank", "due_date"]
+            ),
+            # list hot paths (see api/tests/test_task_indexes.py)
+            models.Index(
+                fields=["user", "id"], condition=models.Q(project__isnull=True),
+                name="task_personal_idx",
+            ),
+            models.Index(
+                fields=["user", "id"],
+                condition=models.Q(is_favorite=True, project__isnull=True),
+                name="task_personal_favorite_idx",
+            ),
+            models.Index(fields=["project", "completed", "due_date"]),
+            models.Index(fields=["category", "user"]),
+            # overdue/due soon open tasks (reminders)
+            models.Index(
+                fields=["due_date"], condition=models.Q(completed=False),
+                name="task_open_due_idx",
+            ),
+        ]
         ordering = ["id"]
 
     def update_completed_at(self):
@@ -103,10 +145,71 @@ class Task(models.Model):
         return f"{self.title} - {user_display}"
 
 
-@receiver(models.signals.post_save, sender=Task)
-def update_user_last_task_completed(sender, instance, created, **kwargs):
-    _, _ = sender, created
-    """Signal: if the task is just completed, update user.last_task_completed_at"""
-    if instance.completed and instance.user:
-        instance.user.last_task_completed_at = timezone.now()
-        instance.user.save(update_fields=["last_task_completed_at"])
+class TaskTombstone(models.Model):
+    """
+    Delta sync marker of something a client must drop:
+    - kind=task: a task deleted or moved out of a scope
+      (a personal scope via user_id or a project scope via project_id)
+    - kind=project: a user lost access to a whole project
+    - kind=grant: a user was given access to a project; not sent to
+      clients, it makes older cursors of the user run a full sync (the
+      tasks of the project predate the cursor)
+
+    Plain integer columns on purpose: the referenced rows are usually
+    being deleted in the same transaction
+    """
+
+    KIND_TASK = "task"
+    KIND_PROJECT = "project"
+    KIND_GRANT = "grant"
+    KIND_CHOICES = [
+        (KIND_TASK, "Task"),
+        (KIND_PROJECT, "Project"),
+        (KIND_GRANT, "Project access granted"),
+    ]
+
+    kind = models.CharField(
+        max_length=7, choices=KIND_CHOICES, default=KIND_TASK
+    )
+    task_id = models.BigIntegerField(null=True, blank=True)
+    project_id = models.BigIntegerField(null=True, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_id", "deleted_at"]),
+            models.Index(fields=["project_id", "deleted_at"]),
+            models.Index(fields=["deleted_at"]),
+        ]
+        ordering = ["deleted_at", "id"]
+
+    def __str__(self):
+        target = self.task_id if self.kind == self.KIND_TASK else self.project_id
+        if self.kind == self.KIND_GRANT:
+            return f"project {target} granted at {self.deleted_at}"
+        return f"{self.kind} {target} removed at {self.deleted_at}"
+
+
+class TaskReminder(models.Model):
+    """
+    Sent-marker of a due-date reminder: one per task and due date,
+    so a rescheduled task is reminded again
+    """
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="reminders"
+    )
+    due_date = models.DateTimeField()
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "due_date"], name="unique_task_reminder"
+            ),
+        ]
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"Reminder for task {self.task_id} due {self.due_date}"
@@ -1,9 +1,11 @@
 import logging
 
 from django.core.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 from projects.permissions import IsProjectMinRole
+from projects.services import ProjectService
 
 logger = logging.getLogger(__name__)
 
@@ -14,17 +16,18 @@ class IsOwner(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        user_field = getattr(obj, "user", None) or getattr(obj, "owner", None)
+        # compare ids: no need to load the related user
+        owner_id = getattr(obj, "user_id", None) or getattr(obj, "owner_id", None)
 
-        if user_field is None:
+        if owner_id is None:
             logger.error(
-                f"Object {type(obj).__name__} has no ownership attribute"
+                "Object %s has no ownership attribute", type(obj).__name__
             )
             raise PermissionDenied(
                 "Access denied: missing ownership information"
             )
 
-        return user_field == request.user
+        return owner_id == request.user.pk
 
 
 class ProjectTaskPermission(BasePermission):
@@ -40,6 +43,13 @@ class ProjectTaskPermission(BasePermission):
         return "Moderator"
 
     def has_permission(self, request, view):
+        # nested routes: the project must be visible to the user; hidden
+        # projects do not exist for them
+        project = ProjectService.get_project_meta(view.kwargs.get("project_pk"))
+        if project is None or not IsProjectMinRole("Viewer").has_object_permission(
+            request, view, project
+        ):
+            raise NotFound()
         return True
 
     def has_object_permission(self, request, view, obj):
@@ -0,0 +1,90 @@
+"""
+Delivery backends for due-date reminders.
+
+TaskReminderService groups due tasks per user and hands every group to
+the backend from settings.REMINDERS_BACKEND as one message. A backend
+raising an exception leaves the tasks unmarked, so they are retried on
+the next run.
+"""
+
+import json
+import logging
+import sys
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class BaseReminderBackend:
+    """Sends one reminder message per user"""
+
+    def send(self, user, tasks):
+        raise NotImplementedError
+
+    def close(self):
+        """Called once at the end of a run"""
+
+    @staticmethod
+    def build_payload(user, tasks):
+        return {
+            "user": user.id,
+            "email": user.email,
+            "tasks": [
+                {
+                    "id": task.id,
+                    "title": task.title,
+                    "due_date": task.due_date,
+                    "project": task.project_id,
+                }
+                for task in tasks
+            ],
+        }
+
+
+class ConsoleReminderBackend(BaseReminderBackend):
+    """Writes reminders to stdout (development)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, user, tasks):
+        lines = [f"Reminder for {user.email}: {len(tasks)} task(s) due soon"]
+        lines += [f"  - {task.title} (due {task.due_date:%Y-%m-%d %H:%M})"
+                  for task in tasks]
+        self.stream.write("\n".join(lines) + "\n")
+
+
+class FileReminderBackend(BaseReminderBackend):
+    """Appends reminders as JSON lines to settings.REMINDERS_FILE_PATH"""
+
+    def __init__(self, path=None):
+        self.path = (
+            path or settings.REMINDERS_FILE_PATH
+            or settings.LOG_DIR / "reminders.log"
+        )
+        self._file = None
+        self._lock = threading.Lock()
+
+    def send(self, user, tasks):
+        line = json.dumps(
+            self.build_payload(user, tasks), cls=DjangoJSONEncoder
+        )
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def get_reminder_backend(path=None):
+    """Instantiates the configured (or given) reminder backend"""
+    return import_string(path or settings.REMINDERS_BACKEND)()
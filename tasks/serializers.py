@@ -1,10 +1,13 @@
 from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Task, Category
+from api.mixins import SparseFieldsetSerializerMixin
+from .models import Task, Category, TaskTombstone
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     category_name: serializers.StringRelatedField = (
         serializers.StringRelatedField(source="category.name", read_only=True)
     )
@@ -26,6 +29,11 @@ class TaskSerializer(serializers.ModelSerializer):
             "id", "created_at", "updated_at", "user",
             "completed_at", "user_name", "completed_by", "completed_by_name"
         ]
+        field_requirements = {
+            "category_name": ["category__name"],
+            "user_name": ["user__username"],
+            "completed_by_name": ["completed_by__username"],
+        }
 
     def validate_due_date(self, value):
         if value is None:
@@ -37,7 +45,7 @@ class TaskSerializer(serializers.ModelSerializer):
         return value
 
     def get_completed_by(self, obj):
-        return obj.completed_by.id if obj.completed_by else None
+        return obj.completed_by_id
 
     def get_completed_by_name(self, obj):
         return obj.completed_by.username if obj.completed_by else None
@@ -62,7 +70,42 @@ class MoveTaskResponseSerializer(serializers.Serializer):
     status = serializers.CharField()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class TaskTombstoneSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskTombstone
+        fields = ["kind", "task_id", "project_id", "deleted_at"]
+
+
+class TaskSyncResponseSerializer(serializers.Serializer):
+    tasks = TaskSerializer(many=True)
+    tombstones = TaskTombstoneSerializer(many=True)
+    next_cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+
+
+class CategoryStatsSerializer(serializers.Serializer):
+    id = serializers.IntegerField(allow_null=True)
+    name = serializers.CharField(allow_null=True)
+    total = serializers.IntegerField()
+    open = serializers.IntegerField()
+    completed = serializers.IntegerField()
+
+
+class TaskStatsSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    open = serializers.IntegerField()
+    completed = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    due_today = serializers.IntegerField()
+    favorites = serializers.IntegerField()
+    by_priority = serializers.DictField(child=serializers.IntegerField())
+    by_category = CategoryStatsSerializer(many=True)
+    generated_at = serializers.DateTimeField()
+
+
+class CategorySerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     tasks_count = serializers.SerializerMethodField()
     user_name: serializers.StringRelatedField = serializers.StringRelatedField(
         source="user.username", read_only=True
@@ -72,6 +115,10 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ["id", "name", "user", "user_name", "tasks_count"]
         read_only_fields = ["user", "user_name", "tasks_count"]
+        field_requirements = {
+            "user_name": ["user__username"],
+            "tasks_count": [],
+        }
 
     def validate_name(self, value):
         if not value.strip():
@@ -79,4 +126,8 @@ class CategorySerializer(serializers.ModelSerializer):
         return value
 
     def get_tasks_count(self, obj):
-        return obj.tasks.count()
+        # annotated by CategoryViewSet; fallback for standalone usage
+        tasks_count = getattr(obj, "tasks_count", None)
+        if tasks_count is None:
+            return obj.tasks.count()
+        return tasks_count
@@ -1,5 +1,14 @@
+import base64
 import logging
-from django.db.models import Q
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from api.metrics import record_cache
 
 from typing import TYPE_CHECKING
 
@@ -33,6 +42,7 @@ class TaskService:
         """
         task.is_favorite = not task.is_favorite
         task.save()
+        TaskEventService.publish(TaskEventService.TOGGLED, task)
         return task
 
     @staticmethod
@@ -41,6 +51,8 @@ class TaskService:
         Toggle the completed flag on a task, update timestamps,
         and record the user who completed it
         """
+        from projects.services import ProjectRollupService
+
         task.completed = not task.completed
         task.update_completed_at()
 
@@ -49,7 +61,14 @@ class TaskService:
         else:
             task.completed_by = None
 
-        task.save(update_fields=["completed", "completed_at", "completed_by"])
+        task.save(
+            update_fields=[
+                "completed", "completed_at", "completed_by", "updated_at"
+            ]
+        )
+        if task.project_id:
+            ProjectRollupService.record_completion(task)
+        TaskEventService.publish(TaskEventService.TOGGLED, task)
         return task
 
     @staticmethod
@@ -61,6 +80,7 @@ class TaskService:
             ValueError: If the project does not exist or access is denied
         """
         from projects.models import Project
+        from projects.services import ProjectRollupService, ProjectService
 
         try:
             new_project = (
@@ -74,12 +94,537 @@ class TaskService:
         except Project.DoesNotExist:
             raise ValueError("Project not found or access denied")
 
+        old_project_id = task.project_id
+        if old_project_id and old_project_id != new_project.id:
+            TaskSyncService.record_task_removed(
+                task.id, project_id=old_project_id
+            )
+
         task.project = new_project
         task.save()
+        ProjectService.touch_projects(old_project_id, new_project.id)
+        ProjectRollupService.record_moved(task, old_project_id)
+        TaskStatsService.invalidate(task.user_id, old_project_id)
+
+        if old_project_id != new_project.id:
+            TaskEventService.publish_deleted(
+                task.id, old_project_id, task.user_id, reason="moved"
+            )
+            TaskEventService.publish(TaskEventService.CREATED, task)
 
         return task
 
 
+class TaskEventService:
+    """
+    Service for pushing task changes to subscribers (Server-Sent Events)
+
+    Project tasks go to the project channel, personal tasks to the owner
+    channel. Events are sent after commit and serialized once per event,
+    only if the channel has listeners
+    """
+
+    CREATED = "task.created"
+    UPDATED = "task.updated"
+    DELETED = "task.deleted"
+    TOGGLED = "task.toggled"
+
+    @staticmethod
+    def get_channel(project_id, user_id):
+        from api.events import project_channel, user_channel
+
+        if project_id:
+            return project_channel(project_id)
+        return user_channel(user_id)
+
+    @staticmethod
+    def _publish_on_commit(channel, event, data):
+        from api.events import get_broker
+
+        transaction.on_commit(
+            lambda: get_broker().publish(channel, event, data)
+        )
+
+    @staticmethod
+    def publish(event, task):
+        """Publishes the full task representation"""
+        from tasks.serializers import TaskSerializer
+
+        TaskEventService._publish_on_commit(
+            TaskEventService.get_channel(task.project_id, task.user_id),
+            event,
+            lambda: TaskSerializer(task).data,
+        )
+
+    @staticmethod
+    def publish_deleted(task_id, project_id, user_id, reason="deleted"):
+        TaskEventService._publish_on_commit(
+            TaskEventService.get_channel(project_id, user_id),
+            TaskEventService.DELETED,
+            {"id": task_id, "project": project_id, "reason": reason},
+        )
+
+    @staticmethod
+    def publish_access_revoked(user_id, project_id):
+        """Tells the user streams to leave the project channel"""
+        from api.events import REVOKED_EVENT, project_channel, user_channel
+
+        TaskEventService._publish_on_commit(
+            user_channel(user_id),
+            REVOKED_EVENT,
+            {"channel": project_channel(project_id), "project": project_id},
+        )
+
+    @staticmethod
+    def get_channels(user, project_ids=None):
+        """
+        Returns the channels a user may listen to: own personal tasks and
+        accessible projects (optionally narrowed to project_ids)
+        """
+        from api.events import project_channel, user_channel
+        from projects.models import Project
+
+        projects = Project.objects.filter(
+            Q(owner=user) | Q(memberships__user=user)
+        )
+        if project_ids is not None:
+            projects = projects.filter(id__in=project_ids)
+        ids = projects.values_list("id", flat=True).distinct()
+        return [user_channel(user.id)] + [project_channel(pk) for pk in ids]
+
+
+class TaskStatsService:
+    """
+    Service for task statistics (dashboard counters)
+
+    All buckets come from one conditional-aggregation query
+    (COUNT(*) FILTER (WHERE ...)) grouped by category; the totals are the
+    sums of the category rows. Results are cached for
+    TASK_STATS_CACHE_TIMEOUT seconds and dropped on task writes
+    """
+
+    @staticmethod
+    def cache_key(user_id=None, project_id=None):
+        if project_id is not None:
+            return f"task-stats:project:{project_id}"
+        return f"task-stats:user:{user_id}"
+
+    @staticmethod
+    def invalidate(user_id=None, project_id=None):
+        keys = [TaskStatsService.cache_key(user_id=user_id)]
+        if project_id is not None:
+            keys.append(TaskStatsService.cache_key(project_id=project_id))
+        cache.delete_many(keys)
+
+    @staticmethod
+    def category_scopes(category_id):
+        """
+        Returns the (user_id, project_id) pairs of the tasks in a category,
+        i.e. the cached stats whose by_category rows show it
+        """
+        from tasks.models import Task
+
+        return set(
+            Task.objects.filter(category_id=category_id)
+            .values_list("user_id", "project_id")
+            .distinct()
+        )
+
+    @staticmethod
+    def invalidate_scopes(user_id, scopes):
+        """Drops the stats of the user and of every (user, project) scope"""
+        keys = {TaskStatsService.cache_key(user_id=user_id)}
+        for scope_user_id, project_id in scopes:
+            keys.add(TaskStatsService.cache_key(user_id=scope_user_id))
+            if project_id is not None:
+                keys.add(TaskStatsService.cache_key(project_id=project_id))
+        cache.delete_many(list(keys))
+
+    @staticmethod
+    def compute(queryset):
+        """Computes the counters of the given task queryset"""
+        from tasks.models import Task
+
+        priorities = [code for code, _ in Task.PRIORITY_CHOICES]
+        now = timezone.now()
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day_start + timedelta(days=1)
+        is_open = Q(completed=False)
+
+        rows = (
+            queryset.order_by()
+            .values("category_id", "category__name")
+            .annotate(
+                n_total=Count("id"),
+                n_completed=Count("id", filter=Q(completed=True)),
+                n_open=Count("id", filter=is_open),
+                n_overdue=Count("id", filter=is_open & Q(due_date__lt=now)),
+                n_due_today=Count(
+                    "id",
+                    filter=is_open
+                    & Q(due_date__gte=day_start, due_date__lt=day_end),
+                ),
+                n_favorites=Count("id", filter=Q(is_favorite=True)),
+                **{
+                    f"n_priority_{code}": Count("id", filter=Q(priority=code))
+                    for code in priorities
+                },
+            )
+        )
+
+        counters = [
+            "total", "completed", "open", "overdue", "due_today", "favorites",
+        ]
+        stats = {name: 0 for name in counters}
+        by_priority = {code: 0 for code in priorities}
+        by_category = []
+        for row in rows:
+            for name in counters:
+                stats[name] += row[f"n_{name}"]
+            for code in by_priority:
+                by_priority[code] += row[f"n_priority_{code}"]
+            by_category.append({
+                "id": row["category_id"],
+                "name": row["category__name"],
+                "total": row["n_total"],
+                "open": row["n_open"],
+                "completed": row["n_completed"],
+            })
+
+        by_category.sort(key=lambda item: (item["id"] is None, item["id"] or 0))
+        stats["by_priority"] = by_priority
+        stats["by_category"] = by_category
+        stats["generated_at"] = now
+        return stats
+
+    @staticmethod
+    def get_stats(queryset, user_id=None, project_id=None):
+        """Returns cached counters or computes and caches them"""
+        timeout = settings.TASK_STATS_CACHE_TIMEOUT
+        if not timeout:
+            return TaskStatsService.compute(queryset)
+
+        key = TaskStatsService.cache_key(user_id, project_id)
+        stats = cache.get(key)
+        record_cache("task_stats", stats is not None)
+        if stats is None:
+            stats = TaskStatsService.compute(queryset)
+            cache.set(key, stats, timeout)
+        return stats
+
+
+class TaskReminderService:
+    """
+    Service for due-date reminders
+
+    Walks the due_date index over [now, now + lead) in keyset batches,
+    skips tasks already reminded for their current due date (TaskReminder
+    markers), groups each batch per user and hands the groups to the
+    reminder backend. Markers are written only after a successful send
+    """
+
+    @staticmethod
+    def iter_due_batches(start, end, batch_size):
+        """Yields open, not yet reminded tasks due in [start, end)"""
+        from tasks.models import Task, TaskReminder
+
+        already_sent = TaskReminder.objects.filter(
+            task_id=OuterRef("pk"), due_date=OuterRef("due_date")
+        )
+        tasks = (
+            Task.objects.filter(
+                due_date__gte=start, due_date__lt=end,
+                completed=False, user__is_active=True,
+            )
+            .filter(~Exists(already_sent))
+            .select_related("user")
+            .only(
+                "id", "title", "due_date", "project_id",
+                "user__id", "user__email", "user__username",
+            )
+            .order_by("due_date", "id")
+        )
+
+        last = None
+        while True:
+            page = tasks
+            if last is not None:
+                page = page.filter(
+                    Q(due_date__gt=last[0]) | Q(due_date=last[0], id__gt=last[1])
+                )
+            batch = list(page[:batch_size])
+            if not batch:
+                return
+            yield batch
+            if len(batch) < batch_size:
+                return
+            last = (batch[-1].due_date, batch[-1].id)
+
+    @staticmethod
+    def send_due_reminders(lead=None, now=None, batch_size=None, backend=None):
+        """
+        Sends reminders for tasks due within `lead` (a timedelta) and
+        returns the counters of the run
+        """
+        from tasks.models import TaskReminder
+        from tasks.reminders import get_reminder_backend
+
+        now = now or timezone.now()
+        lead = lead or timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+        batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+        backend = backend or get_reminder_backend()
+        result = {"tasks": 0, "users": 0, "failed": 0}
+
+        try:
+            for batch in TaskReminderService.iter_due_batches(
+                now, now + lead, batch_size
+            ):
+                per_user = defaultdict(list)
+                for task in batch:
+                    per_user[task.user_id].append(task)
+
+                markers = []
+                for tasks in per_user.values():
+                    try:
+                        backend.send(tasks[0].user, tasks)
+                    except Exception:
+                        logger.exception(
+                            "Reminder delivery failed for user %s",
+                            tasks[0].user_id,
+                        )
+                        result["failed"] += len(tasks)
+                        continue
+                    markers += [
+                        TaskReminder(task_id=task.id, due_date=task.due_date)
+                        for task in tasks
+                    ]
+                    result["users"] += 1
+
+                TaskReminder.objects.bulk_create(markers, ignore_conflicts=True)
+                result["tasks"] += len(markers)
+        finally:
+            backend.close()
+        return result
+
+
+class SyncCursorExpired(Exception):
+    """
+    The client must run a full sync: the cursor is older than the
+    tombstone retention window, or the user joined a project since
+    """
+
+
+class TaskSyncService:
+    """
+    Service for delta sync of tasks
+
+    Tasks and tombstones form one stream ordered by time (tasks before
+    tombstones of the same instant), paged with `limit` changes per page.
+    A cursor is the position of the last change a client has seen: its
+    time and the last task and tombstone ids of that instant. Pages of a
+    full sync carry no tombstones; their cursors also hold the moment the
+    full sync started, where the following incremental syncs resume.
+    Changes are read through the (user, updated_at) and (project,
+    updated_at) indexes; removals come from TaskTombstone
+    """
+
+    @staticmethod
+    def encode_cursor(
+        timestamp: datetime, pk: int, tombstone_pk: int = 0,
+        full_sync_start: datetime | None = None,
+    ) -> str:
+        parts = [timestamp.isoformat(), str(pk), str(tombstone_pk)]
+        if full_sync_start is not None:
+            parts.append(full_sync_start.isoformat())
+        return base64.urlsafe_b64encode("|".join(parts).encode()).decode()
+
+    # cursors of nodes with a clock slightly ahead are still valid
+    CLOCK_SKEW = timedelta(minutes=1)
+
+    @staticmethod
+    def decode_cursor(
+        cursor: str,
+    ) -> tuple[datetime, int, int, datetime | None]:
+        """
+        Returns (time, task id, tombstone id, full sync start or None)
+
+        Raises:
+            ValueError: If the cursor is malformed, has a UTC offset
+                (cursors hold naive server times) or lies in the future
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            timestamp, pk, *rest = raw.split("|")
+            if len(rest) > 2:
+                raise ValueError("Too many cursor fields")
+            since, since_pk = datetime.fromisoformat(timestamp), int(pk)
+            tombstone_pk = int(rest[0]) if rest else 0
+            started = datetime.fromisoformat(rest[1]) if len(rest) > 1 else None
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Invalid sync cursor") from e
+        for moment in filter(None, (since, started)):
+            if timezone.is_aware(moment):
+                raise ValueError("Invalid sync cursor")
+            if moment > timezone.now() + TaskSyncService.CLOCK_SKEW:
+                raise ValueError("Sync cursor lies in the future")
+        return since, since_pk, tombstone_pk, started
+
+    @staticmethod
+    def record_task_removed(task_id, user_id=None, project_id=None):
+        """Leaves a tombstone for a task that left a personal/project scope"""
+        from tasks.models import TaskTombstone
+
+        TaskTombstone.objects.create(
+            kind=TaskTombstone.KIND_TASK,
+            task_id=task_id,
+            user_id=user_id if project_id is None else None,
+            project_id=project_id,
+        )
+
+    @staticmethod
+    def record_access_revoked(user_id, project_id):
+        """Leaves a tombstone telling the user to drop a whole project"""
+        from tasks.models import TaskTombstone
+
+        TaskTombstone.objects.create(
+            kind=TaskTombstone.KIND_PROJECT,
+            user_id=user_id,
+            project_id=project_id,
+        )
+
+    @staticmethod
+    def record_access_granted(user_id, project_id):
+        """Leaves a marker sending older cursors of the user to a full sync"""
+        from tasks.models import TaskTombstone
+
+        TaskTombstone.objects.create(
+            kind=TaskTombstone.KIND_GRANT,
+            user_id=user_id,
+            project_id=project_id,
+        )
+
+    @staticmethod
+    def get_changes(user, cursor=None, limit=None, queryset=None):
+        """
+        Returns the next `limit` changes after the cursor (tasks and
+        tombstones, see the class), plus the cursor for the next call.
+        Without a cursor (full sync) only tasks are returned.
+        `queryset` lets the caller preselect related objects
+
+        Raises:
+            ValueError: If the cursor or the limit is malformed
+            SyncCursorExpired: If tombstones of the window were purged,
+                or the user was given access to a project since the cursor
+        """
+        from projects.models import Project
+        from tasks.models import Task, TaskTombstone
+
+        if limit is not None and limit < 1:
+            raise ValueError("Limit must be positive")
+        limit = min(
+            limit or settings.SYNC_PAGE_SIZE, settings.SYNC_MAX_PAGE_SIZE
+        )
+        # stay slightly behind "now" to pick up transactions that were
+        # still committing; clients upsert, so repeats are harmless
+        lag = timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS)
+        horizon = timezone.now() - lag
+        since, since_pk, since_tombstone_pk, started = (
+            None, 0, 0, timezone.now()
+        )
+        if cursor:
+            since, since_pk, since_tombstone_pk, started = (
+                TaskSyncService.decode_cursor(cursor)
+            )
+            # removals and grants matter from here on
+            checkpoint = started or since
+            retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+            if checkpoint < timezone.now() - retention:
+                raise SyncCursorExpired()
+            if TaskTombstone.objects.filter(
+                kind=TaskTombstone.KIND_GRANT, user_id=user.id,
+                deleted_at__gt=checkpoint,
+            ).exists():
+                # the tasks of the project are older than the cursor
+                raise SyncCursorExpired()
+        full_sync = started is not None
+
+        project_ids = list(
+            Project.objects.filter(Q(owner=user) | Q(memberships__user=user))
+            .values_list("id", flat=True)
+            .distinct()
+        )
+
+        tasks = (queryset if queryset is not None else Task.objects).filter(
+            Q(user=user, project__isnull=True) | Q(project_id__in=project_ids)
+        )
+        if since is not None:
+            tasks = tasks.filter(
+                Q(updated_at__gt=since) | Q(updated_at=since, id__gt=since_pk)
+            )
+        # (time, 0 for tasks and 1 for tombstones, id, row)
+        changes = [
+            (task.updated_at, 0, task.id, task)
+            for task in tasks.order_by("updated_at", "id")[:limit + 1]
+        ]
+        if not full_sync:
+            # the client has nothing to delete before a full sync
+            tombstones = TaskTombstone.objects.filter(
+                Q(user_id=user.id) | Q(project_id__in=project_ids),
+                Q(deleted_at__gt=since)
+                | Q(deleted_at=since, id__gt=since_tombstone_pk),
+            ).exclude(kind=TaskTombstone.KIND_GRANT)
+            changes += [
+                (tombstone.deleted_at, 1, tombstone.id, tombstone)
+                for tombstone in tombstones.order_by("deleted_at", "id")[:limit + 1]
+            ]
+        changes.sort(key=lambda change: change[:3])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if has_more:
+            position = [since, since_pk, since_tombstone_pk]
+            for timestamp, kind, pk, _ in changes:
+                if timestamp != position[0]:
+                    position = [timestamp, 0, 0]
+                position[1 + kind] = pk
+            next_cursor = TaskSyncService.encode_cursor(
+                *position, full_sync_start=started
+            )
+        elif full_sync:
+            # changes made during the full sync are sent again
+            next_cursor = TaskSyncService.encode_cursor(started - lag, 0)
+        elif horizon <= since:
+            next_cursor = cursor
+        else:
+            next_cursor = TaskSyncService.encode_cursor(horizon, 0)
+
+        return {
+            "tasks": [row for _, kind, _, row in changes if kind == 0],
+            "tombstones": [row for _, kind, _, row in changes if kind == 1],
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        }
+
+    @staticmethod
+    def purge_tombstones(older_than: datetime, batch_size=5000):
+        """
+        Deletes tombstones older than the given moment in batches,
+        returns the number of deleted rows
+        """
+        from tasks.models import TaskTombstone
+
+        deleted = 0
+        while True:
+            batch = list(
+                TaskTombstone.objects.filter(deleted_at__lt=older_than)
+                .order_by("deleted_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not batch:
+                return deleted
+            deleted += TaskTombstone.objects.filter(id__in=batch).delete()[0]
+
+
 class CategoryService:
     """
     Service for operations with categories
@@ -0,0 +1,176 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from projects.models import Project, ProjectMembership
+from projects.services import ProjectRollupService, ProjectService
+
+from .models import Category, Task
+from .services import TaskStatsService, TaskSyncService
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+@receiver(post_save, sender=Task)
+def update_user_last_task_completed(sender, instance, created, **kwargs):
+    """Signal: if the task is just completed, update user.last_task_completed_at"""
+    _, _ = sender, created
+    if instance.completed and instance.user:
+        instance.user.last_task_completed_at = timezone.now()
+        instance.user.save(update_fields=["last_task_completed_at"])
+
+
+@receiver(post_save, sender=Task)
+def touch_project_on_task_created(sender, instance, created, **kwargs):
+    """Signal: a new task changes the project tasks_count"""
+    if created and instance.project_id:
+        ProjectService.touch_projects(instance.project_id)
+
+
+@receiver(post_delete, sender=Task)
+def touch_project_on_task_deleted(sender, instance, **kwargs):
+    """Signal: a removed task changes the project tasks_count"""
+    if instance.project_id:
+        ProjectService.touch_projects(instance.project_id)
+
+
+@receiver(post_save, sender=Category)
+def touch_tasks_on_category_renamed(sender, instance, created, **kwargs):
+    """
+    Signal: tasks embed category_name, so renaming a category
+    must invalidate the validators of its tasks
+    """
+    if not created:
+        instance.tasks.update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Category)
+def touch_tasks_on_category_deleted(sender, instance, **kwargs):
+    """
+    Signal: deleting a category clears category_name of its tasks
+    (SET_NULL is a bulk update that leaves updated_at untouched)
+    """
+    instance.tasks.update(updated_at=timezone.now())
+
+
+@receiver(post_init, sender=User)
+def remember_loaded_username(sender, instance, **kwargs):
+    """Signal: keeps the stored username to detect renames on save"""
+    # deferred loads have no username to compare with
+    instance._loaded_username = instance.__dict__.get("username")
+
+
+@receiver(post_save, sender=User)
+def touch_rows_on_user_renamed(sender, instance, created, **kwargs):
+    """
+    Signal: tasks embed user_name/completed_by_name and projects embed
+    owner_name, so renaming a user must invalidate their validators
+    """
+    loaded = instance._loaded_username
+    username = instance.__dict__.get("username")
+    instance._loaded_username = username
+    if created or loaded is None or loaded == username:
+        return
+    now = timezone.now()
+    Task.objects.filter(
+        Q(user=instance) | Q(completed_by=instance)
+    ).update(updated_at=now)
+    Project.objects.filter(owner=instance).update(updated_at=now)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance, origin=None, **kwargs):
+    """
+    Signal: leave a delta sync tombstone for a deleted task.
+    Skipped when the whole project is being deleted: members get
+    a single project tombstone instead of one per task
+    """
+    if isinstance(origin, Project) and origin.pk == instance.project_id:
+        return
+    TaskSyncService.record_task_removed(
+        instance.id, user_id=instance.user_id, project_id=instance.project_id
+    )
+
+
+@receiver(post_save, sender=ProjectMembership)
+def record_membership_grant(sender, instance, created, **kwargs):
+    """Signal: a new member must receive the existing project tasks"""
+    if created:
+        TaskSyncService.record_access_granted(
+            instance.user_id, instance.project_id
+        )
+
+
+@receiver(post_delete, sender=ProjectMembership)
+def record_membership_tombstone(sender, instance, **kwargs):
+    """Signal: a kicked/leaving member must drop the project tasks"""
+    TaskSyncService.record_access_revoked(
+        instance.user_id, instance.project_id
+    )
+
+
+@receiver(post_delete, sender=Project)
+def record_project_tombstone(sender, instance, **kwargs):
+    """
+    Signal: the owner loses a deleted project
+    (members are covered by their memberships being deleted)
+    """
+    TaskSyncService.record_access_revoked(instance.owner_id, instance.id)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_stats(sender, instance, **kwargs):
+    """Signal: task writes drop the cached dashboard counters"""
+    TaskStatsService.invalidate(instance.user_id, instance.project_id)
+
+
+@receiver(pre_delete, sender=Category)
+def collect_category_stats_scopes(sender, instance, **kwargs):
+    """Signal: SET_NULL detaches the tasks before post_delete runs"""
+    instance._stats_scopes = TaskStatsService.category_scopes(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_stats(sender, instance, created=False, **kwargs):
+    """
+    Signal: by_category embeds category names, in the user stats
+    and in the stats of every project whose tasks use the category
+    """
+    scopes = getattr(instance, "_stats_scopes", None)
+    if scopes is None and not created:
+        scopes = TaskStatsService.category_scopes(instance.pk)
+    TaskStatsService.invalidate_scopes(instance.user_id, scopes or ())
+
+
+@receiver(post_save, sender=Task)
+def rollup_task_created(sender, instance, created, **kwargs):
+    """Signal: count a new project task in the daily rollup"""
+    if created and instance.project_id:
+        ProjectRollupService.record_created(instance)
+
+
+@receiver(post_delete, sender=Task)
+def rollup_task_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Signal: count a deleted project task in the daily rollup.
+    Skipped when the project itself goes away in the same cascade
+    (a project delete or its owner delete): the rollups go with it
+    """
+    if not instance.project_id:
+        return
+    if isinstance(origin, Project) and origin.pk == instance.project_id:
+        return
+    if isinstance(origin, User) and Project.objects.filter(
+        pk=instance.project_id, owner_id=origin.pk
+    ).exists():
+        return
+    ProjectRollupService.record_deleted(instance)
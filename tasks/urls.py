@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import SimpleRouter
 
-from .views import TaskViewSet, CategoryViewSet
+from .views import TaskViewSet, CategoryViewSet, task_event_stream
 
 router = SimpleRouter()
 router.register(r"", TaskViewSet, basename="task")
@@ -10,6 +10,7 @@ management_router = SimpleRouter()
 management_router.register(r"categories", CategoryViewSet, basename="category")
 
 urlpatterns = [
+    path("events/", task_event_stream, name="task-events"),
     path("", include(router.urls)),
     path("manage/", include(management_router.urls)),
 ]
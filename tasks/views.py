@@ -1,56 +1,96 @@
 import logging
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.utils.timezone import now
 from django.views.decorators.cache import cache_page
+from django.views.decorators.http import require_GET
 
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound, PermissionDenied
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.exceptions import (
+    AuthenticationFailed, NotFound, PermissionDenied,
+)
+from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.response import Response
 
-from api.mixins import UserQuerysetMixin
+from api.events import event_stream, get_broker
+from api.filters import AliasOrderingFilter
+from api.mixins import (
+    ConditionalGetMixin, SingleFlightMixin, SparseFieldsetMixin,
+    UserQuerysetMixin,
+)
 from api.utils import error_response, status_response
 from projects.permissions import IsProjectMinRole
+from projects.services import ProjectRollupService, ProjectService
+from users.authentication import CachedJWTAuthentication
 
 from .models import Task, Category
 from .permissions import IsOwner, ProjectTaskPermission
-from .services import TaskService, CategoryService
+from .services import (
+    TaskService, CategoryService, SyncCursorExpired, TaskEventService,
+    TaskStatsService, TaskSyncService,
+)
 from .serializers import (
     TaskSerializer, CategorySerializer,
     ToggleCompletedResponseSerializer, ToggleFavoriteResponseSerializer,
     MoveTaskResponseSerializer, MoveTaskSerializer, 
+    TaskSyncResponseSerializer, TaskTombstoneSerializer, TaskStatsSerializer,
 )
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
+class TaskViewSet(
+    SparseFieldsetMixin, ConditionalGetMixin, SingleFlightMixin,
+    UserQuerysetMixin, viewsets.ModelViewSet,
+):
     """
     ViewSet for operations with tasks.
 
     Allows viewing, creating, editing, and deleting tasks.
     Includes extra actions for toggling favorite/completed status
     and moving tasks between projects.
+    Supports sparse fieldsets via `?fields=` / `?exclude=`
+    and conditional requests (ETag, If-None-Match, If-Match).
+    Identical concurrent list requests share one page (SingleFlightMixin).
     """
 
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsOwner]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # object permissions and the ETag need these even in sparse reads
+    sparse_always_load = ("user", "project", "updated_at")
+    # SQL queries per request; QueryInstrumentationMiddleware logs overruns
+    query_budgets = {
+        "list": 4, "retrieve": 2, "stats": 3, "sync": 5,
+        "today": 4, "favorites": 4,
+        "create": 8, "update": 12, "partial_update": 12, "destroy": 12,
+        "toggle_completed": 8, "toggle_favorite": 5, "move_task": 14,
+        "*": 10,
+    }
+    filter_backends = [DjangoFilterBackend, SearchFilter, AliasOrderingFilter]
     search_fields = ["title", "description"]
     filterset_fields = ["completed", "priority", "is_favorite", "category"]
     ordering_fields = [
-        "title", "due_date", "priority",
+        "title", "due_date", "priority", "urgency",
         "created_at", "updated_at",
     ]
+    # priority codes sort alphabetically: order by their numeric rank;
+    # urgency (highest priority, then earliest due date) is index-backed
+    ordering_aliases = {
+        "priority": ["priority_rank"],
+        "urgency": ["-priority_rank", "due_date", "id"],
+    }
 
     def get_permissions(self):
         if self.kwargs.get("project_pk"):
@@ -59,6 +99,9 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
 
     def get_queryset(self):
         qs = super().get_queryset()
+        # Used for schema generation (no request user)
+        if getattr(self, "swagger_fake_view", False):
+            return qs
 
         project_id = self.kwargs.get("project_pk")
         if project_id is not None:
@@ -89,10 +132,28 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
         save_kwargs = {"user": self.request.user}
         if project_pk is not None:
             save_kwargs["project_id"] = project_pk
-        serializer.save(**save_kwargs)
+        task = serializer.save(**save_kwargs)
+        TaskEventService.publish(TaskEventService.CREATED, task)
+
+    def perform_update(self, serializer):
+        was_completed = serializer.instance.completed
+        task = serializer.save()
+        if task.project_id and task.completed != was_completed:
+            ProjectRollupService.record_completion(task)
+        TaskEventService.publish(TaskEventService.UPDATED, task)
+
+    def perform_destroy(self, instance):
+        task_id, project_id, user_id = (
+            instance.id, instance.project_id, instance.user_id
+        )
+        instance.delete()
+        TaskEventService.publish_deleted(task_id, project_id, user_id)
 
     def get_object(self):
-        obj = get_object_or_404(Task, pk=self.kwargs.get(self.lookup_field))
+        obj = get_object_or_404(
+            self.prune_queryset(Task.objects.all()),
+            pk=self.kwargs.get(self.lookup_field),
+        )
         try:
             self.check_object_permissions(self.request, obj)
         except PermissionDenied:
@@ -110,18 +171,18 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
             task = self.get_object()
             updated_task = TaskService.toggle_favorite(task)
             logger.info(
-                f"Task {task.id} favorite status updated to {updated_task.is_favorite}"
+                "Task %s favorite status updated to %s",
+                task.id, updated_task.is_favorite,
             )
             return Response({
                     "status": "favorite status updated",
                     "is_favorite": updated_task.is_favorite,
                 })
-        except Exception as e:
-            logger.exception(f"Error toggling favorite for task {pk}")
+        except Exception:
+            logger.exception("Error toggling favorite for task %s", pk)
             return error_response(
                 "Failed to update favorite status",
                 status.HTTP_500_INTERNAL_SERVER_ERROR,
-                exc=e,
             )
 
     @action(
@@ -134,7 +195,8 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
             task = self.get_object()
             updated_task = TaskService.toggle_completed(task, self.request.user)
             logger.info(
-                f"Task {task.id} completion status updated to {updated_task.completed}"
+                "Task %s completion status updated to %s",
+                task.id, updated_task.completed,
             )
             return Response(
                 {
@@ -148,12 +210,11 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
                     ),
                 }
             )
-        except Exception as e:
-            logger.exception(f"Error toggling completion for task {pk}")
+        except Exception:
+            logger.exception("Error toggling completion for task %s", pk)
             return error_response(
                 "Failed to update completion status",
                 status.HTTP_500_INTERNAL_SERVER_ERROR,
-                exc=e,
             )
 
     @action(
@@ -173,6 +234,78 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
         serializer = self.get_serializer(favorites_qs, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        method="get", responses={200: TaskStatsSerializer},
+    )
+    @action(detail=False, methods=["get"])
+    def stats(self, request, project_pk=None):
+        """
+        Dashboard counters (open, completed, overdue, due today,
+        by priority, by category) of personal or project tasks
+        """
+        if project_pk is None:
+            queryset = Task.objects.filter(user=request.user, project__isnull=True)
+            stats = TaskStatsService.get_stats(queryset, user_id=request.user.id)
+            return Response(stats)
+
+        project = ProjectService.get_project_meta(project_pk)
+        if project is None or not IsProjectMinRole("Viewer").has_object_permission(
+            request, self, project
+        ):
+            raise NotFound()
+        queryset = Task.objects.filter(project_id=project.id)
+        stats = TaskStatsService.get_stats(queryset, project_id=project.id)
+        return Response(stats)
+
+    @swagger_auto_schema(
+        method="get",
+        manual_parameters=[
+            openapi.Parameter(
+                "cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                description="next_cursor of the previous sync; omit for a full sync",
+            ),
+            openapi.Parameter(
+                "limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={200: TaskSyncResponseSerializer},
+    )
+    @action(detail=False, methods=["get"])
+    def sync(self, request, project_pk=None):
+        """
+        Delta sync: personal and accessible project tasks changed since
+        the cursor, plus tombstones of removed tasks/projects.
+        Clients apply tombstones and upserts in timestamp order
+        """
+        if project_pk is not None:
+            raise NotFound("Use /tasks/sync/ to sync tasks")
+
+        limit = request.query_params.get("limit")
+        try:
+            changes = TaskSyncService.get_changes(
+                request.user,
+                cursor=request.query_params.get("cursor"),
+                limit=int(limit) if limit else None,
+                queryset=self.prune_queryset(Task.objects.all()),
+            )
+        except SyncCursorExpired:
+            return error_response(
+                "Sync cursor expired, perform a full sync",
+                status.HTTP_410_GONE,
+            )
+        except ValueError:
+            return error_response("Invalid cursor or limit")
+
+        serializer = self.get_serializer(changes["tasks"], many=True)
+        return Response({
+            "tasks": serializer.data,
+            "tombstones": TaskTombstoneSerializer(
+                changes["tombstones"], many=True
+            ).data,
+            "next_cursor": changes["next_cursor"],
+            "has_more": changes["has_more"],
+        })
+
     @swagger_auto_schema(
         method="post",
         request_body=MoveTaskSerializer,
@@ -190,13 +323,12 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
             TaskService.move_task_to_project(task, project_id, request.user)
             return status_response("Task moved successfully")
         except ValueError as e:
-            return error_response(str(e), status.HTTP_404_NOT_FOUND, exc=e)
-        except Exception as e:
-            logger.exception(f"Error moving task: {e}")
+            return error_response(str(e), status.HTTP_404_NOT_FOUND)
+        except Exception:
+            logger.exception("Error moving task %s", task.id)
             return error_response(
                 "Failed to move task",
                 status.HTTP_500_INTERNAL_SERVER_ERROR,
-                exc=e,
             )
 
     @action(
@@ -210,17 +342,28 @@ class TaskViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
         return self.move_task(request, pk=pk)
 
 
-class CategoryViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
+class CategoryViewSet(
+    SparseFieldsetMixin, UserQuerysetMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for operations with categories.
 
     Allows viewing, creating, editing, and deleting categories.
     Includes an extra action to list tasks within a category.
+    Supports sparse fieldsets via `?fields=` / `?exclude=`.
     """
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated, IsOwner]
+    query_budgets = {"list": 3, "retrieve": 2, "tasks": 4, "*": 6}
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action != "tasks" and self.wants_field("tasks_count"):
+            # GROUP BY queries ignore Meta.ordering
+            qs = qs.annotate(tasks_count=Count("tasks")).order_by("id")
+        return qs
 
     @action(detail=True, methods=["get"])
     def tasks(self, request, pk=None):
@@ -230,3 +373,53 @@ class CategoryViewSet(UserQuerysetMixin, viewsets.ModelViewSet):
             tasks, many=True, context={"request": request}
         )
         return Response(serializer.data)
+
+
+def _authenticate_jwt(request):
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+@require_GET
+async def task_event_stream(request):
+    """
+    Server-Sent Events stream of task create/update/delete/toggle events
+    for the personal tasks and the accessible projects of the user.
+    `?projects=1,2` narrows the projects. Requires an ASGI server
+    """
+    user = await sync_to_async(_authenticate_jwt)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "Event streams are only served by the ASGI application"},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    project_ids = None
+    raw_projects = request.GET.get("projects")
+    if raw_projects:
+        try:
+            project_ids = [int(pk) for pk in raw_projects.split(",")]
+        except ValueError:
+            return JsonResponse(
+                {"error": "projects must be a list of ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    channels = await sync_to_async(TaskEventService.get_channels)(
+        user, project_ids
+    )
+    subscription = get_broker().subscribe(channels)
+    response = StreamingHttpResponse(
+        event_stream(subscription), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # disable proxy buffering
+    return response
@@ -0,0 +1,71 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.cache import TwoTierCache
+
+# user id -> (field values but the password hash, revocation claim) or None
+USER_CACHE = TwoTierCache("users", strict=True)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the user of the token through USER_CACHE
+    instead of one query per request; users are invalidated on save and
+    delete (users.signals), with the same active and revocation checks.
+    The password hash is not cached: the user is rebuilt with the field
+    deferred (loaded on access, left out of save())
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        cached = USER_CACHE.get_or_set(
+            str(user_id), lambda: self.load_user(user_id)
+        )
+        if cached is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        values, revoke_claim = cached
+        user = self.user_model.from_db(
+            DEFAULT_DB_ALIAS, list(values), list(values.values())
+        )
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != revoke_claim:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."),
+                    code="password_changed",
+                )
+
+        return user
+
+    def load_user(self, user_id):
+        """Cached form of the user: the hash only survives as the claim"""
+        fields = [field.attname for field in self.user_model._meta.concrete_fields]
+        row = self.user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values_list(*fields).first()
+        if row is None:
+            return None
+        values = dict(zip(fields, row))
+        password = values.pop("password")
+        revoke_claim = (
+            get_md5_hash_password(password)
+            if api_settings.CHECK_REVOKE_TOKEN else None
+        )
+        return values, revoke_claim
+
+
+def invalidate_user(user_id):
+    USER_CACHE.invalidate(str(user_id))
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 
+from api.utils import make_etag
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer
 )
@@ -60,3 +62,17 @@ class UserService:
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return serializer.data
+
+    @staticmethod
+    def get_profile_etag(user):
+        """
+        Builds the profile ETag from the already loaded user fields,
+        so conditional profile reads need neither queries nor serialization
+        """
+        return make_etag(
+            settings.API_VERSION,
+            *(
+                getattr(user, field)
+                for field in UserProfileSerializer.Meta.fields
+            ),
+        )
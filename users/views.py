@@ -2,9 +2,9 @@ from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle
 
-from api.utils import error_response
+from api.throttling import AnonSlidingWindowThrottle
+from api.utils import error_response, etag_matches, not_modified_response
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer,
     UserProfileSerializer
@@ -17,7 +17,8 @@ class AuthViewSet(viewsets.GenericViewSet):
     Handles user registration, login, and logout
     """
 
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle]
+    query_budgets = {"login": 3, "register": 6, "logout": 4}
 
     def get_serializer_class(self):
         # Used for schema generation
@@ -85,12 +86,17 @@ class UserViewSet(viewsets.GenericViewSet):
 
     permission_classes = [IsAuthenticated]
     serializer_class = UserProfileSerializer
+    query_budgets = {"profile": 1, "*": 4}
 
     @action(detail=False, methods=["get"])
     def profile(self, request):
-        """Returns the authenticated user's profile"""
+        """Returns the authenticated user's profile (supports If-None-Match)"""
+        etag = UserService.get_profile_etag(request.user)
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return not_modified_response(etag)
+
         serializer = self.get_serializer(request.user)
-        return Response(serializer.data)
+        return Response(serializer.data, headers={"ETag": etag})
 
     @action(detail=False, methods=["put", "patch"])
     def update_profile(self, request):